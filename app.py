@@ -0,0 +1,119 @@
+import streamlit as st
+import os
+
+from lawbot_engine import deadlines, embedding, registry, retrieval, tracing
+
+# One Streamlit app that mounts every demo as a page. All pages run in this
+# single process, so they share the model registry, the embedding cache and
+# the vector index instead of each demo starting its own copy.
+# Run it from the repository root with:  streamlit run app.py
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURATION ---
+st.set_page_config(
+    page_title="LawBot",
+    page_icon="⚖️",
+    layout="centered",
+)
+
+# Serves /metrics when LAWBOT_METRICS_PORT is set (once per process)
+tracing.start_metrics_server()
+
+
+# --- OVERVIEW PAGE ---
+def overview():
+    st.title("⚖️ LawBot")
+    st.caption("Every LawBot demo in one app. Pick a page from the sidebar.")
+
+    st.subheader("Shared resources in this process")
+    models = registry.stats()
+    embeddings = embedding.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Models built", models["models_built"])
+    col2.metric("Embeddings cached", embeddings["cached"])
+    col3.metric("Embedding API calls", embeddings["api_calls"])
+    st.write(f"Model cache hits: {models['cache_hits']} · Embedding cache hits: {embeddings['hits']}")
+
+    indexes = retrieval.shared_indexes()
+    if indexes:
+        for paths, chunks in indexes:
+            files = ", ".join(f"`{os.path.relpath(path, ROOT)}`" for path in paths)
+            st.write(f"📚 Vector index over {files}: {chunks} chunks")
+    else:
+        st.write("📚 No vector index built yet. Open the Vector Database page to build it.")
+    for build in retrieval.index_builds():
+        if build.status != "ready":
+            files = ", ".join(f"`{os.path.relpath(path, ROOT)}`" for path in build.paths)
+            detail = f"{build.done} of {build.total} chunks" if build.status == "building" else build.error
+            st.write(f"🛠️ Index build over {files}: {build.status} ({detail})")
+
+    st.subheader("Time per stage")
+    stages = tracing.summary()
+    if stages:
+        st.table([
+            {"stage": name, "count": row["count"], "errors": row["errors"],
+             "p50 ≤ s": row["p50_s"], "p95 ≤ s": row["p95_s"], "p99 ≤ s": row["p99_s"]}
+            for name, row in stages.items()
+        ])
+        st.caption("Percentiles are histogram bucket upper bounds. Scrape /metrics for the full histograms.")
+    else:
+        st.write("Nothing timed yet. Ask a question on any page.")
+
+    batches = tracing.value_summary()
+    if "query_batch_size" in batches:
+        size, wait = batches["query_batch_size"], batches["query_batch_wait_seconds"]
+        st.write(
+            f"🧺 {size['count']} query batches, {size['mean']:.1f} queries each on average "
+            f"(p95 ≤ {size['p95']}); queries waited {wait['mean'] * 1000:.1f} ms on average "
+            f"(p95 ≤ {wait['p95'] * 1000:g} ms)."
+        )
+
+    answers = deadlines.stats()
+    if answers["requests"]:
+        tail = deadlines.latency_report()
+        st.write(
+            f"🕒 {answers['requests']} answers: {answers['hedge_rate']:.0%} hedged, "
+            f"{answers['fallback_rate']:.0%} fell back to a cached or quoted answer. "
+            f"p99 time to first text {tail['p99_s']:.1f} s (first attempt alone: {tail['first_attempt_p99_s']:.1f} s)."
+        )
+
+
+def page(folder, title, icon):
+    """A demo app in `folder` mounted as a page."""
+    return st.Page(
+        os.path.join(ROOT, folder, "app.py"),
+        title=title,
+        icon=icon,
+        url_path=folder.replace("-", "_"),
+    )
+
+
+# --- NAVIGATION ---
+pages = {
+    "LawBot": [st.Page(overview, title="Overview", icon="🏠", default=True)],
+    "Prompting": [
+        page("zero-shot-prompting", "Zero-Shot", "🧠"),
+        page("one-shot-prompting", "One-Shot", "🎯"),
+        page("multi-shot-prompting", "Multi-Shot", "⚖️"),
+        page("dynamic-shot-prompting", "Dynamic-Shot", "⚡"),
+        page("chain-of-thought-prompting", "Chain of Thought", "🔗"),
+        page("multi-turn-chat", "Chat", "💬"),
+    ],
+    "Sampling": [
+        page("temperature", "Temperature", "🌡️"),
+        page("top-k", "Top K", "🔝"),
+        page("top-p", "Top P", "🅿️"),
+    ],
+    "Similarity": [
+        page("embeddings", "Embeddings", "🔢"),
+        page("cosine-similarity", "Cosine Similarity", "📐"),
+        page("dot-product", "Dot Product", "✨"),
+        page("l2-distance", "L2 Distance", "📏"),
+    ],
+    "Retrieval": [
+        page("vector-database", "Vector Database", "📚"),
+    ],
+}
+
+st.navigation(pages).run()
@@ -1,11 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import numpy as np
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import config, embedding, registry, similarity
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -15,32 +16,23 @@ st.set_page_config(
 )
 
 # Configure the Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
+api_key = config.get_api_key()  # From the environment or .env
 if not api_key:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
-genai.configure(api_key=api_key)
+registry.configure(api_key)
 
 # --- FUNCTIONS ---
+# Embedding and similarity math live in lawbot_engine; these wrappers only add the UI error message.
+
 def get_embedding(text):
     """Generates an embedding for a given piece of text."""
-    if not text or not text.strip(): return None
     try:
-        return genai.embed_content(model=EMBEDDING_MODEL, content=text)['embedding']
+        return embedding.get_embedding(text)
     except Exception as e:
         st.error(f"Error generating embedding: {e}")
         return None
 
-def calculate_cosine_similarity(vec1, vec2):
-    """Calculates cosine similarity between two vectors."""
-    dot_product = np.dot(vec1, vec2)
-    norm_vec1 = np.linalg.norm(vec1)
-    norm_vec2 = np.linalg.norm(vec2)
-    # Avoid division by zero
-    if norm_vec1 == 0 or norm_vec2 == 0:
-        return 0.0
-    return dot_product / (norm_vec1 * norm_vec2)
-
 # --- USER INTERFACE (UI) ---
 st.title("📐 LawBot's Cosine Similarity Explorer")
 st.caption("The mathematical engine behind AI search and retrieval.")
@@ -69,7 +61,7 @@ if st.button("Calculate Similarity", type="primary"):
             embedding2 = get_embedding(text2)
 
             if embedding1 is not None and embedding2 is not None:
-                similarity_score = calculate_cosine_similarity(embedding1, embedding2)
+                similarity_score = similarity.cosine_similarity(embedding1, embedding2)
 
                 st.success("Calculation Complete!")
                 st.subheader("Results")
@@ -1,11 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import numpy as np
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import embedding, registry, similarity
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -16,34 +17,22 @@ st.set_page_config(
 
 # Configure the Gemini API
 try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except AttributeError:
+    registry.configure()  # Reads GEMINI_API_KEY from the environment or .env
+except ValueError:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
 
 # --- FUNCTIONS ---
+# Embedding and similarity math live in lawbot_engine; these wrappers only add the UI error message.
+
 def get_embedding(text):
-    if not text or not text.strip(): return None
+    """Generates an embedding for a given piece of text."""
     try:
-        return genai.embed_content(model="models/embedding-001", content=text)['embedding']
+        return embedding.get_embedding(text)
     except Exception as e:
         st.error(f"Error generating embedding: {e}")
         return None
 
-def calculate_cosine_similarity(vec1, vec2):
-    dot_product = np.dot(vec1, vec2)
-    norm_vec1 = np.linalg.norm(vec1)
-    norm_vec2 = np.linalg.norm(vec2)
-    if norm_vec1 == 0 or norm_vec2 == 0: return 0.0
-    return dot_product / (norm_vec1 * norm_vec2)
-
-def calculate_l2_distance(vec1, vec2):
-    return np.linalg.norm(np.array(vec1) - np.array(vec2))
-
-def calculate_dot_product(vec1, vec2):
-    # The raw dot product of the two vectors.
-    return np.dot(vec1, vec2)
-
 # --- USER INTERFACE (UI) ---
 st.title("✨ LawBot's Complete Similarity Explorer")
 st.caption("Comparing Cosine Similarity vs. L2 Distance vs. Dot Product")
@@ -66,9 +55,9 @@ if st.button("Calculate All Similarity Metrics", type="primary"):
                 st.success("Calculation Complete!")
                 st.subheader("Results")
 
-                cosine_score = calculate_cosine_similarity(embedding1, embedding2)
-                l2_score = calculate_l2_distance(embedding1, embedding2)
-                dot_product_score = calculate_dot_product(embedding1, embedding2)
+                cosine_score = similarity.cosine_similarity(embedding1, embedding2)
+                l2_score = similarity.l2_distance(embedding1, embedding2)
+                dot_product_score = similarity.dot_product(embedding1, embedding2)
 
                 res_col1, res_col2, res_col3 = st.columns(3)
                 with res_col1:
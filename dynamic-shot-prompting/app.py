@@ -1,10 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import config, deadlines, jurisdictions, prompting, registry, tracing
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -14,37 +16,19 @@ st.set_page_config(
 )
 
 # Configure the Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
+api_key = config.get_api_key()  # From the environment or .env
 if not api_key:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
-genai.configure(api_key=api_key)
+registry.configure(api_key)
 
-# --- MULTI-SHOT EXAMPLES (We keep these to control the *output format*) ---
-# The examples teach the AI HOW to answer. The dynamic part changes WHAT we ask.
-EXAMPLES = [
-    # ... (You can copy the same EXAMPLES list from your multi-shot assignment)
-    {
-        "role": "user",
-        "parts": ["In Punjab, what are the steps to file an FIR?"]
-    },
-    {
-        "role": "model",
-        "parts": [
-            "**[Simplified Explanation]:** An FIR (First Information Report) is the first step to initiate a criminal proceeding. It is a document prepared by the police when they receive information about a cognizable offense.\n\n"
-            "**[Legal Reference]:** Section 154 of the Code of Criminal Procedure, 1973.\n\n"
-            "**[Actionable Steps]:**\n1. Visit the nearest police station in your jurisdiction in Punjab.\n2. Narrate the incident clearly to the officer.\n3. The officer will write it down, read it back to you, and you must sign it.\n4. You are entitled to a free copy of the FIR."
-        ]
-    }
-]
+# --- PROMPTS ---
+# SYSTEM_PROMPT, EXAMPLES and build_prompt live in prompts.py next to this file
+prompts = prompting.load_prompts(os.path.dirname(os.path.abspath(__file__)))
+SYSTEM_PROMPT, EXAMPLES, build_prompt = prompts.SYSTEM_PROMPT, prompts.EXAMPLES, prompts.build_prompt
 
 # --- MODEL INITIALIZATION ---
-SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions based on their specific situation and location. You must follow the format of the examples precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
-
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=SYSTEM_PROMPT
-)
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
 
 # --- DYNAMIC USER INTERFACE (UI) ---
 st.title("⚡ Dynamic Shot Prompting")
@@ -62,24 +46,39 @@ if st.button("Get Legal Advice"):
     if not legal_issue or not location:
         st.warning("Please fill in at least the legal issue and your location.")
     else:
-        with st.spinner("LawBot is crafting your personalized advice..."):
+        with st.spinner("LawBot is crafting your personalized advice..."), tracing.span("request", app="dynamic-shot-prompting"):
             try:
-                # This is the DYNAMIC PROMPT creation, structured to reduce injection risk.
-                details_part = f" Here are some additional details: '{extra_details}'." if extra_details else ""
-                final_prompt = (
-                    f"A user is facing a legal issue in '{location}', India. "
-                    f"The main problem is: '{legal_issue}'.{details_part} "
-                    f"Based on this specific situation, what are their rights and what should they do?"
-                )
-
-                # We still use the examples to guide the output format
-                response = model.generate_content(
-                    EXAMPLES + [{"role": "user", "parts": [final_prompt]}]
-                )
+                with tracing.span("prompt"):
+                    # Work out the place locally; its helplines come from a table, not the model
+                    place = jurisdictions.resolve(location)
+                    final_prompt = build_prompt(legal_issue, place.label if place else location, extra_details)
+                    if place:
+                        final_prompt += jurisdictions.PROMPT_NOTE
 
                 st.subheader("LawBot's Personalized Advice:")
-                st.markdown(response.text)
+                answer_box = st.empty()
+                # We still use the examples to guide the output format, and
+                # re-ask once if the streamed answer breaks it; a slow model gets
+                # a hedged second request, then a local fallback at the deadline
+                answer = deadlines.generate(
+                    model,
+                    EXAMPLES + [{"role": "user", "parts": [final_prompt]}],
+                    prompts.SECTIONS,
+                    on_text=answer_box.markdown,
+                    question=f"{legal_issue} {extra_details}",
+                    app="dynamic-shot-prompting",
+                    context=place.label if place else location,
+                )
+                with tracing.span("render"):
+                    answer_box.markdown(answer.text)
+                    if deadlines.describe(answer):
+                        st.caption(deadlines.describe(answer))
+                    helplines = jurisdictions.format_helplines(
+                        place, f"{legal_issue} {extra_details}", fallback=prompts.DEFAULT_LOCATION
+                    )
+                    if helplines:
+                        st.markdown(helplines)
 
             except Exception as e:
-                # In a production app, you would log the full error here, e.g., logging.error(e)
-                st.error("An error occurred while generating your advice. Please try again.")
\ No newline at end of file
+                st.error("An error occurred while generating your advice. Please try again.")
+                tracing.record_error("request", e)
\ No newline at end of file
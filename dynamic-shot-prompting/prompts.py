@@ -0,0 +1,44 @@
+"""
+Prompt construction for the Dynamic LawBot.
+
+Kept out of app.py so the offline harness (lawbot_engine.harness) can
+import it without starting Streamlit.
+"""
+from lawbot_engine.formatting import SECTION_TAGS
+
+# --- MULTI-SHOT EXAMPLES (We keep these to control the *output format*) ---
+# The examples teach the AI HOW to answer. The dynamic part changes WHAT we ask.
+EXAMPLES = [
+    # ... (You can copy the same EXAMPLES list from your multi-shot assignment)
+    {
+        "role": "user",
+        "parts": ["In Punjab, what are the steps to file an FIR?"]
+    },
+    {
+        "role": "model",
+        "parts": [
+            "**[Simplified Explanation]:** An FIR (First Information Report) is the first step to initiate a criminal proceeding. It is a document prepared by the police when they receive information about a cognizable offense.\n\n"
+            "**[Legal Reference]:** Section 154 of the Code of Criminal Procedure, 1973.\n\n"
+            "**[Actionable Steps]:**\n1. Visit the nearest police station in your jurisdiction in Punjab.\n2. Narrate the incident clearly to the officer.\n3. The officer will write it down, read it back to you, and you must sign it.\n4. You are entitled to a free copy of the FIR."
+        ]
+    }
+]
+
+SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions based on their specific situation and location. You must follow the format of the examples precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
+
+# The sections a well-formed answer from this app should contain
+SECTIONS = SECTION_TAGS
+
+# Used by the harness when a test question has no location
+DEFAULT_LOCATION = "Delhi"
+
+
+def build_prompt(legal_issue, location=DEFAULT_LOCATION, extra_details=""):
+    """Builds the user's prompt from the form fields."""
+    # This is the DYNAMIC PROMPT creation, structured to reduce injection risk.
+    details_part = f" Here are some additional details: '{extra_details}'." if extra_details else ""
+    return (
+        f"A user is facing a legal issue in '{location}', India. "
+        f"The main problem is: '{legal_issue}'.{details_part} "
+        f"Based on this specific situation, what are their rights and what should they do?"
+    )
@@ -1,11 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import numpy as np
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import config, embedding, registry, similarity
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -15,38 +16,23 @@ st.set_page_config(
 )
 
 # Configure the Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
+api_key = config.get_api_key()  # From the environment or .env
 if not api_key:
     st.error("🚨 Gemini API key not found. Please create a .env file or set the GEMINI_API_KEY environment variable.")
     st.stop()
-genai.configure(api_key=api_key)
+registry.configure(api_key)
 
 # --- FUNCTIONS ---
+# Embedding and similarity math live in lawbot_engine; these wrappers only add the UI error message.
 
 def get_embedding(text):
     """Generates an embedding for a given piece of text."""
-    if not text or not text.strip():
-        return None
     try:
-        # We use a specific model for embeddings
-        result = genai.embed_content(
-            model="models/embedding-001",
-            content=text
-        )
-        return result['embedding']
+        return embedding.get_embedding(text)
     except Exception as e:
         st.error(f"Error generating embedding: {e}")
         return None
 
-def calculate_similarity(vec1, vec2):
-    """Calculates cosine similarity between two vectors."""
-    # Cosine similarity is a measure of similarity between two non-zero vectors
-    # It is the dot product of the vectors divided by the product of their magnitudes.
-    dot_product = np.dot(vec1, vec2)
-    norm_vec1 = np.linalg.norm(vec1)
-    norm_vec2 = np.linalg.norm(vec2)
-    return dot_product / (norm_vec1 * norm_vec2) if (norm_vec1 * norm_vec2) != 0 else 0.0
-
 # --- USER INTERFACE (UI) ---
 st.title("➡️🔢 LawBot's Embeddings Explorer")
 st.caption("The first step in teaching an AI how to read and understand meaning.")
@@ -78,7 +64,7 @@ if st.button("Generate and Compare Embeddings", type="primary"):
                 st.success("Embeddings generated successfully!")
 
                 # Calculate similarity
-                similarity_score = calculate_similarity(embedding1, embedding2)
+                similarity_score = similarity.cosine_similarity(embedding1, embedding2)
 
                 # Display results
                 st.subheader("Results")
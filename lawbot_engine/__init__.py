@@ -0,0 +1,46 @@
+"""
+LawBot's shared engine.
+
+The demo apps in this repository each live in their own folder and are run
+with `streamlit run app.py`. Code that should be shared between them (and
+kept alive across Streamlit reruns) lives in this package instead.
+
+Submodules are loaded on first access (`lawbot_engine.retrieval`), and the
+heavy libraries behind them (google.generativeai, numpy, faiss) only when
+they are actually used. `python -m lawbot_engine.importcheck` checks that
+importing the engine stays within its time budget.
+"""
+import importlib
+
+__all__ = [
+    "batching",
+    "chunkstore",
+    "config",
+    "conversation",
+    "corpus",
+    "deadlines",
+    "embedding",
+    "fake",
+    "footprint",
+    "formatting",
+    "generation",
+    "grounding",
+    "harness",
+    "jurisdictions",
+    "loadgen",
+    "prompting",
+    "registry",
+    "rerank",
+    "retrieval",
+    "routing",
+    "shards",
+    "similarity",
+    "sweep",
+    "tracing",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
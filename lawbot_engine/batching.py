@@ -0,0 +1,180 @@
+"""
+Micro-batching of concurrent users' query embeddings and searches.
+
+Each search starts by embedding the user's question, and a single-text
+`embed_content` call costs a full round-trip. When many users search at
+once, `search` lets their queries wait a few milliseconds for each other:
+a collector thread gathers the queries that arrive within BATCH_WINDOW_MS of
+the first one (up to BATCH_MAX), and a small pool (BATCH_WORKERS) embeds
+each batch in one call, runs one multi-query FAISS search per index, and
+hands each caller its own result. A slow embedding call holds up only its
+own batch, and times out (EMBED_TIMEOUT_MS), failing only that batch's
+queries.
+
+Under light load a query waits at most the window; under heavy load the
+batches fill up and the number of API calls drops by up to BATCH_MAX
+times. The batch sizes and the time each query waited are kept as
+histograms (lawbot_query_batch_size and lawbot_query_batch_wait_seconds on
+/metrics) so the window can be tuned.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from lawbot_engine import config, tracing
+
+_lock = threading.Lock()
+_stats = {"batches": 0, "queries": 0, "embed_calls": 0, "search_calls": 0}
+_batcher = None
+
+
+class _Pending:
+    __slots__ = ("item", "future", "submitted")
+
+    def __init__(self, item):
+        self.item = item
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within `window_s` of each other (at most
+    `max_batch`) and processes them with one call to `process(items)`,
+    which returns one result per item. Up to `workers` batches are
+    processed at once, so a slow one doesn't hold up the next.
+    """
+
+    def __init__(self, process, window_s, max_batch, name="batch", workers=1):
+        self.process = process
+        self.window_s = window_s
+        self.max_batch = max(1, max_batch)
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"lawbot-{name}-worker")
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"lawbot-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queues an item; returns a Future for its result."""
+        pending = _Pending(item)
+        self._queue.put(pending)
+        return pending.future
+
+    def _collect(self):
+        """Blocks for the first item, then gathers more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = batch[0].submitted + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            dispatched = time.perf_counter()
+            tracing.observe(f"{self.name}_batch_size", len(batch), tracing.SIZE_BUCKETS)
+            for pending in batch:
+                tracing.observe(f"{self.name}_batch_wait_seconds", dispatched - pending.submitted)
+            self._pool.submit(self._process, batch)
+
+    def _process(self, batch):
+        """Processes one batch; an error fails only this batch's futures."""
+        try:
+            results = self.process([pending.item for pending in batch])
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+        else:
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+
+
+# --- QUERY BATCHES ---
+
+def _unfiltered(where):
+    return not where or all(value is None or value == [] for value in where.values())
+
+
+def search_batch(queries):
+    """
+    (query embedding, [(row, distance)]) for each (index, text, k, where) query.
+
+    Texts are embedded with one call per embedding model (each distinct text
+    once), and unfiltered queries on the same index and k share one FAISS
+    search. Filtered queries are searched one by one.
+    """
+    from lawbot_engine import embedding
+
+    vectors = [None] * len(queries)
+    by_model = {}
+    for i, (index, text, k, where) in enumerate(queries):
+        by_model.setdefault(index.embedding_model, {}).setdefault(text, []).append(i)
+    embed_calls = 0
+    for model, texts in by_model.items():
+        unique = list(texts)
+        embedded, misses = embedding.get_embeddings(unique, model, report_misses=True)
+        embed_calls += misses > 0  # A group answered from the cache made no call
+        for text, vector in zip(unique, embedded):
+            for i in texts[text]:
+                vectors[i] = vector
+
+    results = [None] * len(queries)
+    groups = {}
+    for i, (index, text, k, where) in enumerate(queries):
+        if vectors[i] is None:
+            results[i] = (None, [])
+        elif _unfiltered(where):
+            groups.setdefault((id(index), k), []).append(i)
+        else:
+            results[i] = (vectors[i], index.search_rows(vectors[i], k, where))
+    for rows in groups.values():
+        index, _, k, _ = queries[rows[0]]
+        hits = index.search_rows_batch([vectors[i] for i in rows], k)
+        for i, row_hits in zip(rows, hits):
+            results[i] = (vectors[i], row_hits)
+
+    with _lock:
+        _stats["batches"] += 1
+        _stats["queries"] += len(queries)
+        _stats["embed_calls"] += embed_calls
+        _stats["search_calls"] += len(groups) + sum(1 for index, text, k, where in queries if not _unfiltered(where))
+    return results
+
+
+def get_batcher():
+    """The process-wide query batcher, started on first use with the configured window."""
+    global _batcher
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(search_batch, config.BATCH_WINDOW_S, config.BATCH_MAX, name="query",
+                                        workers=config.BATCH_WORKERS)
+    return _batcher
+
+
+def search(index, text, k=2, where=None):
+    """
+    Embeds one user's query and searches `index`, batched with any other
+    queries arriving at the same time. Returns (query embedding, [(row,
+    distance)]), with (None, []) for a blank query.
+
+    With BATCH_WINDOW_MS set to 0 the query is embedded and searched on its
+    own, right away.
+    """
+    if config.BATCH_WINDOW_S <= 0:
+        return search_batch([(index, text, k, where)])[0]
+    return get_batcher().submit((index, text, k, where)).result()
+
+
+def stats():
+    """Batches run, queries in them, and the embedding and search calls they took."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,271 @@
+"""
+Knowledge-base chunks with their metadata, stored column by column.
+
+Every chunk in a knowledge base file starts with a header line such as
+
+    Article 21 of the Constitution of India: Protection of life and personal liberty.
+
+`parse_header` turns that into fields (kind, number, act, title), and the
+act gives the jurisdiction and, for the constitutions, the Part the article
+sits in. ChunkStore keeps each field as one column (a list per field rather
+than a dict per chunk) and precomputes, for every value of every filterable
+column, a bitmap of the rows that have it. A filter such as
+
+    {"act": "Constitution of India", "part": "Part III"}
+
+is then a couple of bitmap ANDs, done before the vector search, so the
+search only looks at the matching rows.
+
+A column can also be a StringColumn (all strings in one UTF-8 buffer plus
+offsets) or a DictionaryColumn (an integer code per row plus the distinct
+values). `from_chunks` stores every column that way, so a store holds a
+handful of arrays instead of a Python str per field per chunk, and
+corpus.py loads an exported corpus straight into the same layout.
+"""
+import re
+
+# Fields that can be used in a search filter
+FILTER_COLUMNS = ("act", "kind", "part", "jurisdiction", "source")
+COLUMNS = ("text", "title", "number") + FILTER_COLUMNS
+
+HEADER_PATTERN = re.compile(
+    r"^(?P<kind>Article|Section|Rule|Order)\s+(?P<number>\d+[A-Z]*)\s+of\s+(?:the\s+)?(?P<act>[^:]+?)\s*:\s*(?P<title>.*)$"
+)
+
+# Jurisdiction named in an act (or a chunk) -> its short name
+JURISDICTIONS = [
+    ("india", re.compile(r"\bIndia(n)?\b")),
+    ("nepal", re.compile(r"\bNepal(ese)?\b")),
+]
+DEFAULT_JURISDICTION = "general"
+
+# Article ranges of the constitutional Parts our knowledge bases cover
+PARTS = {
+    "Constitution of India": [
+        (12, 35, "Part III"),   # Fundamental Rights
+        (36, 51, "Part IV"),    # Directive Principles of State Policy
+    ],
+    "Constitution of Nepal": [
+        (16, 48, "Part 3"),     # Fundamental Rights and Duties
+    ],
+}
+SPECIAL_PARTS = {("Constitution of India", "51A"): "Part IVA"}  # Fundamental Duties
+
+
+def jurisdiction_of(text):
+    """The jurisdiction a piece of text belongs to (the first one it names)."""
+    for name, pattern in JURISDICTIONS:
+        if pattern.search(text):
+            return name
+    return DEFAULT_JURISDICTION
+
+
+def part_of(act, number):
+    """The constitutional Part an article number falls in, or None if unknown."""
+    if (act, number) in SPECIAL_PARTS:
+        return SPECIAL_PARTS[(act, number)]
+    digits = re.match(r"\d+", number or "")
+    if act not in PARTS or not digits:
+        return None
+    article = int(digits.group())
+    for first, last, part in PARTS[act]:
+        if first <= article <= last:
+            return part
+    return None
+
+
+def parse_header(text, source=None):
+    """The metadata of one chunk, parsed from its first line (fields are None when it has no header)."""
+    first_line = text.strip().splitlines()[0] if text.strip() else ""
+    match = HEADER_PATTERN.match(first_line)
+    if match is None:
+        return {"text": text, "title": None, "number": None, "act": None, "kind": None,
+                "part": None, "jurisdiction": jurisdiction_of(text), "source": source}
+    act = match.group("act").strip()
+    return {
+        "text": text,
+        "title": match.group("title").strip().rstrip(".") or None,
+        "number": match.group("number"),
+        "act": act,
+        "kind": match.group("kind"),
+        "part": part_of(act, match.group("number")),
+        "jurisdiction": jurisdiction_of(act),
+        "source": source,
+    }
+
+
+# --- ARRAY-BACKED COLUMNS ---
+
+class StringColumn:
+    """
+    A column of strings stored as one UTF-8 buffer plus row offsets.
+
+    Row i is `buffer[offsets[i]:offsets[i + 1]]`, decoded when it is read.
+    `valid` (optional) marks the rows that hold a value; the others read as None.
+    """
+
+    __slots__ = ("buffer", "offsets", "valid")
+
+    def __init__(self, buffer, offsets, valid=None):
+        self.buffer = buffer  # bytes, or a uint8 numpy array (possibly memory-mapped)
+        self.offsets = offsets  # int64 numpy array of len(rows) + 1
+        self.valid = valid
+
+    @classmethod
+    def from_strings(cls, values):
+        import numpy as np
+
+        encoded = [(value or "").encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        valid = None
+        if any(value is None for value in values):
+            valid = np.asarray([value is not None for value in values], dtype=bool)
+        return cls(b"".join(encoded), offsets, valid)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if self.valid is not None and not self.valid[i]:
+            return None
+        return bytes(self.buffer[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class DictionaryColumn:
+    """A low-cardinality column: an int32 code per row (-1 for None) into a list of distinct values."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = list(values)
+
+    @classmethod
+    def from_values(cls, values):
+        import numpy as np
+
+        distinct = sorted({value for value in values if value is not None})
+        lookup = {value: code for code, value in enumerate(distinct)}
+        return cls(np.asarray([lookup.get(value, -1) for value in values], dtype=np.int32), distinct)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return None if code < 0 else self.values[code]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def compact_column(name, column):
+    """An array-backed copy of a list column (a DictionaryColumn for filter columns); array-backed ones are returned as is."""
+    if isinstance(column, (StringColumn, DictionaryColumn)):
+        return column
+    if name in FILTER_COLUMNS:
+        return DictionaryColumn.from_values(list(column))
+    return StringColumn.from_strings(list(column))
+
+
+class ChunkStore:
+    """Chunk texts and metadata as columns, with a precomputed row bitmap per filter value."""
+
+    def __init__(self, records=()):
+        self.columns = {name: [] for name in COLUMNS}
+        for record in records:
+            for name in COLUMNS:
+                self.columns[name].append(record.get(name))
+        self._index_bitmaps()
+
+    @classmethod
+    def from_columns(cls, columns):
+        """A store over ready-made columns (lists, StringColumns or DictionaryColumns), one per name in COLUMNS."""
+        store = cls.__new__(cls)
+        store.columns = {name: columns[name] for name in COLUMNS}
+        store._index_bitmaps()
+        return store
+
+    def _index_bitmaps(self):
+        import numpy as np
+
+        count = len(self.columns["text"])
+        self._bitmaps = {}
+        for name in FILTER_COLUMNS:
+            column = self.columns[name]
+            if isinstance(column, DictionaryColumn):
+                # One vectorised comparison per distinct value
+                for code, value in enumerate(column.values):
+                    self._bitmaps[(name, value)] = column.codes == code
+                continue
+            for row, value in enumerate(column):
+                if value is None:
+                    continue
+                bitmap = self._bitmaps.get((name, value))
+                if bitmap is None:
+                    bitmap = self._bitmaps[(name, value)] = np.zeros(count, dtype=bool)
+                bitmap[row] = True
+
+    @classmethod
+    def from_chunks(cls, chunks, sources=None):
+        """
+        Parses each chunk's header into array-backed columns.
+
+        `sources` is one source name for all chunks or one per chunk.
+        """
+        if sources is None or isinstance(sources, str):
+            sources = [sources] * len(chunks)
+        columns = {name: [] for name in COLUMNS}
+        for chunk, source in zip(chunks, sources):
+            record = parse_header(chunk, source)
+            for name in COLUMNS:
+                columns[name].append(record[name])
+        return cls.from_columns({name: compact_column(name, values) for name, values in columns.items()})
+
+    def __len__(self):
+        return len(self.columns["text"])
+
+    @property
+    def texts(self):
+        return self.columns["text"]
+
+    def row(self, i):
+        """One chunk's record as a dict."""
+        return {name: column[i] for name, column in self.columns.items()}
+
+    def values(self, column):
+        """The distinct values of a filterable column, sorted."""
+        return sorted(value for name, value in self._bitmaps if name == column)
+
+    def mask(self, where):
+        """
+        A boolean row mask for a filter, or None if the filter is empty.
+
+        `where` maps a column to a value or a list of values: values of one
+        column are OR-ed, columns are AND-ed.
+        """
+        import numpy as np
+
+        if not where:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        for column, wanted in where.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Can't filter on {column!r}; use one of {', '.join(FILTER_COLUMNS)}.")
+            if wanted is None or wanted == []:
+                continue
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            column_mask = np.zeros(len(self), dtype=bool)
+            for value in wanted:
+                bitmap = self._bitmaps.get((column, value))
+                if bitmap is not None:
+                    column_mask |= bitmap
+            mask &= column_mask
+        return mask
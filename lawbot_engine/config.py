@@ -0,0 +1,122 @@
+"""
+Configuration shared by every LawBot app.
+
+Reads the Gemini API key and the LAWBOT_* settings from the environment or
+a `.env` file. The file is looked up from the folder Streamlit was started
+in (each demo keeps its own `.env` next to its app.py) and then from the
+repository root, when this module is imported.
+"""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_env_loaded = False
+
+
+def _env_files():
+    """The nearest `.env` from the working folder upwards, then the repository root's."""
+    found = []
+    folder = os.getcwd()
+    while True:
+        path = os.path.join(folder, ".env")
+        if os.path.isfile(path):
+            found.append(path)
+            break
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            break
+        folder = parent
+    root_env = os.path.join(REPO_ROOT, ".env")
+    if os.path.isfile(root_env) and root_env not in found:
+        found.append(root_env)
+    return found
+
+
+def load_env():
+    """Loads `.env` files once per process (existing environment variables win)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    paths = _env_files()
+    if not paths:
+        return  # Nothing to load, so python-dotenv isn't even imported
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return  # python-dotenv is optional; plain environment variables still work
+    for path in paths:
+        load_dotenv(path)
+
+
+# The settings below read the environment, so a `.env` file must be loaded first
+load_env()
+
+GENERATION_MODEL = os.getenv("LAWBOT_GENERATION_MODEL", "gemini-1.5-flash")
+EMBEDDING_MODEL = os.getenv("LAWBOT_EMBEDDING_MODEL", "models/embedding-001")
+
+KNOWLEDGE_BASE_PATH = os.getenv(
+    "LAWBOT_KNOWLEDGE_BASE", os.path.join(REPO_ROOT, "vector-database", "knowledge_base.txt")
+)
+# Where `python -m lawbot_engine.shards build` writes the sharded vector store
+SHARD_DIR = os.getenv("LAWBOT_SHARD_DIR", os.path.join(REPO_ROOT, "vector-database", "shards"))
+SHARD_TIMEOUT_S = float(os.getenv("LAWBOT_SHARD_TIMEOUT_MS", "1000")) / 1000.0
+# An exported corpus (see corpus.py) to load the shared index from instead of
+# embedding the knowledge base again; off unless set
+CORPUS_DIR = os.getenv("LAWBOT_CORPUS_DIR")
+# Second-stage reranking (see rerank.py): how many first-stage candidates to
+# rescore, and how long rescoring may take before falling back to FAISS order
+RERANK_CANDIDATES = int(os.getenv("LAWBOT_RERANK_CANDIDATES", "20"))
+RERANK_BUDGET_S = float(os.getenv("LAWBOT_RERANK_BUDGET_MS", "50")) / 1000.0
+# Grounded answers on the Vector Database page (see grounding.py): the most
+# tokens of retrieved article sentences packed into the prompt
+RAG_CONTEXT_TOKENS = int(os.getenv("LAWBOT_RAG_CONTEXT_TOKENS", "200"))
+# Micro-batching of query embeddings (see batching.py): how long a query waits
+# for others to share its embedding call, the most queries in one batch, and
+# how many batches are embedded and searched at once
+BATCH_WINDOW_S = float(os.getenv("LAWBOT_BATCH_WINDOW_MS", "5")) / 1000.0
+BATCH_MAX = int(os.getenv("LAWBOT_BATCH_MAX", "32"))
+BATCH_WORKERS = int(os.getenv("LAWBOT_BATCH_WORKERS", "4"))
+# The longest an embedding call may take before it fails (and with it only its own batch)
+EMBED_TIMEOUT_S = float(os.getenv("LAWBOT_EMBED_TIMEOUT_MS", "10000")) / 1000.0
+
+# Bounded generation (see deadlines.py): the longest a user waits for a
+# complete answer before getting a fallback, how long the first attempt may
+# go without any text before a second one is raised against it (until there
+# are enough latency samples to use their p95 instead), and whether to hedge at all
+DEADLINE_S = float(os.getenv("LAWBOT_DEADLINE_MS", "20000")) / 1000.0
+HEDGE_AFTER_S = float(os.getenv("LAWBOT_HEDGE_AFTER_MS", "4000")) / 1000.0
+HEDGE = os.getenv("LAWBOT_HEDGE", "1").lower() not in ("", "0", "false", "no")
+
+# Chat mode (see conversation.py): token budgets for the recent turns kept
+# word for word, the rolling summary of older ones and the retrieved
+# articles, and how much a follow-up must share with the last question's
+# topic for those articles to be reused
+CHAT_HISTORY_TOKENS = int(os.getenv("LAWBOT_CHAT_HISTORY_TOKENS", "1200"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("LAWBOT_CHAT_SUMMARY_TOKENS", "250"))
+CHAT_CONTEXT_TOKENS = int(os.getenv("LAWBOT_CHAT_CONTEXT_TOKENS", "600"))
+CHAT_TOPIC_OVERLAP = float(os.getenv("LAWBOT_CHAT_TOPIC_OVERLAP", "0.3"))
+
+# Tracing (see tracing.py): a port for the Prometheus-style /metrics endpoint
+# and a file to append one JSON line per finished span to. Both are off unless set.
+METRICS_PORT = os.getenv("LAWBOT_METRICS_PORT")
+TRACE_LOG_PATH = os.getenv("LAWBOT_TRACE_LOG")
+
+# Offline mode (see fake.py): with LAWBOT_FAKE_GEMINI=1 every model and
+# embedding call goes to a deterministic local stand-in instead of Gemini.
+# Latencies are "fixed:<s>", "uniform:<low_s>:<high_s>" or "lognormal:<median_s>:<sigma>".
+FAKE_GEMINI = os.getenv("LAWBOT_FAKE_GEMINI", "").lower() not in ("", "0", "false", "no")
+FAKE_LATENCY = os.getenv("LAWBOT_FAKE_LATENCY", "fixed:0")
+FAKE_EMBED_LATENCY = os.getenv("LAWBOT_FAKE_EMBED_LATENCY", "fixed:0")
+FAKE_ERROR_RATE = float(os.getenv("LAWBOT_FAKE_ERROR_RATE", "0"))
+FAKE_RATE_LIMIT_RATE = float(os.getenv("LAWBOT_FAKE_429_RATE", "0"))
+FAKE_REQUESTS_PER_MINUTE = int(os.getenv("LAWBOT_FAKE_RPM", "0")) or None
+
+
+def get_api_key():
+    """Returns GEMINI_API_KEY (or None if it isn't set anywhere)."""
+    load_env()
+    key = os.getenv("GEMINI_API_KEY")
+    if not key and FAKE_GEMINI:
+        return "offline"  # The fake backend ignores the key, but apps check that one is set
+    return key
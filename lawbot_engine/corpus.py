@@ -0,0 +1,230 @@
+"""
+Export and import an embedded corpus as columnar files.
+
+A built VectorIndex (chunk texts, their metadata and their vectors) can be
+written to a directory and loaded back, on this machine or another one,
+without embedding anything again:
+
+    corpus/
+        manifest.json        count, dimension, embedding model, column layouts, source hashes
+        vectors.npy          float32 matrix, one row per chunk
+        text.bin             every chunk's text, UTF-8, back to back
+        text.offsets.npy     int64 offsets into text.bin (count + 1)
+        title.bin, ...       the same for the other free-text columns
+        act.codes.npy, ...   int32 codes into the manifest's list of values
+
+Loading memory-maps the files: the vectors go into FAISS with one bulk copy,
+texts are decoded only when a row is read, and the filter bitmaps come from
+vectorised comparisons on the code arrays. No Python object is created per
+chunk, so a large corpus loads in about the time it takes to read the
+vectors from disk.
+
+    python -m lawbot_engine.corpus export vector-database/knowledge_base*.txt --out corpus
+    python -m lawbot_engine.corpus info corpus
+    python -m lawbot_engine.corpus query corpus "Can I be arrested without a warrant?"
+
+With LAWBOT_CORPUS_DIR set, the shared index (retrieval.py) is loaded from
+that directory when it matches the knowledge base files and embedding model,
+and written there after it is built.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from lawbot_engine import config
+from lawbot_engine.chunkstore import (
+    COLUMNS, FILTER_COLUMNS, ChunkStore, DictionaryColumn, StringColumn, compact_column
+)
+
+FORMAT = "lawbot-corpus"
+VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, so a corpus can be matched to its source files on any machine."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- EXPORT ---
+
+def save_corpus(directory, store, vectors, embedding_model=None, sources=None):
+    """
+    Writes a ChunkStore and its vectors to `directory` and returns the manifest.
+
+    `sources` maps source file names to their digests (see file_digest), so
+    a loader can tell whether the corpus is still current.
+    """
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)  # Overwriting: the old manifest must not describe the new files
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "count": len(store),
+        "dimension": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "embedding_model": embedding_model or config.EMBEDDING_MODEL,
+        "sources": sources or {},
+        "columns": {},
+    }
+    np.save(os.path.join(directory, "vectors.npy"), vectors)
+
+    for name in COLUMNS:
+        column = compact_column(name, store.columns[name])
+        if name in FILTER_COLUMNS:
+            np.save(os.path.join(directory, f"{name}.codes.npy"), column.codes)
+            manifest["columns"][name] = {"layout": "dictionary", "values": column.values}
+        else:
+            with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+                f.write(column.buffer)
+            np.save(os.path.join(directory, f"{name}.offsets.npy"), column.offsets)
+            if column.valid is not None:
+                np.save(os.path.join(directory, f"{name}.valid.npy"), column.valid)
+            manifest["columns"][name] = {"layout": "strings", "nullable": column.valid is not None}
+
+    # The manifest goes last: a directory without one is an unfinished export
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def export_index(index, directory, sources=None):
+    """Writes a VectorIndex (see retrieval.py) to `directory`."""
+    return save_corpus(directory, index.store, index.vectors, index.embedding_model, sources)
+
+
+# --- IMPORT ---
+
+def load_manifest(directory):
+    """The manifest of an exported corpus, or None if `directory` doesn't hold one."""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+        raise ValueError(f"{directory} is not a version {VERSION} {FORMAT} directory.")
+    return manifest
+
+
+def load_store(directory, manifest=None):
+    """The exported ChunkStore, with every column memory-mapped."""
+    import numpy as np
+
+    manifest = manifest or load_manifest(directory)
+    columns = {}
+    for name, layout in manifest["columns"].items():
+        if layout["layout"] == "dictionary":
+            codes = np.load(os.path.join(directory, f"{name}.codes.npy"), mmap_mode="r")
+            columns[name] = DictionaryColumn(codes, layout["values"])
+        else:
+            path = os.path.join(directory, f"{name}.bin")
+            buffer = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else b""
+            offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r")
+            valid = None
+            if layout.get("nullable"):
+                valid = np.load(os.path.join(directory, f"{name}.valid.npy"), mmap_mode="r")
+            columns[name] = StringColumn(buffer, offsets, valid)
+    return ChunkStore.from_columns(columns)
+
+
+def load_vectors(directory):
+    """The vector column, memory-mapped (nothing is read until it is used)."""
+    import numpy as np
+
+    return np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+
+
+def load_index(directory):
+    """A VectorIndex over an exported corpus."""
+    from lawbot_engine.retrieval import VectorIndex
+
+    manifest = load_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No {MANIFEST} in {directory}; export a corpus there first.")
+    store = load_store(directory, manifest)
+    return VectorIndex(store.texts, load_vectors(directory), store, manifest["embedding_model"])
+
+
+def sources_of(paths):
+    """{file name: digest} for knowledge base files, as recorded in a manifest."""
+    return {os.path.basename(p): file_digest(p) for p in paths}
+
+
+def load_matching(directory, paths, embedding_model):
+    """
+    The exported index in `directory` if it was built from exactly these
+    files (by content) with this embedding model, else None.
+    """
+    manifest = load_manifest(directory) if directory else None
+    if manifest is None or manifest["embedding_model"] != embedding_model:
+        return None
+    if manifest["sources"] != sources_of(paths):
+        return None
+    return load_index(directory)
+
+
+# --- COMMAND LINE ---
+
+def _size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export, inspect or search an embedded LawBot corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Embed knowledge base files and write the corpus.")
+    export.add_argument("files", nargs="*", help="Knowledge base .txt files (default: LAWBOT_KNOWLEDGE_BASE).")
+    export.add_argument("--out", required=True)
+
+    info = commands.add_parser("info", help="Describe an exported corpus.")
+    info.add_argument("dir")
+
+    query = commands.add_parser("query", help="Search an exported corpus.")
+    query.add_argument("dir")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from lawbot_engine import retrieval
+
+        paths = [os.path.abspath(p) for p in args.files or [config.KNOWLEDGE_BASE_PATH]]
+        index = retrieval.get_shared_index(paths)
+        manifest = export_index(index, args.out, sources_of(paths))
+        print(f"Wrote {manifest['count']} chunks ({manifest['dimension']} dimensions) "
+              f"to {args.out}: {_size(args.out) / 1e6:.2f} MB")
+        return 0
+
+    started = time.perf_counter()
+    index = load_index(args.dir)
+    load_s = time.perf_counter() - started
+    if args.command == "info":
+        manifest = load_manifest(args.dir)
+        print(f"{manifest['count']} chunks, {manifest['dimension']} dimensions, {manifest['embedding_model']}")
+        print(f"{_size(args.dir) / 1e6:.2f} MB on disk, loaded in {load_s * 1000:.1f} ms")
+        for name in FILTER_COLUMNS:
+            print(f"  {name}: {', '.join(index.store.values(name)) or '-'}")
+        return 0
+
+    from lawbot_engine.embedding import get_embedding
+
+    for chunk, distance in index.search(get_embedding(args.text, index.embedding_model), args.k):
+        print(f"[{distance:.3f}] {chunk.splitlines()[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
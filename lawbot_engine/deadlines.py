@@ -0,0 +1,456 @@
+"""
+Answers with a deadline: hedged requests, then a fallback.
+
+A slow Gemini call used to hold the page behind a spinner for as long as it
+took. `generate` bounds that:
+
+1. The request is sent as usual (through generation.generate_structured).
+2. If no text has arrived by the time a first attempt usually has it (the
+   p95 of recent first-text latencies for that model, HEDGE_AFTER_MS until
+   there are enough samples), a second, identical request is sent. Whichever
+   starts answering first is streamed to the user; the other is cancelled.
+   If the one being streamed then fails, the other takes over (or a fresh
+   attempt is sent if it was already cancelled).
+3. If there is still no complete answer at the deadline (DEADLINE_MS), the
+   user gets a fallback instead: a cached answer to a similar earlier
+   question, or else an extractive answer built from the knowledge-base
+   passages that share the most words with the question. Both are local and
+   take milliseconds.
+
+Each request is sent with a timeout at the deadline (request_options), so
+an attempt that never answers gives up by itself instead of holding its
+thread. Every failed attempt is recorded by kind (a 429, a timeout or
+another error) on the answer, even when a hedge or fallback covered it.
+
+Streamed text is handed to `on_text` on the caller's thread, so it can be a
+Streamlit placeholder. `stats()` reports the hedge and fallback rates, and
+`latency_report()` compares the delivered time to first text with what the
+first attempt alone would have taken, to show how much of the tail hedging
+cuts off.
+"""
+import glob
+import math
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+from lawbot_engine import config, tracing
+from lawbot_engine.formatting import SECTION_TAGS
+from lawbot_engine.generation import generate_structured
+from lawbot_engine.rerank import tokens
+
+# First-text latencies kept per model for the hedge threshold
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+HEDGE_QUANTILE = 0.95
+
+# Failed attempts after which the fallback is served without waiting for the deadline
+MAX_FAILED_ATTEMPTS = 2
+
+# Earlier answers kept for the "similar question" fallback, and how similar is similar
+ANSWER_CACHE_SIZE = 256
+CACHE_SIMILARITY = 0.6
+
+# Knowledge-base passages quoted in an extractive fallback
+FALLBACK_PASSAGES = 2
+
+_lock = threading.Lock()
+_first_text = {}  # model name -> deque of first-attempt first-text seconds
+_answers = OrderedDict()  # (namespace, question) -> (question tokens, answer text)
+_passages = None  # [(tokens, passage)] from the knowledge base files
+_latencies = deque(maxlen=1000)  # [delivered first-text s, first attempt's first-text s or None]
+_stats = {
+    "requests": 0,
+    "hedged": 0,
+    "hedge_wins": 0,
+    "cache_fallbacks": 0,
+    "extractive_fallbacks": 0,
+    "deadline_misses": 0,
+    "rate_limited": 0,
+    "timeouts": 0,
+    "errors": 0,
+}
+_running = 0  # Attempt threads still waiting on the model
+
+
+class Cancelled(tracing.Cancelled):
+    """Raised inside a losing attempt to stop its stream; its generate span stays out of the histogram."""
+
+
+class BoundedAnswer:
+    """The outcome of `generate`: the answer shown and where it came from."""
+
+    __slots__ = ("text", "sections", "compliant", "attempts", "aborted", "wasted_tokens",
+                 "source", "hedged", "failures", "elapsed_s", "first_text_s")
+
+    def __init__(self, text, source, hedged, elapsed_s, first_text_s, answer=None, failures=()):
+        self.text = text
+        self.source = source  # "model", "cache" or "extractive"
+        self.hedged = hedged
+        self.failures = list(failures)  # "rate_limited", "timeout" or "error" per failed attempt
+        self.elapsed_s = elapsed_s
+        self.first_text_s = first_text_s
+        self.sections = answer.sections if answer else {}
+        self.compliant = answer.compliant if answer else True
+        self.attempts = answer.attempts if answer else 0
+        self.aborted = answer.aborted if answer else 0
+        self.wasted_tokens = answer.wasted_tokens if answer else 0
+
+    @property
+    def fallback(self):
+        return self.source != "model"
+
+
+# --- HEDGE THRESHOLD ---
+
+def _quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def hedge_after(model_name):
+    """Seconds to wait for the first text before sending a hedged request."""
+    with _lock:
+        samples = list(_first_text.get(model_name, ()))
+    if len(samples) < MIN_SAMPLES:
+        return config.HEDGE_AFTER_S
+    return _quantile(samples, HEDGE_QUANTILE)
+
+
+def _record_first_attempt(model_name, seconds):
+    with _lock:
+        _first_text.setdefault(model_name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+# --- FALLBACKS ---
+
+def _namespace(model, sections, app=None, context=None):
+    """
+    Answers are only reused within the same app and context, for the same
+    model, system prompt and sections (several apps share a model and prompt).
+    """
+    instruction = getattr(model, "system_instruction", None) or getattr(model, "_system_instruction", None)
+    return (app, context, getattr(model, "model_name", None), str(instruction), tuple(sections))
+
+
+def remember(namespace, question, text):
+    """Keeps a good answer for the similar-question fallback."""
+    with _lock:
+        _answers[(namespace, question)] = (tokens(question), text)
+        _answers.move_to_end((namespace, question))
+        while len(_answers) > ANSWER_CACHE_SIZE:
+            _answers.popitem(last=False)
+
+
+def cached_answer(namespace, question):
+    """The stored answer to the most similar earlier question (Jaccard over content words), or None."""
+    wanted = tokens(question)
+    if not wanted:
+        return None
+    best, best_score = None, CACHE_SIMILARITY
+    with _lock:
+        entries = [(words, text) for (ns, _), (words, text) in _answers.items() if ns == namespace]
+    for words, text in entries:
+        score = len(wanted & words) / len(wanted | words)
+        if score >= best_score:
+            best, best_score = text, score
+    return best
+
+
+def _knowledge_base_passages():
+    """Every knowledge-base passage with its content words, read once per process."""
+    global _passages
+    if _passages is None:
+        from lawbot_engine.retrieval import load_knowledge_base, split_chunks
+
+        folder = os.path.dirname(config.KNOWLEDGE_BASE_PATH)
+        paths = sorted(glob.glob(os.path.join(folder, "knowledge_base*.txt"))) or [config.KNOWLEDGE_BASE_PATH]
+        passages = []
+        for path in paths:
+            if os.path.exists(path):
+                passages.extend((tokens(chunk), chunk) for chunk in split_chunks(load_knowledge_base(path)))
+        _passages = passages
+    return _passages
+
+
+def extractive_answer(question, sections=SECTION_TAGS):
+    """An answer in the section format quoting the passages that share the most words with the question."""
+    wanted = tokens(question)
+    scored = sorted(((len(wanted & words), i) for i, (words, _) in enumerate(_knowledge_base_passages())),
+                    reverse=True)
+    passages = [_knowledge_base_passages()[i][1] for score, i in scored[:FALLBACK_PASSAGES] if score > 0]
+    if passages:
+        references = "; ".join(passage.splitlines()[0].rstrip(".") for passage in passages)
+        quoted = "\n\n".join("> " + passage.replace("\n", "\n> ") for passage in passages)
+    else:
+        references, quoted = "No matching passage was found in LawBot's knowledge base.", ""
+
+    bodies = {
+        "Reasoning Chain": "Skipped: LawBot's AI model did not answer in time.",
+        "Simplified Explanation": (
+            "LawBot's AI model did not answer in time, so this answer quotes the most relevant "
+            "passages from its legal knowledge base instead."
+        ),
+        "Legal Reference": references,
+        "Actionable Steps": (
+            "1. Read the passages below and check whether they match your situation.\n"
+            "2. Ask again in a minute for a full, personalised answer.\n"
+            "3. For urgent help, contact free legal aid (NALSA: 15100 in India)."
+        ),
+    }
+    text = "\n\n".join(f"**[{name}]:** {bodies.get(name, 'Not available in this quick answer.')}"
+                       for name in sections or SECTION_TAGS)
+    return text + ("\n\n" + quoted if quoted else "")
+
+
+def fallback_answer(namespace, question, sections, cache=True):
+    """(text, source) for when the model misses its deadline."""
+    text = cached_answer(namespace, question) if cache else None
+    if text is not None:
+        return text, "cache"
+    return extractive_answer(question, sections), "extractive"
+
+
+def describe(answer):
+    """A one-line note for the user when the answer isn't a fresh one from the model, else None."""
+    if answer.source == "cache":
+        return "⏱️ LawBot's AI model was too slow, so this is its earlier answer to a very similar question."
+    if answer.source == "extractive":
+        return "⏱️ LawBot's AI model was too slow, so this answer quotes the knowledge base directly."
+    return None
+
+
+# --- GENERATION ---
+
+def failure_kind(error):
+    """"rate_limited" for a 429, "timeout" for a request that ran out of time, else "error"."""
+    text = str(error)
+    if text.startswith("429"):
+        return "rate_limited"
+    if isinstance(error, TimeoutError) or text.startswith("504"):
+        return "timeout"
+    return "error"
+
+
+class _Attempt:
+    __slots__ = ("number", "started", "timeout_s", "first_text_s", "cancelled", "finished", "sample")
+
+    def __init__(self, number, timeout_s):
+        self.number = number
+        self.started = time.perf_counter()
+        self.timeout_s = timeout_s
+        self.first_text_s = None
+        self.cancelled = False
+        self.finished = False
+        self.sample = None  # The request's latency sample, for the first attempt's own time
+
+
+def generate(model, contents, sections=SECTION_TAGS, question=None, deadline_s=None, hedge=None,
+             on_text=None, app=None, context=None, cache=True, **kwargs):
+    """
+    Generates a structured answer within `deadline_s`, hedging a slow first attempt.
+
+    `question` is the user's question in their own words, used to find a
+    fallback answer among earlier answers from the same `app` and `context`
+    (e.g. the user's location). Pass `cache=False` when the answer depends on
+    more than that, like a follow-up in a chat: it is then neither stored
+    nor answered from the cache. Extra keyword arguments (e.g. `generation_config`) go
+    to generate_content. Returns a BoundedAnswer; it never raises for a
+    slow or failing model, it falls back instead and lists the failed
+    attempts in `failures`.
+    """
+    deadline_s = config.DEADLINE_S if deadline_s is None else deadline_s
+    hedge = config.HEDGE if hedge is None else hedge
+    model_name = getattr(model, "model_name", None)
+    namespace = _namespace(model, sections, app, context)
+    question = question or ""
+    events = queue.Queue()
+    attempts = []
+
+    def run(attempt, parent):
+        global _running
+
+        def forward(text):
+            if attempt.first_text_s is None:
+                attempt.first_text_s = time.perf_counter() - attempt.started
+                if attempt.number == 0:
+                    _record_first_attempt(model_name, attempt.first_text_s)
+                    with _lock:
+                        if attempt.sample is not None:
+                            attempt.sample[1] = attempt.first_text_s
+            if attempt.cancelled:
+                raise Cancelled()
+            events.put(("text", attempt, text))
+
+        # The request gives up at the deadline by itself, so an attempt stuck
+        # before its first text (where it can't be cancelled) frees its thread
+        options = dict(kwargs.get("request_options") or {})
+        options["timeout"] = min(options.get("timeout", math.inf), attempt.timeout_s)
+        try:
+            # The thread starts with no current span: join the request's trace
+            with tracing.attached(parent):
+                answer = generate_structured(model, contents, sections, on_text=forward,
+                                             **{**kwargs, "request_options": options})
+        except Cancelled:
+            events.put(("cancelled", attempt, None))
+        except Exception as e:
+            events.put(("error", attempt, e))
+        else:
+            events.put(("done", attempt, answer))
+        finally:
+            attempt.finished = True
+            with _lock:
+                _running -= 1
+
+    def launch():
+        global _running
+
+        attempt = _Attempt(len(attempts), max(0.0, deadline - time.perf_counter()))
+        attempts.append(attempt)
+        with _lock:
+            _running += 1
+        threading.Thread(target=run, args=(attempt, tracing.current_span()), name="lawbot-generate",
+                         daemon=True).start()
+
+    with tracing.span("bounded_generate", model=model_name, deadline_s=deadline_s) as span:
+        started = time.perf_counter()
+        deadline = started + deadline_s
+        hedge_at = started + hedge_after(model_name) if hedge else math.inf
+        launch()
+        winner, result, failures, delivered_first_text = None, None, [], None
+        ended, spare = set(), None  # Attempts that have stopped; a loser's finished answer
+
+        while result is None:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if winner is None and len(attempts) == 1 and now >= hedge_at:
+                launch()  # The first attempt is slower than usual: race a second one
+                continue
+            wake = deadline if winner is not None or len(attempts) > 1 else min(deadline, hedge_at)
+            try:
+                kind, attempt, payload = events.get(timeout=max(0.0, wake - now))
+            except queue.Empty:
+                continue
+            if kind == "text":
+                if winner is None:
+                    winner = attempt
+                    delivered_first_text = time.perf_counter() - started
+                    for other in attempts:
+                        other.cancelled = other is not attempt
+                if attempt is winner and on_text:
+                    on_text(payload)
+                continue
+            ended.add(attempt)
+            if kind == "done":
+                if winner is None or attempt is winner:
+                    result = (attempt, payload)
+                else:
+                    spare = (attempt, payload)
+                continue
+            if kind == "error":
+                failures.append(failure_kind(payload))
+                if attempt is winner:
+                    winner = None  # Let the other attempt (if any) take over
+                    for other in attempts:
+                        other.cancelled = False
+                    if spare is not None:
+                        result = spare
+                        continue
+            # An error or a cancelled loser: if nothing is left running, try again or give up
+            if winner is None and all(other in ended for other in attempts):
+                if hedge and len(failures) < MAX_FAILED_ATTEMPTS:
+                    launch()
+                else:
+                    break
+
+        if result is None:
+            # Errors that came in with the deadline, and attempts still waiting, ran out of time
+            while not events.empty():
+                kind, attempt, payload = events.get_nowait()
+                if kind == "error":
+                    failures.append(failure_kind(payload))
+            failures.extend("timeout" for attempt in attempts if not attempt.finished and not attempt.cancelled)
+        for attempt in attempts:
+            attempt.cancelled = True
+        elapsed = time.perf_counter() - started
+        hedged = len(attempts) > 1
+
+        if result is not None:
+            attempt, answer = result
+            if answer.compliant and question and cache:
+                remember(namespace, question, answer.text)
+            bounded = BoundedAnswer(answer.text, "model", hedged, elapsed,
+                                    delivered_first_text if delivered_first_text is not None else elapsed,
+                                    answer, failures)
+        else:
+            text, source = fallback_answer(namespace, question, sections, cache)
+            bounded = BoundedAnswer(text, source, hedged, elapsed, elapsed, failures=failures)
+            if on_text:
+                on_text(text)
+
+        span.set(source=bounded.source, hedged=hedged, attempts=len(attempts), failures=len(failures),
+                 hedge_won=result is not None and result[0].number > 0)
+
+    with _lock:
+        _stats["requests"] += 1
+        _stats["hedged"] += hedged
+        _stats["hedge_wins"] += result is not None and result[0].number > 0
+        _stats["cache_fallbacks"] += bounded.source == "cache"
+        _stats["extractive_fallbacks"] += bounded.source == "extractive"
+        _stats["deadline_misses"] += result is None and "timeout" in failures
+        _stats["rate_limited"] += failures.count("rate_limited")
+        _stats["timeouts"] += failures.count("timeout")
+        _stats["errors"] += failures.count("error")
+        # A cancelled first attempt fills in its own time when its first text arrives
+        attempts[0].sample = [bounded.first_text_s, attempts[0].first_text_s]
+        _latencies.append(attempts[0].sample)
+    return bounded
+
+
+# --- REPORTING ---
+
+def stats():
+    """Request, hedge, fallback and failed-attempt counts, with the hedge and fallback rates."""
+    with _lock:
+        counts = dict(_stats)
+        counts["attempts_running"] = _running
+    requests = counts["requests"] or 1
+    counts["hedge_rate"] = counts["hedged"] / requests
+    counts["fallback_rate"] = (counts["cache_fallbacks"] + counts["extractive_fallbacks"]) / requests
+    return counts
+
+
+def latency_report():
+    """
+    p50/p95/p99 time to first text as delivered, next to the first attempt's own.
+
+    The first attempt keeps running until its first text even when it loses,
+    so its latency is known unless it failed, gave up at the deadline or
+    hasn't answered yet; those requests count as the delivered time, which
+    makes the first-attempt figures a lower bound.
+    """
+    with _lock:
+        samples = [tuple(sample) for sample in _latencies]
+    if not samples:
+        return {}
+    delivered = [d for d, _ in samples]
+    first_attempt = [f if f is not None else d for d, f in samples]
+    report = {}
+    for q in (50, 95, 99):
+        report[f"p{q}_s"] = _quantile(delivered, q / 100)
+        report[f"first_attempt_p{q}_s"] = _quantile(first_attempt, q / 100)
+    report["samples"] = len(samples)
+    return report
+
+
+def reset():
+    """Forgets latency samples, cached answers and counters."""
+    with _lock:
+        _first_text.clear()
+        _answers.clear()
+        _latencies.clear()
+        for key in _stats:
+            _stats[key] = 0
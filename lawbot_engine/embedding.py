@@ -0,0 +1,101 @@
+"""
+Text embeddings through Gemini's embedding model.
+
+`google.generativeai` is only imported when the first embedding is
+requested, so pages that never embed anything don't pay for loading it.
+
+Embeddings are cached per process (least recently used entries are dropped
+past CACHE_SIZE), so the same text embedded on two pages, or by two users,
+costs one API call. Every call times out after EMBED_TIMEOUT_MS, so a hung
+request fails instead of blocking its caller.
+"""
+import threading
+from collections import OrderedDict
+
+from lawbot_engine import config, registry, tracing
+
+CACHE_SIZE = 4096
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "api_calls": 0}
+
+
+def _cache_get(key):
+    with _lock:
+        vector = _cache.get(key)
+        if vector is None:
+            _stats["misses"] += 1
+        else:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+        return vector
+
+
+def _cache_put(key, vector):
+    with _lock:
+        _cache[key] = vector
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def get_embedding(text, model=None):
+    """Generates an embedding for a given piece of text (None for blank text)."""
+    if not text or not text.strip():
+        return None
+    model = model or config.EMBEDDING_MODEL
+    with tracing.span("embed", model=model, chars=len(text)) as span:
+        vector = _cache_get((model, text))
+        span.set(cache_hit=vector is not None)
+        if vector is not None:
+            return vector
+
+        genai = registry.configure()
+        vector = genai.embed_content(
+            model=model, content=text, request_options={"timeout": config.EMBED_TIMEOUT_S}
+        )["embedding"]
+        with _lock:
+            _stats["api_calls"] += 1
+        _cache_put((model, text), vector)
+        return vector
+
+
+def get_embeddings(texts, model=None, report_misses=False):
+    """
+    Embeds several texts, sending only the uncached ones in one API call. Blank texts get None.
+
+    With `report_misses`, returns (vectors, number of texts sent to the API),
+    so callers can tell a real API call from an answer out of the cache.
+    """
+    model = model or config.EMBEDDING_MODEL
+    vectors = [None] * len(texts)
+    missing = []
+    for i, text in enumerate(texts):
+        if text and text.strip():
+            vectors[i] = _cache_get((model, text))
+            if vectors[i] is None:
+                missing.append(i)
+    if missing:
+        with tracing.span("embed_batch", model=model, texts=len(texts), misses=len(missing)):
+            genai = registry.configure()
+            result = genai.embed_content(model=model, content=[texts[i] for i in missing],
+                                         request_options={"timeout": config.EMBED_TIMEOUT_S})
+            with _lock:
+                _stats["api_calls"] += 1
+            for i, vector in zip(missing, result["embedding"]):
+                vectors[i] = vector
+                _cache_put((model, texts[i]), vector)
+    return (vectors, len(missing)) if report_misses else vectors
+
+
+def stats():
+    """Cache hits, misses, API calls and the number of cached vectors."""
+    with _lock:
+        return {**_stats, "cached": len(_cache)}
+
+
+def clear_cache():
+    """Forgets every cached embedding (the hit/miss counters are kept)."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,381 @@
+"""
+A deterministic, offline stand-in for Gemini.
+
+FakeGenerativeModel answers in LawBot's structured format when the prompt
+asks for it (and in plain prose when it doesn't), picks the law to cite from
+keywords in the question, and reports token usage the way the real SDK does.
+The same prompt and config always give the same answer, so harness runs can
+be compared across machines without network access or API quota.
+
+FakeBackend stands in for the whole `genai` module (`configure`,
+`GenerativeModel`, `embed_content`) and adds what a load test needs: latency
+drawn from a distribution, a share of failed calls, and 429s, either at
+random or from a requests-per-minute quota. Set LAWBOT_FAKE_GEMINI=1 to make
+the registry (and so every app) use it; see config.py for the other knobs.
+"""
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from lawbot_engine import config
+from lawbot_engine.prompting import contents_text, estimate_tokens
+
+# Keyword -> (plain-language summary, law to cite)
+LAW_TOPICS = [
+    (("fir", "police", "arrest", "complaint"), "You can ask the police to register your complaint as an FIR.", "Section 154 of the Code of Criminal Procedure, 1973."),
+    (("rti", "information"), "Any citizen can ask a public authority for information it holds.", "The Right to Information Act, 2005."),
+    (("refund", "defective", "consumer", "mrp", "shop"), "As a consumer you can demand a refund, replacement or repair.", "The Consumer Protection Act, 2019."),
+    (("cyber", "online", "social media", "harass"), "Online harassment is a punishable offence.", "The Information Technology Act, 2000."),
+    (("landlord", "tenant", "deposit", "rent"), "Your landlord must return the security deposit as agreed in the rent agreement.", "The Model Tenancy Act, 2021 and your State's rent control law."),
+    (("salary", "wages", "employer", "job"), "Your employer must pay wages on time and cannot make unlawful deductions.", "The Code on Wages, 2019."),
+]
+DEFAULT_TOPIC = ("The law protects your life and personal liberty.", "Article 21 of the Constitution of India.")
+
+STEPS = [
+    "Write down what happened, with dates, while it is fresh.",
+    "Collect documents, receipts, screenshots or other evidence.",
+    "Send a written notice to the other party and keep a copy.",
+    "Approach the nearest police station or the relevant authority.",
+    "Contact your District Legal Services Authority for free legal aid.",
+]
+
+
+class FakeResponse:
+    """Mimics the parts of a Gemini response the apps use: `.text` and `.usage_metadata`."""
+
+    def __init__(self, text, prompt_tokens, chunks=None, seconds_per_token=0.0):
+        self.text = text
+        self._chunks = chunks
+        self._seconds_per_token = seconds_per_token
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=estimate_tokens(text),
+            total_token_count=prompt_tokens + estimate_tokens(text),
+        )
+
+    def __iter__(self):
+        # With stream=True the SDK yields partial responses that each have `.text`
+        for chunk in self._chunks or [self.text]:
+            if self._seconds_per_token:
+                time.sleep(self._seconds_per_token * estimate_tokens(chunk))
+            yield SimpleNamespace(text=chunk)
+
+    def resolve(self):
+        return self
+
+
+class FakeGenerativeModel:
+    """Drop-in for `genai.GenerativeModel` that never touches the network."""
+
+    def __init__(self, model_name="gemini-1.5-flash", system_instruction=None, generation_config=None,
+                 base_latency=0.0, latency_per_token=0.0, format_drift_rate=0.0, backend=None):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = _as_dict(generation_config)
+        self.base_latency = base_latency
+        self.latency_per_token = latency_per_token
+        # Share of prompts (picked deterministically) answered in prose despite asking for the format
+        self.format_drift_rate = format_drift_rate
+        # A FakeBackend adds sampled latency, errors and rate limits to every call
+        self.backend = backend
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        delay = self.base_latency
+        if self.backend is not None:
+            delay += self.backend.before_call("generate")
+
+        # Like the SDK, a call slower than its request_options timeout gives up at the timeout
+        timeout = _as_dict(kwargs.get("request_options")).get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise _api_error(504)
+
+        gen_config = {**self.generation_config, **_as_dict(generation_config)}
+        prompt = contents_text(self.system_instruction, contents)
+        text = self._answer(prompt, _last_user_turn(contents), gen_config)
+
+        if stream:
+            # Time to the first chunk is the base latency; each chunk then takes its share of the rest
+            if delay:
+                time.sleep(delay)
+            return FakeResponse(text, estimate_tokens(prompt), _split_chunks(text), self.latency_per_token)
+        if delay or self.latency_per_token:
+            time.sleep(delay + self.latency_per_token * estimate_tokens(text))
+        return FakeResponse(text, estimate_tokens(prompt))
+
+    def _answer(self, prompt, question, gen_config):
+        seed = int(hashlib.sha256((prompt + repr(sorted(gen_config.items()))).encode("utf-8")).hexdigest(), 16)
+        lowered = question.lower()
+        summary, law = next(
+            ((s, l) for keywords, s, l in LAW_TOPICS if any(_mentions(lowered, k) for k in keywords)),
+            DEFAULT_TOPIC,
+        )
+        steps = STEPS[: 2 + seed % 4]
+
+        drifted = (seed >> 8) % 1000 < self.format_drift_rate * 1000
+        if "[Simplified Explanation]" not in prompt or drifted:
+            # Nothing asked for the structured format (or this answer "drifted"), so answer in prose.
+            return f"Sure! Here is some general information. {summary} This is covered by {law} " + " ".join(steps)
+
+        sections = []
+        if "[Reasoning Chain]" in prompt:
+            sections.append(
+                "**[Reasoning Chain]:**\n1. **Identify the core issue:** " + question[:120] + "\n"
+                "2. **Identify the relevant law:** " + law + "\n"
+                "3. **Structure the final answer:** I will now explain the rights and the steps."
+            )
+        sections.append("**[Simplified Explanation]:** " + summary)
+        sections.append("**[Legal Reference]:** " + law)
+        sections.append("**[Actionable Steps]:**\n" + "\n".join(f"{i}. {s}" for i, s in enumerate(steps, 1)))
+
+        # High temperatures make real models drift from the format now and then.
+        temperature = gen_config.get("temperature") or 0.0
+        if temperature > 0.7 and seed % 10 < int((temperature - 0.7) * 20):
+            sections.pop(len(sections) - 2)
+        return "\n\n".join(sections)
+
+
+def _as_dict(value):
+    # Accepts a plain dict or a genai.types.GenerationConfig
+    if not value:
+        return {}
+    if not isinstance(value, dict):
+        value = vars(value)
+    return {k: v for k, v in value.items() if v is not None}
+
+
+def _mentions(text, keyword):
+    # Short keywords ("fir", "rti") must be whole words; longer ones may be prefixes ("harass" -> "harassment")
+    pattern = rf"\b{re.escape(keyword)}\b" if len(keyword) <= 3 else rf"\b{re.escape(keyword)}"
+    return re.search(pattern, text) is not None
+
+
+def _last_user_turn(contents):
+    if isinstance(contents, str):
+        return contents
+    for turn in reversed(contents):
+        if turn.get("role", "user") == "user":
+            return " ".join(str(p) for p in turn.get("parts", []))
+    return ""
+
+
+def _split_chunks(text, size=40):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def model_factory(base_latency=0.0, latency_per_token=0.0, format_drift_rate=0.0):
+    """Returns a `get_model(model_name, system_instruction, generation_config)` that builds fakes."""
+    def get_model(model_name="gemini-1.5-flash", system_instruction=None, generation_config=None):
+        return FakeGenerativeModel(model_name, system_instruction, generation_config,
+                                   base_latency, latency_per_token, format_drift_rate)
+    return get_model
+
+
+# --- EMBEDDINGS ---
+EMBEDDING_DIMENSION = 768  # Same size as models/embedding-001
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def fake_embedding(text, model="models/embedding-001", dimension=EMBEDDING_DIMENSION):
+    """
+    A deterministic unit vector for `text`.
+
+    Each word (and pair of neighbouring words) is hashed onto a few
+    dimensions, so texts that share words come out closer than texts that
+    don't. That is enough for retrieval and similarity demos to behave
+    sensibly offline.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = [0.0] * dimension
+    for feature in features or [text]:
+        digest = hashlib.sha256(f"{model}|{feature}".encode("utf-8")).digest()
+        for i in range(0, 6, 2):
+            index = int.from_bytes(digest[i:i + 2], "big") % dimension
+            vector[index] += 1.0 if digest[i + 6] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+# --- LATENCY AND ERRORS ---
+
+class LatencyDistribution:
+    """Seeded latency samples (seconds): fixed, uniform(low, high) or lognormal(median, sigma)."""
+
+    KINDS = ("fixed", "uniform", "lognormal")
+
+    def __init__(self, kind="fixed", a=0.0, b=0.0, seed=0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r}; use one of {', '.join(self.KINDS)}.")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=0):
+        """Builds one from "fixed:0.2", "uniform:0.1:0.4" or "lognormal:0.3:0.5"."""
+        kind, _, rest = (spec or "fixed:0").partition(":")
+        values = [float(v) for v in rest.split(":") if v] if rest else []
+        values += [0.0] * (2 - len(values))
+        return cls(kind, values[0], values[1], seed)
+
+    def sample(self):
+        if self.kind == "fixed":
+            return self.a
+        with self._lock:
+            if self.kind == "uniform":
+                return self._rng.uniform(self.a, self.b)
+            return self.a * math.exp(self._rng.gauss(0.0, self.b))
+
+    def __repr__(self):
+        return f"{self.kind}:{self.a:g}:{self.b:g}"
+
+
+def _api_error(status):
+    """The exception the real SDK raises for a 429, 500 or 504 (google.api_core's, when installed)."""
+    message = {429: "Resource has been exhausted (e.g. check quota).",
+               500: "An internal error has occurred.",
+               504: "Deadline Exceeded"}[status]
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return FakeAPIError(status, message)
+    if status == 429:
+        return exceptions.ResourceExhausted(message)
+    if status == 504:
+        return exceptions.DeadlineExceeded(message)
+    return exceptions.InternalServerError(message)
+
+
+class FakeAPIError(Exception):
+    """Raised for injected failures when google.api_core isn't installed."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")  # Same wording as google.api_core's errors
+        self.code = code
+
+
+class FakeBackend:
+    """
+    A stand-in for the `genai` module with configurable latency, errors and 429s.
+
+    `error_rate` and `rate_limit_rate` are the shares of calls that fail with
+    a 500 or a 429. `requests_per_minute` adds a quota per call kind
+    ("generate", "embed") over a sliding minute, like Gemini's free tier.
+    """
+
+    def __init__(self, latency=None, embed_latency=None, latency_per_token=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, requests_per_minute=None, format_drift_rate=0.0,
+                 embedding_dimension=EMBEDDING_DIMENSION, seed=0):
+        self.latency = latency or LatencyDistribution(seed=seed)
+        self.embed_latency = embed_latency or LatencyDistribution(seed=seed + 1)
+        self.latency_per_token = latency_per_token
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.format_drift_rate = format_drift_rate
+        self.embedding_dimension = embedding_dimension
+        self._rng = random.Random(seed + 2)
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._stats = {"calls": 0, "errors": 0, "rate_limited": 0}
+
+    # The parts of the genai module LawBot uses
+
+    def configure(self, **kwargs):
+        pass
+
+    def GenerativeModel(self, model_name="gemini-1.5-flash", system_instruction=None, generation_config=None, **kwargs):
+        return FakeGenerativeModel(model_name, system_instruction, generation_config,
+                                   latency_per_token=self.latency_per_token,
+                                   format_drift_rate=self.format_drift_rate, backend=self)
+
+    def embed_content(self, model, content, task_type=None, title=None, output_dimensionality=None, **kwargs):
+        delay = self.before_call("embed")
+        timeout = _as_dict(kwargs.get("request_options")).get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise _api_error(504)
+        if delay:
+            time.sleep(delay)
+        dimension = output_dimensionality or self.embedding_dimension
+        if isinstance(content, str):
+            return {"embedding": fake_embedding(content, model, dimension)}
+        return {"embedding": [fake_embedding(text, model, dimension) for text in content]}
+
+    # Failure injection
+
+    def before_call(self, kind):
+        """Counts a call, raises an injected 429/500 if it's due, and returns the latency to add."""
+        now = time.monotonic()
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats[f"{kind}_calls"] = self._stats.get(f"{kind}_calls", 0) + 1
+            roll = self._rng.random()
+
+            status = None
+            if self.requests_per_minute:
+                window = self._windows.setdefault(kind, deque())
+                while window and now - window[0] >= 60.0:
+                    window.popleft()
+                if len(window) >= self.requests_per_minute:
+                    status = 429
+                else:
+                    window.append(now)
+            if status is None and roll < self.rate_limit_rate:
+                status = 429
+            elif status is None and roll < self.rate_limit_rate + self.error_rate:
+                status = 500
+
+            if status == 429:
+                self._stats["rate_limited"] += 1
+            elif status is not None:
+                self._stats["errors"] += 1
+
+        if status is not None:
+            raise _api_error(status)
+        return (self.embed_latency if kind == "embed" else self.latency).sample()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_from_config(seed=0):
+    """A FakeBackend set up from the LAWBOT_FAKE_* environment variables."""
+    return FakeBackend(
+        latency=LatencyDistribution.parse(config.FAKE_LATENCY, seed),
+        embed_latency=LatencyDistribution.parse(config.FAKE_EMBED_LATENCY, seed + 1),
+        error_rate=config.FAKE_ERROR_RATE,
+        rate_limit_rate=config.FAKE_RATE_LIMIT_RATE,
+        requests_per_minute=config.FAKE_REQUESTS_PER_MINUTE,
+        seed=seed,
+    )
+
+
+def get_backend():
+    """The process-wide fake backend (built from the environment on first use)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_config()
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the process-wide fake backend (e.g. with one tuned by the load generator)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,157 @@
+"""
+Memory footprint of the vector store, per session and per process.
+
+The Vector Database page used to give every browser session its own copy
+of the knowledge base: a `text_chunks` list of str and `embeddings` as
+lists of Python floats (a 24-byte float object plus an 8-byte list slot
+per value), so memory grew with every user. Now one VectorIndex per
+process holds the texts and metadata in array-backed columns (see
+chunkstore.py) and the vectors in one float32 matrix (4 bytes per value),
+and a session only holds a reference to it.
+
+This report builds each layout over a synthetic corpus and measures it
+with tracemalloc, at several user counts:
+
+- per-session lists: the old layout, one copy per session;
+- shared, list columns: one store per process, one Python object per field;
+- shared, compact: one store per process, array-backed (the current layout).
+
+Each layout also holds its index's own float32 copy of the vectors (FAISS
+keeps one), counted as a numpy matrix of the same size.
+
+    python -m lawbot_engine.footprint --chunks 500 --dimension 768 --users 1 5 20
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from lawbot_engine.chunkstore import ChunkStore, parse_header
+
+LAYOUTS = ("per-session lists", "shared, list columns", "shared, compact")
+
+
+def synthetic_corpus(count, dimension, seed=0):
+    """`count` knowledge-base style chunks and a float32 matrix of their (random) vectors."""
+    import numpy as np
+
+    acts = ["Constitution of India", "Constitution of Nepal", "Consumer Protection Act, 2019"]
+    chunks = [
+        f"Article {i + 1} of the {acts[i % len(acts)]}: Right number {i + 1}.\n"
+        f"Every person shall have the right described in article {i + 1}. "
+        "No law shall take this right away except by a procedure established by law, "
+        "and any person may approach a court to enforce it."
+        for i in range(count)
+    ]
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype("float32")
+    return chunks, vectors
+
+
+def _copy(text):
+    # A fresh str, as reading the file again in each session would give
+    return (text + " ")[:-1]
+
+
+def _build(layout, chunks, vectors=None):
+    """Builds one copy of a layout's data (just the texts and metadata without `vectors`)."""
+    import numpy as np
+
+    if layout == "per-session lists":
+        data = {"text_chunks": [_copy(chunk) for chunk in chunks]}
+        if vectors is not None:
+            data["embeddings"] = [row.tolist() for row in vectors]
+    elif layout == "shared, list columns":
+        data = {"store": ChunkStore(parse_header(_copy(chunk)) for chunk in chunks)}
+    else:
+        data = {"store": ChunkStore.from_chunks([_copy(chunk) for chunk in chunks])}
+    if vectors is not None:
+        data["index"] = np.array(vectors)
+    return data
+
+
+def _traced(build):
+    """(bytes still allocated after calling `build()`, its result)."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, result
+
+
+def measure(layout, chunks, vectors, user_counts):
+    """
+    {"texts": bytes for one copy of the texts and metadata, "session": bytes
+    per session, "process": bytes per process, "users": {n: total bytes}}.
+
+    Sessions are really created (up to the largest user count) and the
+    totals measured, not extrapolated from one session.
+    """
+    shared = layout != "per-session lists"
+    texts_bytes, _ = _traced(lambda: _build(layout, chunks))
+    process_bytes, store = _traced(lambda: _build(layout, chunks, vectors)) if shared else (0, None)
+    sessions, totals, session_bytes = [], {}, []
+    for users in sorted(user_counts):
+        while len(sessions) < users:
+            if shared:
+                size, session = _traced(lambda: {"index": store})  # A reference, like st.session_state
+            else:
+                size, session = _traced(lambda: _build(layout, chunks, vectors))
+            sessions.append(session)
+            session_bytes.append(size)
+        totals[users] = process_bytes + sum(session_bytes)
+    del sessions, store
+    gc.collect()
+    return {"texts": texts_bytes, "session": session_bytes[0] if session_bytes else 0,
+            "process": process_bytes, "users": totals}
+
+
+def report(count=500, dimension=768, user_counts=(1, 5, 20), seed=0):
+    """Measures every layout; returns {layout: measure(...)}."""
+    chunks, vectors = synthetic_corpus(count, dimension, seed)
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        return {layout: measure(layout, chunks, vectors, user_counts) for layout in LAYOUTS}
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+
+def _size(size):
+    return f"{size / 1e6:.2f} MB" if size >= 1e5 else f"{size / 1e3:.1f} kB"
+
+
+def format_report(results, user_counts):
+    users = sorted(user_counts)
+    header = f"{'layout':<22}{'texts+meta':>12}{'per session':>13}{'per process':>13}" + "".join(
+        f"{f'{n} users':>14}" for n in users
+    )
+    lines = [header, "-" * len(header)]
+    for layout, row in results.items():
+        lines.append(
+            f"{layout:<22}{_size(row['texts']):>12}{_size(row['session']):>13}{_size(row['process']):>13}"
+            + "".join(f"{_size(row['users'][n]):>14}" for n in users)
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the vector store's memory per session and per process.")
+    parser.add_argument("--chunks", type=int, default=500, help="Chunks in the synthetic corpus.")
+    parser.add_argument("--dimension", type=int, default=768, help="Embedding dimension (768 for embedding-001).")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 20], help="User counts to measure at.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = report(args.chunks, args.dimension, args.users, args.seed)
+    print(f"{args.chunks} chunks x {args.dimension} dimensions")
+    print(format_report(results, args.users))
+    before = results["per-session lists"]["users"][max(args.users)]
+    after = results["shared, compact"]["users"][max(args.users)]
+    print(f"At {max(args.users)} users: {_size(before)} before, {_size(after)} after ({before / after:.0f}x less)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Checks for LawBot's structured answer format.
+
+Every prompting app asks Gemini to answer with the bolded tags
+**[Simplified Explanation]:**, **[Legal Reference]:** and
+**[Actionable Steps]:** (plus **[Reasoning Chain]:** first in the
+chain-of-thought app). These helpers tell us whether an answer did that.
+"""
+import re
+
+SECTION_TAGS = ("Simplified Explanation", "Legal Reference", "Actionable Steps")
+COT_SECTION_TAGS = ("Reasoning Chain",) + SECTION_TAGS
+
+# Matches "**[Legal Reference]:**" and the looser "**[Legal Reference]**:" or "**[Legal Reference]**".
+TAG_PATTERN = re.compile(r"\*\*\[([A-Za-z ]+)\](?::\*\*|\*\*:?)")
+
+
+def find_tags(text):
+    """Returns (tag name, start offset, end offset) for every bolded section tag in the text."""
+    return [(m.group(1).strip(), m.start(), m.end()) for m in TAG_PATTERN.finditer(text or "")]
+
+
+def check_format(text, sections=SECTION_TAGS):
+    """
+    Reports whether the answer contains every expected section, in order.
+
+    Returns a dict with `compliant`, the `missing` section names and whether
+    the sections that are present appear `in_order`.
+    """
+    found = [name for name, _, _ in find_tags(text) if name in sections]
+    missing = [name for name in sections if name not in found]
+    expected_order = [name for name in sections if name in found]
+    seen = []
+    for name in found:
+        if name not in seen:
+            seen.append(name)
+    in_order = seen == expected_order
+    return {
+        "compliant": not missing and in_order,
+        "missing": missing,
+        "in_order": in_order,
+    }
+
+
+# --- STREAMING PARSER ---
+
+class StreamingSectionParser:
+    """
+    Checks the section structure of an answer while it is still streaming in.
+
+    Feed it chunks of text as they arrive. It splits the answer into
+    `sections` (tag name -> text so far) and sets `violation` as soon as the
+    answer clearly can't end up in the expected format:
+
+    - `no_section_tag`: too much text arrived before the first tag,
+    - `wrong_section`: a tag arrived out of order (or a section was skipped),
+    - `repeated_section`: a section tag appeared twice,
+    - `missing_sections`: the stream ended before every section appeared.
+
+    With no `sections` (free-form answers) the text is collected but never flagged.
+    """
+
+    def __init__(self, sections=SECTION_TAGS, max_preamble_chars=200):
+        self.expected = tuple(sections)
+        self.max_preamble_chars = max_preamble_chars
+        self.text = ""
+        self.sections = {}
+        self.violation = None
+        self._order = []
+        self._scan_pos = 0
+        self._body_start = None
+
+    @property
+    def current(self):
+        """The section currently being written, or None before the first tag."""
+        return self._order[-1] if self._order else None
+
+    @property
+    def complete(self):
+        """True once every expected section has started and nothing went wrong."""
+        return self.violation is None and len(self._order) == len(self.expected)
+
+    def feed(self, chunk):
+        """Adds a chunk of streamed text. Returns the violation (or None)."""
+        if not chunk:
+            return self.violation
+        self.text += chunk
+        if self.violation:
+            return self.violation  # Keep the text, but stop checking
+
+        for match in TAG_PATTERN.finditer(self.text, self._scan_pos):
+            name = match.group(1).strip()
+            if name not in self.expected:
+                continue  # Some other bolded tag; treat it as part of the current section
+            self._close_current(match.start())
+            if name in self._order:
+                self.violation = "repeated_section"
+                return self.violation
+            if name != self.expected[len(self._order)]:
+                self.violation = "wrong_section"
+                return self.violation
+            self._order.append(name)
+            self.sections[name] = ""
+            self._body_start = match.end()
+            self._scan_pos = match.end()
+
+        if not self._order and self.expected and len(self.text.strip()) > self.max_preamble_chars:
+            self.violation = "no_section_tag"
+        elif self._order:
+            self.sections[self.current] = self._section_text(len(self.text))
+        return self.violation
+
+    def close(self):
+        """Call when the stream ends. Returns the violation (or None)."""
+        if self.violation is None and len(self._order) < len(self.expected):
+            self.violation = "missing_sections" if self._order else "no_section_tag"
+        return self.violation
+
+    def _close_current(self, end):
+        if self._order:
+            self.sections[self.current] = self._section_text(end)
+
+    def _section_text(self, end):
+        return self.text[self._body_start:end].lstrip(":").strip()
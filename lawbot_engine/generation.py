@@ -0,0 +1,151 @@
+"""
+Generation helpers shared by the prompting apps.
+
+`generate_structured` streams an answer through StreamingSectionParser and
+cancels it as soon as it clearly breaks LawBot's section format, then asks
+again with a corrective instruction. That way a malformed answer is caught
+after a few dozen tokens instead of being shown to the user, who would
+otherwise click again and pay for a second full answer anyway.
+"""
+import threading
+import time
+
+from lawbot_engine import tracing
+from lawbot_engine.formatting import SECTION_TAGS, StreamingSectionParser
+from lawbot_engine.prompting import contents_text, estimate_tokens
+
+DEFAULT_MAX_RETRIES = 1
+
+CORRECTIVE_INSTRUCTION = (
+    "\n\nIMPORTANT: Your answer must use exactly these bolded sections, in this order, "
+    "starting with the first one and with nothing before it: {tags}."
+)
+
+_lock = threading.Lock()
+_stats = {
+    "generations": 0,
+    "attempts": 0,
+    "aborted_attempts": 0,
+    "corrective_retries": 0,
+    "wasted_output_tokens": 0,
+    "final_format_failures": 0,
+}
+
+
+class StructuredAnswer:
+    """The outcome of `generate_structured`."""
+
+    __slots__ = ("text", "sections", "compliant", "violation", "attempts", "aborted", "wasted_tokens")
+
+    def __init__(self, text, sections, compliant, violation, attempts, aborted, wasted_tokens):
+        self.text = text
+        self.sections = sections
+        self.compliant = compliant
+        self.violation = violation
+        self.attempts = attempts
+        self.aborted = aborted
+        self.wasted_tokens = wasted_tokens
+
+
+def corrective_contents(contents, sections):
+    """Re-issues the same conversation with a format reminder added to the user's last turn."""
+    tags = ", ".join(f"**[{name}]:**" for name in sections)
+    last = contents[-1]
+    parts = list(last.get("parts", [])) + [CORRECTIVE_INSTRUCTION.format(tags=tags)]
+    return list(contents[:-1]) + [{**last, "parts": parts}]
+
+
+def _stream_attempt(model, contents, parser, on_text, stop_on_violation, **kwargs):
+    """
+    Streams one attempt into the parser, stopping early on a format violation if asked to.
+
+    Returns the seconds until the first text arrived (None if none did).
+    """
+    started = time.perf_counter()
+    first_text_s = None
+    response = model.generate_content(contents, stream=True, **kwargs)
+    try:
+        for chunk in response:
+            try:
+                piece = chunk.text
+            except (ValueError, AttributeError):
+                continue  # e.g. a chunk that only carries safety ratings
+            if first_text_s is None:
+                first_text_s = time.perf_counter() - started
+            if parser.feed(piece) and stop_on_violation:
+                break
+            if on_text:
+                on_text(parser.text)
+    finally:
+        # Dropping out of the loop is what cancels the stream; close it if we can.
+        close = getattr(response, "close", None)
+        if callable(close):
+            close()
+    parser.close()
+    return first_text_s
+
+
+def generate_structured(model, contents, sections=SECTION_TAGS, max_retries=DEFAULT_MAX_RETRIES,
+                        on_text=None, **kwargs):
+    """
+    Generates an answer that follows the section format, retrying if it diverges.
+
+    `on_text` is called with the text so far as it streams (e.g. a Streamlit
+    placeholder's `markdown`). Extra keyword arguments such as
+    `generation_config` are passed to `generate_content`. If every attempt
+    breaks the format, the last one is returned with `compliant=False`.
+    """
+    attempt_contents = contents
+    aborted = 0
+    wasted = 0
+    parser = None
+
+    with tracing.span("generate", model=getattr(model, "model_name", None)) as span:
+        for attempt in range(1, max_retries + 2):
+            # The last attempt is never cut short: a complete but imperfect answer
+            # is more useful to the user than a truncated one.
+            can_retry = attempt <= max_retries
+            parser = StreamingSectionParser(sections)
+            first_text_s = _stream_attempt(model, attempt_contents, parser, on_text, can_retry, **kwargs)
+            if attempt == 1:
+                span.set(first_text_s=first_text_s)
+            with _lock:
+                _stats["attempts"] += 1
+
+            if parser.violation is None or not can_retry:
+                break
+            aborted += 1
+            wasted += estimate_tokens(parser.text)
+            attempt_contents = corrective_contents(contents, sections)
+
+        span.set(
+            attempts=attempt,
+            input_tokens=estimate_tokens(contents_text(None, contents)),
+            output_tokens=estimate_tokens(parser.text),
+            wasted_tokens=wasted,
+            violation=parser.violation,
+        )
+
+    compliant = parser.violation is None
+    with _lock:
+        _stats["generations"] += 1
+        _stats["aborted_attempts"] += aborted
+        _stats["corrective_retries"] += aborted
+        _stats["wasted_output_tokens"] += wasted
+        _stats["final_format_failures"] += 0 if compliant else 1
+
+    return StructuredAnswer(
+        text=parser.text,
+        sections=dict(parser.sections),
+        compliant=compliant,
+        violation=parser.violation,
+        attempts=attempt,
+        aborted=aborted,
+        wasted_tokens=wasted,
+    )
+
+
+def stats():
+    """Counters for aborted attempts, corrective retries and tokens thrown away."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,230 @@
+"""
+Offline evaluation and load harness for LawBot's prompting strategies.
+
+Runs a file of questions through every app folder that has a prompts.py
+(zero-shot, one-shot, multi-shot, dynamic-shot, chain-of-thought and the
+sampling apps) concurrently, and reports per strategy:
+
+- latency percentiles,
+- input and output tokens,
+- how often the **[Simplified Explanation]:** / **[Legal Reference]:** /
+  **[Actionable Steps]:** structure was followed.
+
+By default it runs against the deterministic fake model in
+lawbot_engine.fake, so it needs no network and gives the same numbers on
+every machine. Pass --live to hit Gemini instead.
+
+    python -m lawbot_engine.harness questions.txt --concurrency 8 --repeat 3
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lawbot_engine import deadlines, generation, prompting
+from lawbot_engine.fake import model_factory
+from lawbot_engine.formatting import check_format
+
+DEFAULT_QUESTIONS = [
+    {"question": "What are the steps to file an FIR?"},
+    {"question": "What is RTI?"},
+    {"question": "My landlord is not returning my security deposit", "details": "I moved out 45 days ago."},
+    {"question": "The shopkeeper charged more than MRP", "details": "The MRP was Rs. 100 but I was charged Rs. 120."},
+    {"question": "Someone is harassing me on social media"},
+    {"question": "My employer has not paid my salary for two months"},
+]
+
+
+# --- INPUT ---
+
+def load_questions(path):
+    """
+    Reads questions from a .txt file (one per line) or a .jsonl file.
+
+    JSON lines may carry "question", and optionally "location" and "details".
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if path.endswith(".jsonl"):
+        return [json.loads(line) for line in lines]
+    return [{"question": line} for line in lines]
+
+
+def load_strategies(names=None, root=prompting.REPO_ROOT):
+    """Loads prompts.py from each app folder, keyed by folder name."""
+    strategies = {}
+    for app_dir in prompting.discover_prompt_dirs(root):
+        name = os.path.basename(app_dir)
+        if names and name not in names:
+            continue
+        strategies[name] = prompting.load_prompts(app_dir)
+    return strategies
+
+
+# --- RUNNING ---
+
+def run_one(name, prompts, question, get_model, guard=False, bounded=False):
+    """
+    Sends one question through one strategy and measures it.
+
+    With `guard`, the answer is streamed through generation.generate_structured,
+    which aborts and re-asks when the format breaks. With `bounded` as well,
+    it goes through deadlines.generate, like the apps: a slow answer is
+    hedged, and one past the deadline is replaced by a fallback.
+    """
+    location = question.get("location") or getattr(prompts, "DEFAULT_LOCATION", None)
+    final_prompt = prompts.build_prompt(question["question"], location, question.get("details", ""))
+    contents = prompting.build_contents(prompts.EXAMPLES, final_prompt)
+    model = get_model(
+        system_instruction=prompts.SYSTEM_PROMPT,
+        generation_config=getattr(prompts, "GENERATION_CONFIG", None),
+    )
+
+    start = time.perf_counter()
+    response, answer, text, error = None, None, "", None
+    try:
+        if guard and bounded:
+            sections = prompts.SECTIONS if getattr(prompts, "ENFORCE_FORMAT", True) else ()
+            answer = deadlines.generate(model, contents, sections, question=question["question"], app=name,
+                                        context=location)
+            text = answer.text
+        elif guard and getattr(prompts, "ENFORCE_FORMAT", True):
+            answer = generation.generate_structured(model, contents, prompts.SECTIONS)
+            text = answer.text
+        else:
+            response = model.generate_content(contents)
+            text = response.text
+    except Exception as e:
+        error = str(e)
+    latency = time.perf_counter() - start
+
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if input_tokens is None:
+        attempts = answer.attempts if answer else 1
+        input_tokens = attempts * prompting.estimate_tokens(prompting.contents_text(prompts.SYSTEM_PROMPT, contents))
+    if output_tokens is None:
+        output_tokens = prompting.estimate_tokens(text) + (answer.wasted_tokens if answer else 0)
+
+    return {
+        "strategy": name,
+        "question": question["question"],
+        "latency_s": latency,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "format_ok": check_format(text, prompts.SECTIONS)["compliant"] and error is None,
+        "retries": answer.aborted if answer else 0,
+        "wasted_tokens": answer.wasted_tokens if answer else 0,
+        "error": error,
+        "source": answer.source if bounded and answer else None,
+        # Failed attempts by kind, including ones a hedge or fallback covered
+        "failures": answer.failures if bounded and answer else [deadlines.failure_kind(error)] if error else [],
+    }
+
+
+def run_harness(questions, strategies, get_model, concurrency=8, repeat=1, guard=False, bounded=False):
+    """Runs every (strategy, question) pair `repeat` times on a thread pool and returns the raw results."""
+    jobs = [
+        (name, prompts, question)
+        for _ in range(repeat)
+        for name, prompts in strategies.items()
+        for question in questions
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(lambda job: run_one(*job, get_model, guard or bounded, bounded), jobs))
+
+
+# --- REPORTING ---
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(results):
+    """Aggregates raw results into one row per strategy."""
+    summary = {}
+    for name in sorted({r["strategy"] for r in results}):
+        rows = [r for r in results if r["strategy"] == name]
+        latencies = [r["latency_s"] * 1000 for r in rows]
+        summary[name] = {
+            "runs": len(rows),
+            "errors": sum(1 for r in rows if r["error"]),
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "avg_input_tokens": sum(r["input_tokens"] for r in rows) / len(rows),
+            "avg_output_tokens": sum(r["output_tokens"] for r in rows) / len(rows),
+            "format_ok_rate": sum(1 for r in rows if r["format_ok"]) / len(rows),
+            "retries": sum(r["retries"] for r in rows),
+            "wasted_tokens": sum(r["wasted_tokens"] for r in rows),
+            "fallbacks": sum(1 for r in rows if r["source"] not in (None, "model")),
+            "failed_attempts": sum(len(r["failures"]) for r in rows),
+        }
+    return summary
+
+
+def format_table(summary):
+    """Renders the summary as a plain-text table."""
+    header = f"{'strategy':<28}{'runs':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'in tok':>8}{'out tok':>9}{'format':>8}{'retries':>9}{'wasted':>8}"
+    lines = [header, "-" * len(header)]
+    for name, s in summary.items():
+        lines.append(
+            f"{name:<28}{s['runs']:>6}{s['errors']:>5}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}"
+            f"{s['avg_input_tokens']:>8.0f}{s['avg_output_tokens']:>9.0f}{s['format_ok_rate']:>8.0%}{s['retries']:>9}{s['wasted_tokens']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare LawBot's prompting strategies offline.")
+    parser.add_argument("questions", nargs="?", help="A .txt (one question per line) or .jsonl file. Defaults to a built-in set.")
+    parser.add_argument("--strategy", action="append", help="Only run this app folder (can be repeated).")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=1, help="Run each question this many times.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake model: fixed latency per call.")
+    parser.add_argument("--latency-per-token-ms", type=float, default=0.0, help="Fake model: extra latency per output token.")
+    parser.add_argument("--format-drift", type=float, default=0.0, help="Fake model: share of answers that break the format (0-1).")
+    parser.add_argument("--guard", action="store_true", help="Stream answers through the format guard (abort and re-ask on violations).")
+    parser.add_argument("--bounded", action="store_true", help="Like the apps: the format guard plus a deadline, hedging and fallbacks (implies --guard).")
+    parser.add_argument("--live", action="store_true", help="Call Gemini instead of the fake model (needs GEMINI_API_KEY).")
+    parser.add_argument("--json", dest="json_path", help="Also write raw results and the summary to this file.")
+    args = parser.parse_args(argv)
+
+    questions = load_questions(args.questions) if args.questions else DEFAULT_QUESTIONS
+    strategies = load_strategies(args.strategy)
+    if not strategies:
+        parser.error("No matching app folders with a prompts.py were found.")
+
+    if args.live:
+        from lawbot_engine import registry
+        registry.configure()
+        get_model = registry.get_model
+    else:
+        get_model = model_factory(args.latency_ms / 1000.0, args.latency_per_token_ms / 1000.0, args.format_drift)
+
+    results = run_harness(questions, strategies, get_model, args.concurrency, args.repeat, args.guard, args.bounded)
+    summary = summarize(results)
+    print(format_table(summary))
+    if args.bounded:
+        fallbacks = sum(s["fallbacks"] for s in summary.values())
+        failed = sum(s["failed_attempts"] for s in summary.values())
+        print(f"bounded: {fallbacks} fallback answers, {failed} failed attempts (hedged or covered by a fallback)")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Import-time budget check for the engine.
+
+Imports every engine module in a fresh interpreter and fails if that takes
+longer than the budget, or if it drags in one of the heavy libraries that
+should only load on first use. Run it after touching imports:
+
+    python -m lawbot_engine.importcheck
+"""
+import json
+import subprocess
+import sys
+
+import lawbot_engine
+
+# Importing the whole engine should cost next to nothing on top of Python itself
+BUDGET_MS = 150
+
+# Libraries that must not be loaded just by importing the engine (python-dotenv
+# is allowed: config loads `.env` at import, and only imports it if a file exists)
+HEAVY_MODULES = ("numpy", "faiss", "google.generativeai", "streamlit")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__("lawbot_engine." + name)
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(modules=None, repeats=3):
+    """Imports the modules in fresh interpreters and returns the fastest run's result."""
+    modules = list(modules or lawbot_engine.__all__)
+    probe = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=lawbot_engine.config.REPO_ROOT,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r["elapsed_ms"])
+
+
+def main():
+    result = measure()
+    print(f"Importing lawbot_engine: {result['elapsed_ms']:.1f} ms (budget {BUDGET_MS} ms)")
+    failed = False
+    if result["elapsed_ms"] > BUDGET_MS:
+        print("FAIL: import time is over budget.")
+        failed = True
+    if result["loaded"]:
+        print("FAIL: heavy modules loaded at import time: " + ", ".join(result["loaded"]))
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
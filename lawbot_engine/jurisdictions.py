@@ -0,0 +1,542 @@
+"""
+Where is the user, and which helplines apply there?
+
+The prompting apps ask for a location in free text ("Bangalore", "noida",
+"Kathmandu", "Tamilnadu", "Maharastra", "Nasik"...), down to the district. Instead of asking the model
+to work out the state and guess helpline numbers (spending tokens and
+sometimes inventing numbers), `resolve` maps the text to a known place
+locally, and `helplines_for` returns the helplines for it from a fixed
+table. The same input always gives the same helplines.
+
+The index is built once at import, in memory:
+
+- every place name and alias, normalised, in a dict for exact lookups,
+- an inverted index from character trigrams to names for fuzzy lookups:
+  a misspelling shares most of its trigrams with the right name, so only
+  names sharing a trigram are scored (Dice coefficient on trigram sets).
+
+Abbreviations (aliases written in capitals in the tables, like "UP" or
+"TN") only match when the text has them in capitals too, so "pick me up"
+doesn't name Uttar Pradesh. Place names that are also ordinary words
+("Sagar", "Mustang") only match in free text when capitalised. Names with digits ("Province 1") only match
+exactly.
+
+A lookup takes microseconds; no network call is made.
+
+    >>> place = resolve("bangalore")
+    >>> place.name, place.region, place.country
+    ('Bengaluru', 'Karnataka', 'India')
+"""
+import re
+
+# Minimum trigram similarity for a fuzzy match. Common misspellings score
+# 0.67 and up ("pokhra", "guwahti", "banglore"); ordinary words that look a
+# bit like a place score lower ("parsed" vs "Parsa" 0.62). Misspellings that
+# score lower still ("kerela" 0.57) are listed as aliases instead.
+MIN_SIMILARITY = 0.65
+
+# Names shorter than this only match exactly (fuzzy "bank" would match "Banke")
+MIN_FUZZY_LENGTH = 5
+
+# Longest run of words tried as one place name ("dadra and nagar haveli and daman and diu")
+MAX_NAME_WORDS = 7
+
+
+# --- PLACES ---
+# (name, aliases) for states, UTs and provinces; (name, region, aliases)
+# for cities and districts, where region is their state, UT or province.
+
+INDIA_STATES = [
+    ("Andhra Pradesh", ["AP", "Andhra"]),
+    ("Arunachal Pradesh", ["Arunachal"]),
+    ("Assam", ["Asam"]),
+    ("Bihar", []),
+    ("Chhattisgarh", ["Chattisgarh", "Chhatisgarh"]),
+    ("Goa", []),
+    ("Gujarat", ["Gujrat"]),
+    ("Haryana", []),
+    ("Himachal Pradesh", ["HP", "Himachal"]),
+    ("Jharkhand", ["Jharkand"]),
+    ("Karnataka", ["Karnatka"]),
+    ("Kerala", ["Keralam", "Kerela"]),
+    ("Madhya Pradesh", ["MP"]),
+    ("Maharashtra", ["Maharastra", "Maharashtr"]),
+    ("Manipur", []),
+    ("Meghalaya", []),
+    ("Mizoram", []),
+    ("Nagaland", []),
+    ("Odisha", ["Orissa", "Orrisa", "Orisa"]),
+    ("Punjab", []),
+    ("Rajasthan", ["Rajastan"]),
+    ("Sikkim", []),
+    ("Tamil Nadu", ["TN", "Tamilnadu"]),
+    ("Telangana", ["Telengana"]),
+    ("Tripura", []),
+    ("Uttar Pradesh", ["UP"]),
+    ("Uttarakhand", ["Uttaranchal", "Uttrakhand"]),
+    ("West Bengal", ["WB", "Bengal"]),
+]
+
+INDIA_UTS = [
+    ("Andaman and Nicobar Islands", ["Andaman", "Andaman and Nicobar"]),
+    ("Chandigarh", []),
+    ("Dadra and Nagar Haveli and Daman and Diu", ["Dadra and Nagar Haveli", "Daman and Diu", "DNHDD"]),
+    ("Delhi", ["New Delhi", "NCT of Delhi", "Dilli", "NCR"]),
+    ("Jammu and Kashmir", ["J&K", "JK", "Kashmir"]),
+    ("Ladakh", []),
+    ("Lakshadweep", []),
+    ("Puducherry", ["Pondicherry", "Pondy"]),
+]
+
+INDIA_CITIES = [
+    ("Mumbai", "Maharashtra", ["Bombay", "Mumbay"]),
+    ("Pune", "Maharashtra", ["Poona"]),
+    ("Nagpur", "Maharashtra", []),
+    ("Thane", "Maharashtra", []),
+    ("Bengaluru", "Karnataka", ["Bangalore"]),
+    ("Mysuru", "Karnataka", ["Mysore"]),
+    ("Chennai", "Tamil Nadu", ["Madras"]),
+    ("Coimbatore", "Tamil Nadu", []),
+    ("Madurai", "Tamil Nadu", []),
+    ("Kolkata", "West Bengal", ["Calcutta", "Kolkatta"]),
+    ("Howrah", "West Bengal", []),
+    ("Siliguri", "West Bengal", []),
+    ("Hyderabad", "Telangana", []),
+    ("Warangal", "Telangana", []),
+    ("Visakhapatnam", "Andhra Pradesh", ["Vizag"]),
+    ("Vijayawada", "Andhra Pradesh", []),
+    ("Ahmedabad", "Gujarat", ["Amdavad", "Ahemdabad"]),
+    ("Surat", "Gujarat", []),
+    ("Vadodara", "Gujarat", ["Baroda"]),
+    ("Jaipur", "Rajasthan", ["Jaypur"]),
+    ("Jodhpur", "Rajasthan", []),
+    ("Udaipur", "Rajasthan", []),
+    ("Lucknow", "Uttar Pradesh", ["Lukhnow", "Lakhnau"]),
+    ("Kanpur", "Uttar Pradesh", []),
+    ("Varanasi", "Uttar Pradesh", ["Banaras", "Benares"]),
+    ("Prayagraj", "Uttar Pradesh", ["Allahabad"]),
+    ("Agra", "Uttar Pradesh", []),
+    ("Noida", "Uttar Pradesh", ["Gautam Buddh Nagar"]),
+    ("Ghaziabad", "Uttar Pradesh", []),
+    ("Gurugram", "Haryana", ["Gurgaon", "Gurgoan"]),
+    ("Faridabad", "Haryana", []),
+    ("Patna", "Bihar", []),
+    ("Bhopal", "Madhya Pradesh", []),
+    ("Indore", "Madhya Pradesh", []),
+    ("Raipur", "Chhattisgarh", []),
+    ("Ranchi", "Jharkhand", []),
+    ("Bhubaneswar", "Odisha", ["Bhubaneshwar"]),
+    ("Cuttack", "Odisha", []),
+    ("Guwahati", "Assam", ["Gauhati"]),
+    ("Thiruvananthapuram", "Kerala", ["Trivandrum"]),
+    ("Kochi", "Kerala", ["Cochin", "Ernakulam"]),
+    ("Ludhiana", "Punjab", []),
+    ("Amritsar", "Punjab", []),
+    ("Mohali", "Punjab", ["SAS Nagar"]),
+    ("Shimla", "Himachal Pradesh", ["Simla"]),
+    ("Dehradun", "Uttarakhand", []),
+    ("Panaji", "Goa", ["Panjim"]),
+    ("Srinagar", "Jammu and Kashmir", []),
+    ("Jammu", "Jammu and Kashmir", []),
+    ("Leh", "Ladakh", []),
+    ("Shillong", "Meghalaya", []),
+    ("Imphal", "Manipur", []),
+    ("Aizawl", "Mizoram", []),
+    ("Kohima", "Nagaland", []),
+    ("Agartala", "Tripura", []),
+    ("Gangtok", "Sikkim", []),
+    ("Itanagar", "Arunachal Pradesh", []),
+    ("Port Blair", "Andaman and Nicobar Islands", ["Sri Vijaya Puram"]),
+    ("Kavaratti", "Lakshadweep", []),
+    ("Silvassa", "Dadra and Nagar Haveli and Daman and Diu", []),
+]
+
+NEPAL_PROVINCES = [
+    ("Koshi", ["Koshi Province", "Province 1", "Province No. 1"]),
+    ("Madhesh", ["Madhesh Province", "Madhes", "Province 2", "Province No. 2"]),
+    ("Bagmati", ["Bagmati Province", "Province 3"]),
+    ("Gandaki", ["Gandaki Province", "Province 4"]),
+    ("Lumbini", ["Lumbini Province", "Province 5"]),
+    ("Karnali", ["Karnali Province", "Province 6"]),
+    ("Sudurpashchim", ["Sudurpaschim", "Far West", "Far Western", "Province 7"]),
+]
+
+NEPAL_CITIES = [
+    ("Kathmandu", "Bagmati", ["Kathmandu Valley", "KTM"]),
+    ("Lalitpur", "Bagmati", ["Patan"]),
+    ("Bhaktapur", "Bagmati", []),
+    ("Chitwan", "Bagmati", ["Bharatpur"]),
+    ("Hetauda", "Bagmati", ["Makwanpur"]),
+    ("Biratnagar", "Koshi", ["Morang"]),
+    ("Dharan", "Koshi", ["Sunsari"]),
+    ("Ilam", "Koshi", []),
+    ("Janakpur", "Madhesh", ["Janakpurdham", "Dhanusha"]),
+    ("Birgunj", "Madhesh", ["Parsa"]),
+    ("Pokhara", "Gandaki", ["Kaski"]),
+    ("Butwal", "Lumbini", ["Rupandehi"]),
+    ("Bhairahawa", "Lumbini", ["Siddharthanagar"]),
+    ("Nepalgunj", "Lumbini", ["Banke"]),
+    ("Birendranagar", "Karnali", ["Surkhet"]),
+    ("Dhangadhi", "Sudurpashchim", ["Kailali"]),
+    ("Mahendranagar", "Sudurpashchim", ["Kanchanpur", "Bhimdatta"]),
+]
+
+# Districts by state, UT or province: "Name/Alias/Alias, ...". A district
+# whose name is already taken (a city, or a district of the same name listed
+# earlier, e.g. Aurangabad in Bihar) keeps the first meaning.
+INDIA_DISTRICTS = {
+    "Andhra Pradesh": "Anantapur/Anantapuramu, Chittoor, East Godavari/Rajahmundry/Rajamahendravaram, Guntur, "
+                      "Kadapa/YSR Kadapa/Cuddapah, Kurnool, Nellore, Prakasam/Ongole, Srikakulam, Vizianagaram, "
+                      "West Godavari/Eluru, Krishna/Machilipatnam, Tirupati, Kakinada, Nandyal, Anakapalli",
+    "Arunachal Pradesh": "Tawang, West Kameng, East Kameng, Papum Pare, Lower Subansiri/Ziro, Upper Subansiri, "
+                         "West Siang, East Siang/Pasighat, Lohit/Tezu, Changlang, Tirap, Namsai",
+    "Assam": "Baksa, Barpeta, Bongaigaon, Cachar/Silchar, Darrang, Dhemaji, Dhubri, Dibrugarh, Goalpara, Golaghat, "
+             "Hailakandi, Jorhat, Kamrup, Kamrup Metropolitan, Karbi Anglong, Karimganj, Kokrajhar, Lakhimpur, "
+             "Morigaon, Nagaon, Nalbari, Sivasagar/Sibsagar, Sonitpur/Tezpur, Tinsukia, Udalguri, Majuli, Dima Hasao",
+    "Bihar": "Araria, Arwal, Banka, Begusarai, Bhagalpur, Bhojpur/Arrah, Buxar, Darbhanga, East Champaran/Motihari, "
+             "Gaya, Gopalganj, Jamui, Jehanabad, Kaimur, Katihar, Khagaria, Kishanganj, Lakhisarai, Madhepura, "
+             "Madhubani, Munger, Muzaffarpur, Nalanda/Bihar Sharif, Nawada, Purnia, Rohtas/Sasaram, Saharsa, "
+             "Samastipur, Saran/Chapra, Sheikhpura, Sheohar, Sitamarhi, Siwan, Supaul, Vaishali/Hajipur, "
+             "West Champaran/Bettiah",
+    "Chhattisgarh": "Bastar/Jagdalpur, Bilaspur, Durg/Bhilai, Dantewada, Janjgir-Champa, Jashpur, Kanker, "
+                    "Kabirdham/Kawardha, Korba, Koriya, Mahasamund, Raigarh, Rajnandgaon, Surguja/Ambikapur, "
+                    "Dhamtari, Balod, Bemetara",
+    "Goa": "North Goa/Mapusa, South Goa/Margao/Madgaon/Vasco da Gama",
+    "Gujarat": "Amreli, Anand, Banaskantha/Palanpur, Bharuch, Bhavnagar, Dahod, Gandhinagar, Jamnagar, Junagadh, "
+               "Kutch/Kachchh/Bhuj, Kheda/Nadiad, Mehsana, Narmada/Rajpipla, Navsari, Panchmahal/Godhra, Porbandar, "
+               "Rajkot, Sabarkantha/Himmatnagar, Surendranagar, Tapi/Vyara, Valsad/Vapi, Morbi, Gir Somnath/Veraval, "
+               "Botad, Devbhumi Dwarka, Aravalli/Modasa, Mahisagar/Lunawada, Chhota Udaipur",
+    "Haryana": "Ambala, Bhiwani, Charkhi Dadri, Fatehabad, Hisar/Hissar, Jhajjar, Jind, Kaithal, Karnal, Kurukshetra, "
+               "Mahendragarh/Narnaul, Nuh/Mewat, Palwal, Panchkula, Panipat, Rewari, Rohtak, Sirsa, Sonipat/Sonepat, "
+               "Yamunanagar",
+    "Himachal Pradesh": "Chamba, Hamirpur, Kangra/Dharamshala/Dharamsala, Kinnaur, Kullu/Manali, Lahaul and Spiti, "
+                        "Mandi, Solan, Sirmaur/Nahan, Una",
+    "Jharkhand": "Bokaro, Chatra, Deoghar, Dhanbad, Dumka, East Singhbhum/Jamshedpur, Garhwa, Giridih, Godda, Gumla, "
+                 "Hazaribagh, Jamtara, Khunti, Koderma, Latehar, Lohardaga, Pakur, Palamu/Daltonganj, Ramgarh, "
+                 "Sahibganj, Seraikela Kharsawan, Simdega, West Singhbhum/Chaibasa",
+    "Karnataka": "Bagalkot, Ballari/Bellary, Belagavi/Belgaum, Bidar, Chamarajanagar, Chikkaballapur, "
+                 "Chikkamagaluru/Chikmagalur, Chitradurga, Dakshina Kannada/Mangaluru/Mangalore, Davanagere, "
+                 "Dharwad/Hubballi/Hubli, Gadag, Hassan, Haveri, Kalaburagi/Gulbarga, Kodagu/Coorg/Madikeri, Kolar, "
+                 "Koppal, Mandya, Raichur, Ramanagara, Shivamogga/Shimoga, Tumakuru/Tumkur, Udupi, "
+                 "Uttara Kannada/Karwar, Vijayapura/Bijapur, Yadgir",
+    "Kerala": "Alappuzha/Alleppey, Idukki, Kannur/Cannanore, Kasaragod, Kollam/Quilon, Kottayam, Kozhikode/Calicut, "
+              "Malappuram, Palakkad/Palghat, Pathanamthitta, Thrissur/Trichur, Wayanad",
+    "Madhya Pradesh": "Balaghat, Betul, Bhind, Chhatarpur, Chhindwara, Damoh, Datia, Dewas, Dhar, Dindori, Guna, "
+                      "Gwalior, Harda, Jabalpur, Jhabua, Katni, Khandwa, Khargone, Mandla, Mandsaur, Morena, "
+                      "Narmadapuram/Hoshangabad, Neemuch, Panna, Raisen, Rajgarh, Ratlam, Rewa, Sagar, Satna, Sehore, "
+                      "Seoni, Shahdol, Shajapur, Shivpuri, Sidhi, Singrauli, Tikamgarh, Ujjain, Umaria, Vidisha",
+    "Maharashtra": "Ahmednagar/Ahilyanagar, Akola, Amravati, Aurangabad/Chhatrapati Sambhajinagar, Beed, Bhandara, "
+                   "Buldhana, Chandrapur, Dhule, Gadchiroli, Gondia, Hingoli, Jalgaon, Jalna, Kolhapur, Latur, Nanded, "
+                   "Nandurbar, Nashik/Nasik, Osmanabad/Dharashiv, Palghar, Parbhani, Raigad/Alibag, Ratnagiri, Sangli, "
+                   "Satara, Sindhudurg, Solapur/Sholapur, Wardha, Washim, Yavatmal, Navi Mumbai, Kalyan",
+    "Manipur": "Bishnupur, Chandel, Churachandpur, Imphal East, Imphal West, Senapati, Tamenglong, Thoubal, Ukhrul",
+    "Meghalaya": "East Khasi Hills, West Garo Hills/Tura, Jaintia Hills/Jowai, Ri Bhoi",
+    "Mizoram": "Lunglei, Champhai, Kolasib, Serchhip, Mamit, Lawngtlai, Saiha",
+    "Nagaland": "Dimapur, Mokokchung, Phek, Tuensang, Wokha, Zunheboto",
+    "Odisha": "Angul, Balangir/Bolangir, Balasore/Baleswar, Bargarh, Bhadrak, Boudh, Deogarh, Dhenkanal, Gajapati, "
+              "Ganjam/Berhampur/Brahmapur, Jagatsinghpur, Jajpur, Jharsuguda, Kalahandi/Bhawanipatna, "
+              "Kandhamal/Phulbani, Kendrapara, Keonjhar/Kendujhar, Khordha/Khurda, Koraput, Malkangiri, "
+              "Mayurbhanj/Baripada, Nabarangpur, Nayagarh, Nuapada, Puri, Rayagada, Sambalpur, Subarnapur/Sonepur, "
+              "Sundargarh/Rourkela",
+    "Punjab": "Barnala, Bathinda/Bhatinda, Faridkot, Fatehgarh Sahib, Fazilka, Ferozepur/Firozpur, Gurdaspur, "
+              "Hoshiarpur, Jalandhar/Jullundur, Kapurthala, Mansa, Moga, Muktsar/Sri Muktsar Sahib, Pathankot, "
+              "Patiala, Rupnagar/Ropar, Sangrur, Nawanshahr/Shaheed Bhagat Singh Nagar, Tarn Taran, Malerkotla",
+    "Rajasthan": "Ajmer, Alwar, Banswara, Baran, Barmer, Bhilwara, Bikaner, Bundi, Chittorgarh, Churu, Dausa, Dholpur, "
+                 "Dungarpur, Hanumangarh, Jaisalmer, Jalore, Jhalawar, Jhunjhunu, Karauli, Kota, Nagaur, Pali, "
+                 "Pratapgarh, Rajsamand, Sawai Madhopur, Sikar, Sirohi, Sri Ganganagar/Ganganagar, Tonk",
+    "Sikkim": "East Sikkim, West Sikkim/Gyalshing, North Sikkim/Mangan, South Sikkim/Namchi",
+    "Tamil Nadu": "Ariyalur, Chengalpattu, Cuddalore, Dharmapuri, Dindigul, Erode, Kallakurichi, Kanchipuram, "
+                  "Kanyakumari/Nagercoil, Karur, Krishnagiri, Nagapattinam, Namakkal, Nilgiris/Ooty/Udhagamandalam, "
+                  "Perambalur, Pudukkottai, Ramanathapuram/Rameswaram, Ranipet, Salem, Sivaganga, Tenkasi, "
+                  "Thanjavur/Tanjore, Theni, Thoothukudi/Tuticorin, Tiruchirappalli/Trichy, Tirunelveli, Tirupattur, "
+                  "Tiruppur, Tiruvallur, Tiruvannamalai, Tiruvarur, Vellore, Viluppuram/Villupuram, Virudhunagar",
+    "Telangana": "Adilabad, Bhadradri Kothagudem, Jagtial, Jangaon, Kamareddy, Karimnagar, Khammam, Mahabubnagar, "
+                 "Mancherial, Medak, Medchal, Nalgonda, Nizamabad, Nirmal, Peddapalli, Rangareddy/Ranga Reddy, "
+                 "Sangareddy, Siddipet, Suryapet, Vikarabad, Wanaparthy, Yadadri Bhuvanagiri",
+    "Tripura": "Dhalai, Gomati, North Tripura/Dharmanagar, South Tripura/Belonia, Unakoti, Khowai, Sepahijala, "
+               "West Tripura",
+    "Uttar Pradesh": "Aligarh, Ambedkar Nagar, Amethi, Amroha, Auraiya, Ayodhya/Faizabad, Azamgarh, Baghpat, Bahraich, "
+                     "Ballia, Balrampur, Banda, Barabanki, Bareilly, Basti, Bijnor, Budaun/Badaun, Bulandshahr, "
+                     "Chandauli, Chitrakoot, Deoria, Etah, Etawah, Farrukhabad, Fatehpur, Firozabad, Gonda, "
+                     "Gorakhpur, Hapur, Hardoi, Hathras, Jalaun/Orai, Jaunpur, Jhansi, Kannauj, Kanpur Dehat, "
+                     "Kasganj, Kaushambi, Kushinagar, Lakhimpur Kheri/Kheri, Maharajganj, Mahoba, Mainpuri, "
+                     "Mathura/Vrindavan, Mau, Meerut, Mirzapur, Moradabad, Muzaffarnagar, Pilibhit, Raebareli/Rae Bareli, "
+                     "Rampur, Saharanpur, Sambhal, Sant Kabir Nagar, Bhadohi/Sant Ravidas Nagar, Shahjahanpur, Shamli, "
+                     "Shravasti, Siddharthnagar, Sitapur, Sonbhadra, Sultanpur, Unnao",
+    "Uttarakhand": "Almora, Bageshwar, Chamoli, Champawat, Haridwar/Hardwar, Nainital/Haldwani, Pauri Garhwal/Pauri, "
+                   "Pithoragarh, Rudraprayag, Tehri Garhwal/Tehri, Udham Singh Nagar/Rudrapur, Uttarkashi",
+    "West Bengal": "Alipurduar, Bankura, Birbhum/Suri, Cooch Behar/Koch Bihar, Dakshin Dinajpur/Balurghat, "
+                   "Darjeeling/Darjiling, Hooghly/Hugli/Chinsurah, Jalpaiguri, Jhargram, Kalimpong, "
+                   "Malda/Maldah/English Bazar, Murshidabad/Baharampur, Nadia/Krishnanagar, North 24 Parganas/Barasat, "
+                   "Paschim Bardhaman/Asansol/Durgapur, Purba Bardhaman/Bardhaman/Burdwan, Paschim Medinipur/Midnapore, "
+                   "Purba Medinipur/Tamluk/Haldia, Purulia, South 24 Parganas, Uttar Dinajpur/Raiganj",
+    "Delhi": "Central Delhi/Tis Hazari, North Delhi, South Delhi/Saket, East Delhi/Karkardooma, West Delhi, "
+             "North East Delhi, North West Delhi/Rohini, South West Delhi/Dwarka, South East Delhi, Shahdara",
+    "Jammu and Kashmir": "Anantnag, Bandipora, Baramulla, Budgam, Doda, Ganderbal, Kathua, Kishtwar, Kulgam, Kupwara, "
+                         "Poonch, Pulwama, Rajouri, Ramban, Reasi, Samba, Shopian, Udhampur",
+    "Ladakh": "Kargil",
+    "Puducherry": "Karaikal, Mahe, Yanam",
+    "Dadra and Nagar Haveli and Daman and Diu": "Daman, Diu",
+}
+
+NEPAL_DISTRICTS = {
+    "Koshi": "Bhojpur, Dhankuta, Jhapa/Birtamod, Khotang, Okhaldhunga, Panchthar, Sankhuwasabha, Solukhumbu, "
+             "Taplejung, Terhathum, Udayapur",
+    "Madhesh": "Bara/Kalaiya, Mahottari, Rautahat, Saptari/Rajbiraj, Sarlahi, Siraha",
+    "Bagmati": "Dhading, Dolakha, Kavrepalanchok/Kavre/Dhulikhel, Nuwakot, Ramechhap, Rasuwa, Sindhuli, "
+               "Sindhupalchok",
+    "Gandaki": "Baglung, Gorkha, Lamjung, Manang, Mustang, Myagdi, Nawalpur, Parbat, Syangja, Tanahun/Damauli",
+    "Lumbini": "Arghakhanchi, Bardiya/Gulariya, Dang Deukhuri/Ghorahi/Tulsipur, Gulmi, Kapilvastu, Parasi, Palpa/Tansen, "
+               "Pyuthan, Rolpa, Eastern Rukum",
+    "Karnali": "Dailekh, Dolpa, Humla, Jajarkot, Jumla, Kalikot, Mugu, Salyan, Western Rukum",
+    "Sudurpashchim": "Achham, Baitadi, Bajhang, Bajura, Dadeldhura, Darchula, Doti",
+}
+
+# Place names that are also everyday words or given names ("Sagar", "Anand",
+# "Mustang"). In free text (fuzzy=False) they only match when capitalised.
+COMMON_WORD_NAMES = {"anand", "banda", "bara", "basti", "guna", "krishna", "mandi", "mustang", "nadia", "panna",
+                     "sagar", "samba"}
+
+COUNTRIES = [("India", ["Bharat", "Hindustan"]), ("Nepal", [])]
+
+
+# --- HELPLINES ---
+# (name, number, topics). A helpline with no topics is always shown; one
+# with topics only when the legal issue mentions one of them.
+
+NATIONAL_HELPLINES = {
+    "India": [
+        ("Emergency (police, fire, ambulance)", "112", ()),
+        ("NALSA free legal aid", "15100", ()),
+        ("Women Helpline", "181", ("woman", "women", "wife", "husband", "dowry", "harassment", "domestic", "abuse", "stalking")),
+        ("Police Women Helpline", "1091", ("woman", "women", "harassment", "stalking", "molest", "assault")),
+        ("Child Helpline", "1098", ("child", "children", "minor", "school", "son", "daughter")),
+        ("Cyber Crime Helpline", "1930", ("cyber", "online", "fraud", "upi", "scam", "hacked", "otp", "phishing")),
+        ("National Consumer Helpline", "1915", ("consumer", "refund", "defective", "product", "seller", "shop", "warranty")),
+        ("Elder Line", "14567", ("elder", "elderly", "senior", "parent", "parents", "pension")),
+    ],
+    "Nepal": [
+        ("Nepal Police", "100", ()),
+        ("National Women Commission", "1145", ("woman", "women", "wife", "husband", "dowry", "harassment", "domestic", "abuse", "violence")),
+        ("Child Helpline", "1098", ("child", "children", "minor", "school", "son", "daughter")),
+        ("Tourist Police", "1144", ("tourist", "travel", "trekking", "hotel")),
+    ],
+}
+
+
+class Place:
+    """A resolved location."""
+
+    __slots__ = ("name", "kind", "region", "country", "matched", "score")
+
+    def __init__(self, name, kind, region, country, matched=None, score=1.0):
+        self.name = name
+        self.kind = kind  # "country", "state", "ut", "province", "city" or "district"
+        self.region = region  # State, UT or province (None for a country)
+        self.country = country
+        self.matched = matched  # The words of the input that matched
+        self.score = score  # 1.0 for an exact match, else the trigram similarity
+
+    @property
+    def label(self):
+        """The place with its state or province, e.g. "Bengaluru, Karnataka"."""
+        if self.region and self.region != self.name:
+            return f"{self.name}, {self.region}"
+        return self.name
+
+    def __repr__(self):
+        return f"Place({self.label!r}, {self.country!r}, kind={self.kind!r}, score={self.score:.2f})"
+
+
+# --- INDEX ---
+
+_WORD_PATTERN = re.compile(r"[a-z0-9&]+")
+_DIGIT_PATTERN = re.compile(r"\d")
+
+
+def normalize(text):
+    """Lowercase words only, so "New  Delhi," and "new delhi" are the same key."""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+def trigrams(text):
+    """The character trigrams of a normalised name, padded so word edges count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _places():
+    """Every (alias, Place) pair in the tables above."""
+    for name, aliases in COUNTRIES:
+        place = Place(name, "country", None, name)
+        for alias in [name] + aliases:
+            yield alias, place
+    for kind, table in (("state", INDIA_STATES), ("ut", INDIA_UTS)):
+        for name, aliases in table:
+            place = Place(name, kind, name, "India")
+            for alias in [name] + aliases:
+                yield alias, place
+    for name, aliases in NEPAL_PROVINCES:
+        place = Place(name, "province", name, "Nepal")
+        for alias in [name] + aliases:
+            yield alias, place
+    for country, table in (("India", INDIA_CITIES), ("Nepal", NEPAL_CITIES)):
+        for name, region, aliases in table:
+            place = Place(name, "city", region, country)
+            for alias in [name] + aliases:
+                yield alias, place
+    for country, table in (("India", INDIA_DISTRICTS), ("Nepal", NEPAL_DISTRICTS)):
+        for region, entries in table.items():
+            for entry in entries.split(","):
+                name, *aliases = [part.strip() for part in entry.split("/")]
+                place = Place(name, "district", region, country)
+                for alias in [name] + aliases:
+                    yield alias, place
+
+
+class JurisdictionIndex:
+    """Exact and trigram lookups over place names and their aliases."""
+
+    def __init__(self, entries):
+        self.exact = {}  # normalised alias -> Place
+        self.abbreviations = set()  # normalised aliases that must be written in capitals
+        self.common_words = set()  # normalised aliases that must be capitalised in free text
+        self.grams = {}  # normalised alias -> its trigram set
+        self.postings = {}  # trigram -> [normalised aliases]
+        for alias, place in entries:
+            key = normalize(alias)
+            if key in self.exact:
+                continue  # The first entry wins: "Chandigarh" the UT, not a city
+            self.exact[key] = place
+            if key in COMMON_WORD_NAMES:
+                self.common_words.add(key)
+            if alias.isupper():
+                self.abbreviations.add(key)
+            elif len(key) >= MIN_FUZZY_LENGTH and not _DIGIT_PATTERN.search(key):
+                grams = trigrams(key)
+                self.grams[key] = grams
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(key)
+
+    def lookup(self, key, fuzzy=True):
+        """The best (alias, similarity) for one normalised name, or (None, 0.0)."""
+        if key in self.exact:
+            return key, 1.0
+        if not fuzzy or len(key) < MIN_FUZZY_LENGTH or _DIGIT_PATTERN.search(key):
+            return None, 0.0
+        query = trigrams(key)
+        shared = {}
+        for gram in query:
+            for alias in self.postings.get(gram, ()):
+                shared[alias] = shared.get(alias, 0) + 1
+        best, best_score = None, 0.0
+        for alias, count in shared.items():
+            score = 2.0 * count / (len(query) + len(self.grams[alias]))
+            if score > best_score:
+                best, best_score = alias, score
+        if best_score < MIN_SIMILARITY:
+            return None, 0.0
+        return best, best_score
+
+    def resolve(self, text, fuzzy=True):
+        """
+        The most specific place named in `text`, or None.
+
+        Every run of up to MAX_NAME_WORDS words is looked up, so "Andheri,
+        Mumbai" and "I live in noida" both resolve. Exact matches beat fuzzy
+        ones, then cities beat states and states beat countries, then
+        longer names beat shorter ones. With `fuzzy=False` only exact names
+        and aliases match (for free text that isn't a location field).
+        """
+        lowered = text.lower()
+        spans = [m.span() for m in _WORD_PATTERN.finditer(lowered)]
+        words = [lowered[a:b] for a, b in spans]
+        # The words as written, to tell "UP" from "up" (lower() rarely changes a string's length)
+        written = [text[a:b] for a, b in spans] if len(lowered) == len(text) else words
+        candidates = []
+        for start in range(len(words)):
+            for end in range(start + 1, min(len(words), start + MAX_NAME_WORDS) + 1):
+                key = " ".join(words[start:end])
+                alias, score = self.lookup(key, fuzzy)
+                if alias in self.abbreviations and not " ".join(written[start:end]).isupper():
+                    continue
+                if not fuzzy and alias in self.common_words and not written[start][:1].isupper():
+                    continue
+                if alias is not None:
+                    candidates.append((score, _SPECIFICITY[self.exact[alias].kind], end - start, key, alias))
+        if not candidates:
+            return None
+        score, _, _, matched, alias = max(candidates, key=lambda c: (c[0] == 1.0, c[1], c[0], c[2]))
+        place = self.exact[alias]
+        return Place(place.name, place.kind, place.region, place.country, matched, score)
+
+
+_SPECIFICITY = {"country": 0, "state": 1, "ut": 1, "province": 1, "city": 2, "district": 2}
+_UT_NAMES = {name for name, _ in INDIA_UTS}
+
+INDEX = JurisdictionIndex(_places())
+
+
+def resolve(text, fuzzy=True):
+    """The place a free-text location names, or None if it matches nothing known."""
+    return INDEX.resolve(text or "", fuzzy)
+
+
+# --- HELPLINES ---
+
+def helplines_for(place, issue=""):
+    """
+    The helplines for a place as [(name, number)], always in the same order.
+
+    The emergency and legal aid lines are always included; the others only
+    when the legal issue mentions one of their topics.
+    """
+    if place is None:
+        return []
+    issue_words = set(normalize(issue).split())
+    helplines = []
+    for name, number, topics in NATIONAL_HELPLINES.get(place.country, []):
+        if not topics or issue_words.intersection(topics):
+            helplines.append((name, number))
+    return helplines
+
+
+def legal_aid_office(place):
+    """Where to ask for free legal aid in person, for places below country level."""
+    if place is None or place.region is None:
+        return None
+    district = f"{place.name} " if place.kind == "district" else ""
+    if place.country == "India":
+        authority = "UT" if place.region in _UT_NAMES else "State"
+        return f"{district}District Legal Services Authority, or the {place.region} {authority} Legal Services Authority"
+    return f"{district}District Legal Aid Committee at the District Court ({place.region} Province)"
+
+
+def format_helplines(place, issue="", fallback=None):
+    """
+    The helplines as a markdown **[Helpline]:** section.
+
+    If `place` is None (the location wasn't recognised), the national
+    helplines of `fallback`'s country are shown instead, e.g. with the app's
+    DEFAULT_LOCATION; without a fallback the result is "".
+    """
+    unresolved = place is None
+    if unresolved and fallback:
+        known = resolve(fallback)
+        place = Place(known.country, "country", None, known.country) if known else None
+    helplines = helplines_for(place, issue)
+    if not helplines:
+        return ""
+    where = place.label if place.kind == "country" else f"{place.label}, {place.country}"
+    if unresolved:
+        where += " (we couldn't find your location, so these are the national numbers)"
+    lines = [f"**[Helpline]:** For {where}"]
+    lines += [f"- {name}: **{number}**" for name, number in helplines]
+    office = legal_aid_office(place)
+    if office:
+        lines.append(f"- Free legal aid in person: {office}")
+    return "\n".join(lines)
+
+
+# Added to the prompt when the helplines are shown separately
+PROMPT_NOTE = " Helpline numbers for this location are shown to the user separately, so do not list any."
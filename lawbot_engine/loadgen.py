@@ -0,0 +1,242 @@
+"""
+Multi-user load generator for LawBot.
+
+Simulates N users at once. Each one loops until time runs out: pick a flow,
+run it, wait a moment ("think time"), repeat. The flows are the ones the
+apps run:
+
+- retrieval: embed the question and search the shared vector index
+  (the Vector Database page),
+- prompting: build a prompt with one of the prompting apps' prompts.py and
+  stream a structured answer (the LawBot pages).
+
+By default everything runs against the local fake backend in
+lawbot_engine.fake, with the latency, error and 429 behaviour set on the
+command line, so no quota or network is used. The report gives throughput
+and latency percentiles per flow, and how many requests were rate limited
+or failed.
+
+    python -m lawbot_engine.loadgen --users 20 --duration 30 --latency lognormal:0.4:0.5 --429-rate 0.02
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lawbot_engine import batching, config, deadlines, embedding, fake, harness, registry, retrieval, tracing
+
+FLOWS = ("retrieval", "prompting")
+
+
+# --- FLOWS ---
+
+def _error_kind(error):
+    return deadlines.failure_kind(error) if error else None
+
+
+def run_retrieval(question, index, k=2):
+    """Embeds the question and searches the index (micro-batched), like the Vector Database page."""
+    start = time.perf_counter()
+    error = None
+    try:
+        batching.search(index, question["question"], k)
+    except Exception as e:
+        error = str(e)
+    return {"flow": "retrieval", "latency_s": time.perf_counter() - start, "error": error}
+
+
+def run_prompting(name, prompts, question):
+    """Streams a structured answer from one prompting strategy (hedged, with a deadline), like the LawBot pages."""
+    result = harness.run_one(name, prompts, question, registry.get_model, guard=True, bounded=True)
+    return {"flow": "prompting", "strategy": name, "latency_s": result["latency_s"], "error": result["error"],
+            "source": result["source"], "failures": result["failures"]}
+
+
+# --- USERS ---
+
+def simulate_user(user_id, flows, questions, strategies, index, deadline, max_requests=None,
+                  think_s=0.0, seed=0):
+    """One user's session: run flows back to back (with think time) until the deadline."""
+    rng = random.Random(seed * 1000 + user_id)
+    names = sorted(strategies)
+    results = []
+    while time.monotonic() < deadline and (max_requests is None or len(results) < max_requests):
+        flow = rng.choice(flows)
+        question = rng.choice(questions)
+        if flow == "retrieval":
+            result = run_retrieval(question, index)
+        else:
+            name = rng.choice(names)
+            result = run_prompting(name, strategies[name], question)
+        result["user"] = user_id
+        result["error_kind"] = _error_kind(result["error"])
+        # A hedged answer can hide failed attempts behind a successful request
+        result.setdefault("failures", [result["error_kind"]] if result["error"] else [])
+        results.append(result)
+        if think_s:
+            time.sleep(rng.expovariate(1.0 / think_s))
+    return results
+
+
+def run_load(users, duration_s, flows=FLOWS, questions=None, strategies=None, max_requests=None,
+             think_s=0.0, seed=0):
+    """Runs `users` simulated users concurrently and returns (raw results, elapsed seconds)."""
+    questions = questions or harness.DEFAULT_QUESTIONS
+    strategies = strategies if strategies is not None else harness.load_strategies()
+    index = retrieval.get_shared_index() if "retrieval" in flows else None
+
+    deadline = time.monotonic() + duration_s
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, users)) as pool:
+        sessions = [
+            pool.submit(simulate_user, user_id, list(flows), questions, strategies, index,
+                        deadline, max_requests, think_s, seed)
+            for user_id in range(users)
+        ]
+        results = [r for session in sessions for r in session.result()]
+    return results, time.perf_counter() - start
+
+
+# --- REPORTING ---
+
+def summarize(results, elapsed_s):
+    """Throughput, latency percentiles and failures per flow, plus an "all" row."""
+    summary = {}
+    groups = {flow: [r for r in results if r["flow"] == flow] for flow in sorted({r["flow"] for r in results})}
+    groups["all"] = results
+    for name, rows in groups.items():
+        if not rows:
+            continue
+        ok = [r["latency_s"] * 1000 for r in rows if not r["error"]]
+        summary[name] = {
+            "requests": len(rows),
+            "ok": len(ok),
+            "rate_limited": sum(r["failures"].count("rate_limited") for r in rows),
+            "timeouts": sum(r["failures"].count("timeout") for r in rows),
+            "errors": sum(r["failures"].count("error") for r in rows),
+            "throughput_rps": len(ok) / elapsed_s if elapsed_s else 0.0,
+            "p50_ms": harness.percentile(ok, 50),
+            "p90_ms": harness.percentile(ok, 90),
+            "p99_ms": harness.percentile(ok, 99),
+        }
+    return summary
+
+
+def format_table(summary):
+    """
+    Renders the summary as a plain-text table. Latencies are for successful
+    requests; 429, t/o and err count failed calls, including attempts a hedge
+    or fallback covered for the user.
+    """
+    header = (f"{'flow':<12}{'requests':>10}{'ok':>8}{'429':>7}{'t/o':>6}{'err':>6}{'ok/s':>8}"
+              f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    lines = [header, "-" * len(header)]
+    for name, s in summary.items():
+        lines.append(
+            f"{name:<12}{s['requests']:>10}{s['ok']:>8}{s['rate_limited']:>7}{s['timeouts']:>6}{s['errors']:>6}"
+            f"{s['throughput_rps']:>8.1f}{s['p50_ms']:>9.1f}{s['p90_ms']:>9.1f}{s['p99_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent LawBot users and report throughput and latency.")
+    parser.add_argument("questions", nargs="?", help="A .txt or .jsonl question file. Defaults to a built-in set.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated users.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run for.")
+    parser.add_argument("--requests", type=int, help="Stop each user after this many requests.")
+    parser.add_argument("--flow", action="append", choices=FLOWS, help="Only run this flow (can be repeated).")
+    parser.add_argument("--strategy", action="append", help="Only use this prompting app folder (can be repeated).")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Average pause between a user's requests.")
+    parser.add_argument("--latency", default="lognormal:0.4:0.5", help="Fake generate latency: fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA.")
+    parser.add_argument("--embed-latency", default="lognormal:0.05:0.3", help="Fake embedding latency, same format.")
+    parser.add_argument("--latency-per-token-ms", type=float, default=0.0, help="Fake model: extra latency per streamed output token.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake backend: share of calls that fail with a 500.")
+    parser.add_argument("--429-rate", dest="rate_limit_rate", type=float, default=0.0, help="Fake backend: share of calls rejected with a 429.")
+    parser.add_argument("--rpm", type=int, help="Fake backend: requests-per-minute quota per call kind; calls over it get a 429.")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Embed every query, even repeated ones.")
+    parser.add_argument("--batch-window-ms", type=float, help="How long a query waits to share an embedding call (0 turns batching off).")
+    parser.add_argument("--max-batch", type=int, help="Most queries embedded in one call.")
+    parser.add_argument("--deadline-ms", type=float, help="Longest wait for an answer before falling back.")
+    parser.add_argument("--hedge-after-ms", type=float, help="Wait for first text before hedging, until there are enough samples for a p95.")
+    parser.add_argument("--no-hedge", action="store_true", help="Never send a second request for a slow answer.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--live", action="store_true", help="Call Gemini instead of the fake backend (needs GEMINI_API_KEY).")
+    parser.add_argument("--json", dest="json_path", help="Also write raw results and the summary to this file.")
+    args = parser.parse_args(argv)
+
+    questions = harness.load_questions(args.questions) if args.questions else None
+    strategies = harness.load_strategies(args.strategy)
+    flows = args.flow or list(FLOWS)
+    if "prompting" in flows and not strategies:
+        parser.error("No matching app folders with a prompts.py were found.")
+    # Injected failures are counted in the report; one warning line per failure would bury it
+    logging.getLogger("lawbot.tracing").setLevel(logging.ERROR)
+    if args.no_embedding_cache:
+        embedding.CACHE_SIZE = 0
+    if args.batch_window_ms is not None:
+        config.BATCH_WINDOW_S = args.batch_window_ms / 1000.0
+    if args.max_batch is not None:
+        config.BATCH_MAX = args.max_batch
+    if args.deadline_ms is not None:
+        config.DEADLINE_S = args.deadline_ms / 1000.0
+    if args.hedge_after_ms is not None:
+        config.HEDGE_AFTER_S = args.hedge_after_ms / 1000.0
+    if args.no_hedge:
+        config.HEDGE = False
+
+    if args.live:
+        registry.configure()
+    else:
+        config.FAKE_GEMINI = True
+        # Build the shared index on a well-behaved backend first, so injected
+        # failures only hit the simulated users' requests.
+        fake.set_backend(fake.FakeBackend(seed=args.seed))
+        if "retrieval" in flows:
+            retrieval.get_shared_index()
+        fake.set_backend(fake.FakeBackend(
+            latency=fake.LatencyDistribution.parse(args.latency, args.seed),
+            embed_latency=fake.LatencyDistribution.parse(args.embed_latency, args.seed + 1),
+            latency_per_token=args.latency_per_token_ms / 1000.0,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            requests_per_minute=args.rpm,
+            seed=args.seed,
+        ))
+        registry.clear()  # Cached models are bound to the backend that built them
+
+    results, elapsed = run_load(args.users, args.duration, flows, questions, strategies,
+                                args.requests, args.think_ms / 1000.0, args.seed)
+    summary = summarize(results, elapsed)
+    print(f"{args.users} users for {elapsed:.1f}s")
+    print(format_table(summary))
+    cache = embedding.stats()
+    print(f"embedding cache: {cache['hits']} hits, {cache['misses']} misses, {cache['api_calls']} API calls")
+    batches = tracing.value_summary()
+    if "query_batch_size" in batches:
+        size, wait = batches["query_batch_size"], batches["query_batch_wait_seconds"]
+        print(f"query batches: {size['count']}, mean size {size['mean']:.1f} (p95 <= {size['p95']}), "
+              f"mean wait {wait['mean'] * 1000:.1f} ms (p95 <= {wait['p95'] * 1000:g} ms)")
+    bounded = deadlines.stats()
+    if bounded["requests"]:
+        print(f"answers: {bounded['hedged']} hedged ({bounded['hedge_rate']:.1%}, {bounded['hedge_wins']} won by the hedge), "
+              f"{bounded['cache_fallbacks']} cached and {bounded['extractive_fallbacks']} extractive fallbacks "
+              f"({bounded['fallback_rate']:.1%}); failed attempts: {bounded['rate_limited']} rate limited, "
+              f"{bounded['timeouts']} timed out, {bounded['errors']} errors; {bounded['attempts_running']} still running")
+        tail = deadlines.latency_report()
+        print("time to first text: " + ", ".join(
+            f"p{q} {tail[f'p{q}_s'] * 1000:.0f} ms (first attempt alone {tail[f'first_attempt_p{q}_s'] * 1000:.0f} ms)"
+            for q in (50, 95, 99)
+        ))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Prompt helpers shared by the prompting apps and the offline harness.
+
+Each prompting app keeps its SYSTEM_PROMPT, EXAMPLES and build_prompt() in a
+`prompts.py` next to its app.py. The folders have dashes in their names
+(e.g. `zero-shot-prompting`), so they can't be imported as packages; these
+helpers load them by file path under a unique module name instead.
+"""
+import importlib.util
+import os
+import re
+import sys
+
+from lawbot_engine.config import REPO_ROOT
+
+
+def load_prompts(app_dir):
+    """Imports `<app_dir>/prompts.py` (once per process) and returns the module."""
+    app_dir = os.path.abspath(app_dir)
+    folder = os.path.basename(app_dir)
+    module_name = "lawbot_prompts_" + folder.replace("-", "_")
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_dir, "prompts.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+def discover_prompt_dirs(root=REPO_ROOT):
+    """Returns the app folders that have a prompts.py, sorted by name."""
+    return sorted(
+        os.path.join(root, name)
+        for name in os.listdir(root)
+        if os.path.isfile(os.path.join(root, name, "prompts.py"))
+    )
+
+
+def build_contents(examples, final_prompt):
+    """The few-shot examples followed by the user's turn, as Gemini expects."""
+    return list(examples) + [{"role": "user", "parts": [final_prompt]}]
+
+
+# --- TOKEN ESTIMATES ---
+# Gemini bills roughly one token per short word or punctuation mark. Counting
+# those locally is close enough to compare prompts without an API call.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """A rough, offline token count for a piece of text."""
+    return len(_TOKEN_PATTERN.findall(text or ""))
+
+
+def contents_text(system_prompt, contents):
+    """Flattens a system prompt plus chat contents into one string (for token estimates)."""
+    if isinstance(contents, str):
+        contents = [{"role": "user", "parts": [contents]}]
+    parts = [system_prompt or ""]
+    for turn in contents:
+        parts.extend(str(p) for p in turn.get("parts", []))
+    return "\n".join(parts)
+
+
+def clip_tokens(text, max_tokens):
+    """The start of a text, cut after about `max_tokens` tokens (with "…" if anything was cut)."""
+    text = text or ""
+    for i, match in enumerate(_TOKEN_PATTERN.finditer(text)):
+        if i == max_tokens:
+            return text[:match.start()].rstrip() + "…"
+    return text
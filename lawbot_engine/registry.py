@@ -0,0 +1,127 @@
+"""
+Process-wide registry for the Gemini client and models.
+
+Streamlit re-executes an app's script from the top on every interaction, so a
+`genai.GenerativeModel(...)` written at module level in app.py is rebuilt on
+every click of every session. This module is imported once per process, so
+the objects cached here are built lazily on first use and then shared by all
+sessions and pages.
+"""
+import threading
+
+from lawbot_engine import config
+
+DEFAULT_MODEL = config.GENERATION_MODEL
+
+_lock = threading.Lock()
+_api_key = None
+_models = {}
+_build_counts = {}
+_stats = {"configure_calls": 0, "models_built": 0, "cache_hits": 0}
+
+
+def _hashable(value):
+    # Lists (e.g. stop_sequences) become tuples and dicts sorted item tuples, all the way down
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _freeze(value):
+    """Turns a generation config (dict or GenerationConfig) into a hashable key."""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        value = vars(value)
+    return tuple(sorted((k, _hashable(v)) for k, v in value.items() if v is not None))
+
+
+def _client():
+    """The `genai` module, or the local fake backend when LAWBOT_FAKE_GEMINI is set."""
+    if config.FAKE_GEMINI:
+        from lawbot_engine import fake
+
+        return fake.get_backend()
+    import google.generativeai as genai
+
+    return genai
+
+
+def configure(api_key=None):
+    """
+    Configures the Gemini client once per process and returns the `genai` module.
+
+    Calling it again with the same key is a no-op, so apps can call it at the
+    top of their script on every rerun without paying for it. In offline mode
+    (LAWBOT_FAKE_GEMINI) no key is needed and the fake backend is returned.
+    """
+    global _api_key
+    if config.FAKE_GEMINI:
+        return _client()
+    api_key = api_key or config.get_api_key()
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY is not set.")
+
+    genai = _client()
+    if api_key != _api_key:
+        with _lock:
+            if api_key != _api_key:
+                genai.configure(api_key=api_key)
+                _api_key = api_key
+                _stats["configure_calls"] += 1
+                # Models hold a client bound to the old key, so drop them.
+                _models.clear()
+    return genai
+
+
+def get_model(model_name=DEFAULT_MODEL, system_instruction=None, generation_config=None):
+    """Returns the cached model for this (model, system prompt, config), building it on first use."""
+    key = (model_name, system_instruction, _freeze(generation_config))
+    model = _models.get(key)
+    if model is not None:
+        _stats["cache_hits"] += 1
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = _client().GenerativeModel(
+                model_name=model_name,
+                system_instruction=system_instruction,
+                generation_config=generation_config or None,
+            )
+            _models[key] = model
+            _build_counts[key] = _build_counts.get(key, 0) + 1
+            _stats["models_built"] += 1
+        else:
+            _stats["cache_hits"] += 1
+    return model
+
+
+def stats():
+    """Returns construction counts so we can check models are not being rebuilt per click."""
+    with _lock:
+        return {
+            **_stats,
+            "cached_models": len(_models),
+            "builds_per_model": [
+                {
+                    "model_name": name,
+                    "system_prompt": (prompt or "")[:60],
+                    "generation_config": dict(gen_config) if gen_config else {},
+                    "builds": count,
+                }
+                for (name, prompt, gen_config), count in _build_counts.items()
+            ],
+        }
+
+
+def clear():
+    """Forgets every cached model (mainly for tests and key rotation)."""
+    global _api_key
+    with _lock:
+        _models.clear()
+        _build_counts.clear()
+        _api_key = None
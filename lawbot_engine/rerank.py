@@ -0,0 +1,146 @@
+"""
+Two-stage retrieval: a wide FAISS search, then a rerank of the candidates.
+
+The top 2 by L2 distance alone are often not the articles a user wanted,
+and they come back with a follow-up question. `retrieve` instead fetches
+RERANK_CANDIDATES candidates and rescores them all in one batched pass with:
+
+- cosine similarity on the full-precision vectors (exact, not the index's
+  distance),
+- lexical overlap between the question's words and the article's,
+- metadata matches: the question names the article number, the act's
+  jurisdiction or words of the article's title.
+
+Reranking has a time budget (RERANK_BUDGET_MS). If it runs over, the first
+stage's order is returned as is, so a slow rerank never delays an answer by
+more than the budget. Every result says how long each stage took.
+"""
+import re
+import time
+
+from lawbot_engine import config, tracing
+
+# Weight of each signal in the combined score
+WEIGHTS = {"cosine": 1.0, "lexical": 0.5, "metadata": 0.3}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my no not of on or "
+    "the to what when where which who why will with".split()
+)
+_ARTICLE_PATTERN = re.compile(r"\b(?:article|section|art\.?)\s*(\d+[a-z]*)\b", re.IGNORECASE)
+
+
+def tokens(text):
+    """Lowercase content words of a text."""
+    return {word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS}
+
+
+class RetrievalResult:
+    """The final results plus what each stage did."""
+
+    __slots__ = ("results", "reranked", "timings_ms", "candidates")
+
+    def __init__(self, results, reranked, timings_ms, candidates):
+        self.results = results  # [(row, chunk, score)], best first
+        self.reranked = reranked  # False if the budget ran out (first-stage order)
+        self.timings_ms = timings_ms  # {"search": ..., "cosine": ..., "lexical": ..., "metadata": ..., "total": ...}
+        self.candidates = candidates
+
+
+def _lexical_scores(query_tokens, texts, deadline):
+    """Share of the question's words found in each text (None if the deadline passes)."""
+    scores = []
+    for text in texts:
+        if time.perf_counter() > deadline:
+            return None
+        scores.append(len(query_tokens & tokens(text)) / len(query_tokens) if query_tokens else 0.0)
+    return scores
+
+
+def _metadata_scores(query, query_tokens, store, rows):
+    """1 for each metadata field the question points at: article number, jurisdiction, title words."""
+    numbers = {n.upper() for n in _ARTICLE_PATTERN.findall(query)}
+    scores = []
+    for row in rows:
+        score = 0.0
+        if store.columns["number"][row] in numbers:
+            score += 1.0
+        jurisdiction = store.columns["jurisdiction"][row]
+        if jurisdiction and jurisdiction in query_tokens:
+            score += 0.5
+        title = store.columns["title"][row]
+        if title and query_tokens & tokens(title):
+            score += 0.5
+        scores.append(score)
+    return scores
+
+
+def retrieve(index, query, query_embedding, k=2, where=None, candidates=None, budget_s=None, first_stage=None):
+    """
+    The top k chunks of `index` for a question, reranked within the time budget.
+
+    `query` is the question's text (for the lexical and metadata signals) and
+    `query_embedding` its vector. `where` filters on metadata as in
+    VectorIndex.search_rows. `first_stage` is the [(row, distance)] result of
+    a search already run for the candidates (e.g. by batching.search);
+    without it the index is searched here.
+    """
+    import numpy as np
+
+    candidates = candidates or config.RERANK_CANDIDATES
+    budget_s = config.RERANK_BUDGET_S if budget_s is None else budget_s
+    timings = {}
+
+    with tracing.span("retrieve", k=k, candidates=candidates, budget_ms=budget_s * 1000) as span:
+        started = time.perf_counter()
+        if first_stage is None:
+            first_stage = index.search_rows(query_embedding, max(k, candidates), where)
+        timings["search"] = (time.perf_counter() - started) * 1000
+
+        def first_stage_result():
+            # Fallback: FAISS order, scored by negative distance so higher is still better
+            timings["total"] = (time.perf_counter() - started) * 1000
+            span.set(reranked=False, **{f"{name}_ms": round(ms, 3) for name, ms in timings.items()})
+            results = [(row, index.chunks[row], -distance) for row, distance in first_stage[:k]]
+            return RetrievalResult(results, False, timings, len(first_stage))
+
+        if len(first_stage) <= 1:
+            return first_stage_result()
+
+        rerank_started = time.perf_counter()
+        deadline = rerank_started + budget_s
+        rows = np.asarray([row for row, _ in first_stage])
+
+        # Exact cosine against the stored full-precision vectors, all candidates at once
+        vectors = index.vectors[rows]
+        query_vector = np.asarray(query_embedding, dtype="float32")
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        cosine = (vectors @ query_vector) / np.where(norms == 0, 1.0, norms)
+        timings["cosine"] = (time.perf_counter() - rerank_started) * 1000
+        if time.perf_counter() > deadline:
+            return first_stage_result()
+
+        step = time.perf_counter()
+        query_tokens = tokens(query)
+        lexical = _lexical_scores(query_tokens, [index.chunks[row] for row in rows], deadline)
+        timings["lexical"] = (time.perf_counter() - step) * 1000
+        if lexical is None or time.perf_counter() > deadline:
+            return first_stage_result()
+
+        step = time.perf_counter()
+        metadata = _metadata_scores(query, query_tokens, index.store, rows)
+        timings["metadata"] = (time.perf_counter() - step) * 1000
+        if time.perf_counter() > deadline:
+            return first_stage_result()
+
+        scores = (
+            WEIGHTS["cosine"] * cosine
+            + WEIGHTS["lexical"] * np.asarray(lexical)
+            + WEIGHTS["metadata"] * np.asarray(metadata)
+        )
+        order = np.argsort(-scores, kind="stable")[:k]
+        timings["total"] = (time.perf_counter() - started) * 1000
+        span.set(reranked=True, **{f"{name}_ms": round(ms, 3) for name, ms in timings.items()})
+        results = [(int(rows[i]), index.chunks[rows[i]], float(scores[i])) for i in order]
+        return RetrievalResult(results, True, timings, len(first_stage))
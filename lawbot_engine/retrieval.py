@@ -0,0 +1,384 @@
+"""
+Knowledge-base loading and FAISS vector search.
+
+FAISS takes a noticeable moment to load, so it (and numpy) are imported the
+first time an index is actually built, not when this module is imported.
+
+Shared indexes are built on a background thread (see IndexBuild), so no
+request waits for a whole embedding run. While a build runs, searches use
+the previous version of the index, or failing that the part built so far,
+and the finished index replaces it in one step.
+"""
+import logging
+import os
+import threading
+import time
+
+from lawbot_engine import config, tracing
+from lawbot_engine.chunkstore import ChunkStore
+
+
+def load_knowledge_base(path=None):
+    """Reads the knowledge base text file."""
+    with open(path or config.KNOWLEDGE_BASE_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def split_chunks(text):
+    """Splits the text into chunks (paragraphs separated by a blank line)."""
+    return [para.strip() for para in text.split("\n\n") if para.strip()]
+
+
+# Filters matching at most this share of the rows are searched by scanning just
+# those rows; broader ones let FAISS skip the rest with a bitmap selector.
+SUBSET_SCAN_FRACTION = 0.5
+
+
+class VectorIndex:
+    """
+    A flat L2 FAISS index over chunk embeddings, plus the chunks' metadata.
+
+    Row i of the index is chunk i of `store` (a ChunkStore, parsed from the
+    chunk texts if not given), so searches can be filtered on metadata.
+    """
+
+    def __init__(self, chunks, embeddings, store=None, embedding_model=None):
+        import faiss
+        import numpy as np
+
+        self.store = store if store is not None else ChunkStore.from_chunks(list(chunks))
+        self.chunks = self.store.texts
+        # Queries must be embedded with the model the chunks were embedded with
+        self.embedding_model = embedding_model or config.EMBEDDING_MODEL
+        vectors = np.asarray(embeddings, dtype="float32")
+        if vectors.ndim != 2 or not len(vectors):
+            raise ValueError("A VectorIndex needs at least one embedding (a 2-D array of vectors).")
+        self.dimension = vectors.shape[1]
+        self.index = faiss.IndexFlatL2(self.dimension)  # L2 distance is a common choice
+        self.index.add(vectors)
+        # A view of the vectors FAISS holds (no copy), for scanning a filtered subset
+        self.vectors = faiss.rev_swig_ptr(self.index.get_xb(), len(vectors) * self.dimension).reshape(
+            len(vectors), self.dimension
+        )
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query_embedding, k=2, where=None):
+        """Returns up to k (chunk, distance) pairs, closest first, among chunks matching `where`."""
+        return [(self.chunks[row], distance) for row, distance in self.search_rows(query_embedding, k, where)]
+
+    def search_rows(self, query_embedding, k=2, where=None):
+        """
+        Returns up to k (row, distance) pairs, closest first.
+
+        `where` is a metadata filter such as {"act": "Constitution of India",
+        "part": "Part III"} (see ChunkStore.mask). It is applied before the
+        distances are computed, not by throwing away results afterwards, so a
+        narrow filter still returns k matches and only scans its own rows.
+        """
+        import faiss
+        import numpy as np
+
+        with tracing.span("search", k=k, chunks=len(self.chunks), filtered=bool(where)) as span:
+            query = np.asarray([query_embedding], dtype="float32")
+            mask = self.store.mask(where)
+            if mask is None:
+                distances, indices = self.index.search(query, min(k, len(self.chunks)))
+                return [(int(i), float(d)) for i, d in zip(indices[0], distances[0]) if i != -1]
+
+            rows = np.flatnonzero(mask)
+            span.set(candidates=len(rows))
+            if len(rows) == 0:
+                return []
+            if len(rows) <= SUBSET_SCAN_FRACTION * len(self.chunks):
+                # Exact squared L2 over only the matching rows (what IndexFlatL2 computes)
+                span.set(method="subset_scan")
+                diff = self.vectors[rows] - query
+                distances = np.einsum("ij,ij->i", diff, diff)
+                top = np.argsort(distances)[:k]
+                return [(int(rows[i]), float(distances[i])) for i in top]
+
+            span.set(method="id_selector")
+            bits = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+            distances, indices = self.index.search(
+                query, min(k, len(rows)), params=faiss.SearchParameters(sel=selector)
+            )
+            return [(int(i), float(d)) for i, d in zip(indices[0], distances[0]) if i != -1]
+
+    def search_rows_batch(self, query_embeddings, k=2):
+        """search_rows for several unfiltered queries at once, with one FAISS call."""
+        import numpy as np
+
+        with tracing.span("search", k=k, chunks=len(self.chunks), queries=len(query_embeddings)):
+            queries = np.asarray(query_embeddings, dtype="float32")
+            distances, indices = self.index.search(queries, min(k, len(self.chunks)))
+            return [
+                [(int(i), float(d)) for i, d in zip(row_indices, row_distances) if i != -1]
+                for row_indices, row_distances in zip(indices, distances)
+            ]
+
+
+def build_index(chunks, embed, sources=None, embedding_model=None, progress=None, snapshot_every=None):
+    """
+    Embeds every chunk with `embed` and builds a VectorIndex, skipping chunks that fail to embed.
+    Raises ValueError if no chunk could be embedded.
+
+    `sources` names the file each chunk came from (one name for all, or one per chunk).
+    `progress(done, partial)` is called after each chunk; `partial` is a
+    VectorIndex over the chunks embedded so far every `snapshot_every`
+    chunks, and None otherwise.
+    """
+    import numpy as np
+
+    if sources is None or isinstance(sources, str):
+        sources = [sources] * len(chunks)
+    with tracing.span("index_build", chunks=len(chunks)) as span:
+        valid_chunks = []
+        valid_sources = []
+        # Vectors go straight into one float32 matrix (4 bytes a value) instead of
+        # lists of Python floats (about 32 bytes a value)
+        vectors = None
+        count = 0
+        for done, (chunk, source) in enumerate(zip(chunks, sources), start=1):
+            vector = embed(chunk)
+            if vector is not None:
+                if vectors is None:
+                    vectors = np.empty((len(chunks), len(vector)), dtype="float32")
+                vectors[count] = vector
+                count += 1
+                valid_chunks.append(chunk)
+                valid_sources.append(source)
+            if progress is not None:
+                partial = None
+                if snapshot_every and count and done % snapshot_every == 0 and done < len(chunks):
+                    partial = VectorIndex(valid_chunks, vectors[:count],
+                                          ChunkStore.from_chunks(valid_chunks, valid_sources), embedding_model)
+                progress(done, partial)
+        span.set(embedded=count)
+        if not count:
+            raise ValueError(f"No chunk could be embedded ({len(chunks)} tried), so there is nothing to index.")
+        return VectorIndex(valid_chunks, vectors[:count], ChunkStore.from_chunks(valid_chunks, valid_sources),
+                           embedding_model)
+
+
+# --- SHARED INDEX ---
+# One index per set of knowledge-base files (and their versions) and embedding
+# model, shared by every session and page in the process instead of being
+# rebuilt per user.
+
+# How many partial snapshots a background build publishes along the way
+PARTIAL_SNAPSHOTS = 10
+# How long after a failed build before a search may start another
+BUILD_RETRY_S = 30.0
+
+logger = logging.getLogger("lawbot.retrieval")
+
+_index_lock = threading.Lock()
+_indexes = {}  # key -> VectorIndex
+_builds = {}  # key -> IndexBuild
+
+
+def _paths(path):
+    paths = [path] if path is None or isinstance(path, str) else list(path)
+    return tuple(os.path.abspath(p or config.KNOWLEDGE_BASE_PATH) for p in paths)
+
+
+def _index_key(paths):
+    """Changes when a file is edited or the embedding model changes."""
+    return (tuple((p, os.path.getmtime(p)) for p in paths), config.EMBEDDING_MODEL)
+
+
+def _load_chunks(paths):
+    chunks, sources = [], []
+    for p in paths:
+        file_chunks = split_chunks(load_knowledge_base(p))
+        chunks.extend(file_chunks)
+        sources.extend([os.path.basename(p)] * len(file_chunks))
+    return chunks, sources
+
+
+def _previous_version(paths):
+    """The newest index held for the same files from an older version or embedding model."""
+    matches = [index for key, index in list(_indexes.items()) if tuple(p for p, _ in key[0]) == paths]
+    return matches[-1] if matches else None
+
+
+def _install(key, index):
+    """Publishes a finished index, then drops older versions of the same files."""
+    paths = tuple(p for p, _ in key[0])
+    with _index_lock:
+        _indexes[key] = index  # Readers see the old or the new index, never neither
+        for old_key in [k for k in _indexes if k != key and tuple(p for p, _ in k[0]) == paths]:
+            del _indexes[old_key]
+
+
+class IndexBuild:
+    """A shared index being built on a background thread, with its progress."""
+
+    def __init__(self, key, paths, embed=None):
+        self.key = key
+        self.paths = paths
+        self.embedding_model = key[1]
+        self.status = "building"  # then "ready" or "failed"
+        self.error = None
+        self.total = 0
+        self.done = 0
+        self.failed = 0  # Chunks that could not be embedded
+        self.partial = None  # VectorIndex over the chunks embedded so far
+        self.started = time.time()
+        self.finished = None
+        self._embed = embed
+        self._done_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lawbot-index-build", daemon=True)
+
+    @property
+    def progress(self):
+        """Share of chunks embedded so far, from 0.0 to 1.0."""
+        return self.done / self.total if self.total else 0.0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Waits for the build to finish; returns False if it is still running after `timeout`."""
+        return self._done_event.wait(timeout)
+
+    def _embed_or_skip(self, text):
+        try:
+            if self._embed is not None:
+                return self._embed(text)
+            from lawbot_engine.embedding import get_embedding
+            return get_embedding(text, self.embedding_model)
+        except Exception as e:
+            self.failed += 1
+            logger.warning("Could not embed a chunk (%s); skipping it", e)
+            return None
+
+    def _on_progress(self, done, partial):
+        self.done = done
+        if partial is not None:
+            self.partial = partial
+
+    def _run(self):
+        from lawbot_engine import corpus
+
+        try:
+            # An exported corpus of these exact files and model saves the whole embedding run
+            index = corpus.load_matching(config.CORPUS_DIR, self.paths, self.embedding_model)
+            if index is not None:
+                self.total = self.done = len(index)
+                _install(self.key, index)
+                self.status = "ready"
+                return
+
+            chunks, sources = _load_chunks(self.paths)
+            self.total = len(chunks)
+            index = build_index(chunks, self._embed_or_skip, sources, self.embedding_model,
+                                progress=self._on_progress,
+                                snapshot_every=max(1, self.total // PARTIAL_SNAPSHOTS))
+            if self.failed and _previous_version(self.paths) is not None:
+                # A half-embedded corpus shouldn't replace a complete older one
+                raise RuntimeError(f"{self.failed} of {self.total} chunks could not be embedded")
+            _install(self.key, index)
+            if config.CORPUS_DIR and not self.failed:
+                corpus.export_index(index, config.CORPUS_DIR, corpus.sources_of(self.paths))
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            tracing.record_error("index_build", e)
+        finally:
+            self.partial = None
+            self.finished = time.time()
+            self._done_event.set()
+
+
+def start_index_build(path=None, embed=None, retry_after_s=BUILD_RETRY_S):
+    """
+    Starts building the index for a knowledge base file (or list of files) in
+    the background, unless it is already built or being built. Returns the
+    IndexBuild, or None if the current version is already built.
+    """
+    paths = _paths(path)
+    key = _index_key(paths)
+    if key in _indexes:
+        return None
+    with _index_lock:
+        build = _builds.get(key)
+        failed_long_ago = (
+            build is not None and build.finished is not None and build.status == "failed"
+            and time.time() - build.finished >= retry_after_s
+        )
+        if build is None or failed_long_ago:
+            for old_key in [k for k in _builds if k != key and tuple(p for p, _ in k[0]) == paths]:
+                del _builds[old_key]
+            build = _builds[key] = IndexBuild(key, paths, embed).start()
+    return build
+
+
+class ServingIndex:
+    """The index to search right now, and what state it is in."""
+
+    __slots__ = ("index", "build", "stale", "partial")
+
+    def __init__(self, index, build=None, stale=False, partial=False):
+        self.index = index  # None if nothing is searchable yet
+        self.build = build  # The IndexBuild in progress (or failed), if any
+        self.stale = stale  # An older version, served while the new one builds
+        self.partial = partial  # Only the chunks embedded so far
+
+
+def serving_index(path=None, embed=None):
+    """
+    The best index to search right now, without waiting for a build.
+
+    That is the current version if it is built; otherwise a background
+    build is started (if not already running) and the previous version is
+    served, or the partial index built so far, or nothing yet.
+    """
+    paths = _paths(path)
+    index = _indexes.get(_index_key(paths))
+    if index is not None:
+        return ServingIndex(index)
+    build = start_index_build(paths, embed)
+    if build is None:  # Finished between the two lookups
+        return ServingIndex(_indexes[_index_key(paths)])
+    previous = _previous_version(paths)
+    if previous is not None:
+        return ServingIndex(previous, build, stale=True)
+    partial = build.partial
+    if partial is not None:
+        return ServingIndex(partial, build, partial=True)
+    return ServingIndex(None, build)
+
+
+def get_shared_index(path=None, embed=None):
+    """
+    Returns the process-wide index for one knowledge base file (or a list of
+    files, indexed together), waiting for it to be built on first use.
+    """
+    paths = _paths(path)
+    key = _index_key(paths)
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+    build = start_index_build(paths, embed, retry_after_s=0)
+    if build is not None:
+        build.wait()
+    index = _indexes.get(key)
+    if index is None:
+        raise RuntimeError(f"Could not build the index: {build.error if build else 'unknown error'}")
+    return index
+
+
+def shared_indexes():
+    """(paths, number of chunks) for every index currently held in memory."""
+    return [([p for p, _ in key[0]], len(index)) for key, index in _indexes.items()]
+
+
+def index_builds():
+    """Every background build this process has started (the latest per set of files)."""
+    return list(_builds.values())
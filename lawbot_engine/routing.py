@@ -0,0 +1,202 @@
+"""
+Cheap, local routing between a direct answer and a chain-of-thought answer.
+
+The chain-of-thought app makes Gemini write a full **[Reasoning Chain]**
+before every answer, which roughly doubles output tokens and latency. That
+pays off for tangled, multi-party situations but is wasted on lookups like
+"What is RTI?". This module decides which path a query needs without an LLM
+call: by default with keyword/shape heuristics, or, if you have embeddings
+handy, with a nearest-centroid classifier.
+"""
+import logging
+import math
+import re
+import threading
+
+DIRECT = "direct"
+CHAIN_OF_THOUGHT = "chain_of_thought"
+
+# Score at or above which a query goes to chain-of-thought
+COMPLEXITY_THRESHOLD = 3
+
+logger = logging.getLogger("lawbot.routing")
+
+# People and organisations that show up as parties in legal situations
+PARTY_WORDS = {
+    "landlord", "tenant", "owner", "employer", "employee", "boss", "company", "manager",
+    "husband", "wife", "spouse", "father", "mother", "son", "daughter", "brother", "sister",
+    "in-laws", "relative", "neighbour", "neighbor", "friend", "partner", "shopkeeper", "seller",
+    "buyer", "builder", "bank", "lender", "police", "officer", "contractor", "school", "hospital",
+    "doctor", "insurer", "agent", "broker", "government", "municipality", "court",
+}
+CONNECTIVES = {"but", "however", "although", "though", "because", "since", "after", "before",
+               "while", "whereas", "unless", "despite", "meanwhile", "also"}
+LOOKUP_PATTERN = re.compile(
+    r"^\s*(what\s+(is|are|does)|define|meaning\s+of|explain|who\s+is|full\s+form\s+of|which\s+(act|law|article|section))\b",
+    re.IGNORECASE,
+)
+MONEY_OR_TIME_PATTERN = re.compile(r"(rs\.?\s?\d|₹\s?\d|\d+\s*(days?|months?|years?|weeks?))", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z][a-z\-']*")
+
+
+class RouteDecision:
+    """Which path a query takes, with the score and the reasons behind it."""
+
+    __slots__ = ("route", "score", "reasons", "method")
+
+    def __init__(self, route, score, reasons, method):
+        self.route = route
+        self.score = score
+        self.reasons = reasons
+        self.method = method
+
+    def __repr__(self):
+        return f"RouteDecision({self.route!r}, score={self.score}, reasons={self.reasons})"
+
+
+# --- HEURISTIC ROUTER ---
+
+def complexity_score(text):
+    """Scores how tangled a query is. Returns (score, reasons)."""
+    text = text or ""
+    lowered = text.lower()
+    words = WORD_PATTERN.findall(lowered)
+    score = 0
+    reasons = []
+
+    # Two or more parties is a tangled situation on its own, whatever else the query says
+    parties = sorted(PARTY_WORDS.intersection(words))
+    if len(parties) >= 2:
+        score += max(COMPLEXITY_THRESHOLD, len(parties))
+        reasons.append(f"{len(parties)} parties ({', '.join(parties)})")
+    elif parties:
+        score += 1
+        reasons.append(f"party: {parties[0]}")
+
+    if len(words) > 60:
+        score += 2
+        reasons.append(f"long ({len(words)} words)")
+    elif len(words) > 25:
+        score += 1
+        reasons.append(f"medium length ({len(words)} words)")
+
+    connectives = CONNECTIVES.intersection(words)
+    if connectives:
+        score += min(2, len(connectives))
+        reasons.append("connectives: " + ", ".join(sorted(connectives)))
+
+    if text.count("?") > 1:
+        score += 1
+        reasons.append("several questions")
+
+    if MONEY_OR_TIME_PATTERN.search(text):
+        score += 1
+        reasons.append("amounts or deadlines")
+
+    if LOOKUP_PATTERN.search(text) and len(words) <= 12:
+        score -= 2
+        reasons.append("short lookup question")
+
+    return score, reasons
+
+
+def classify(text, threshold=COMPLEXITY_THRESHOLD):
+    """Routes a query using the local heuristics only."""
+    score, reasons = complexity_score(text)
+    route = CHAIN_OF_THOUGHT if score >= threshold else DIRECT
+    return RouteDecision(route, score, reasons, "heuristic")
+
+
+# --- EMBEDDING ROUTER ---
+
+SIMPLE_EXAMPLES = [
+    "What is RTI?",
+    "What is an FIR?",
+    "Define bail.",
+    "What does Article 21 say?",
+    "Which law covers consumer complaints?",
+    "What is the minimum wage act?",
+]
+COMPLEX_EXAMPLES = [
+    "My landlord kept my deposit and my roommate says the agreement makes me liable for his damage.",
+    "My employer fired me after I complained to HR about my manager, and now the company won't pay my dues.",
+    "My husband's family took my jewellery, and the police refuse to file a complaint because they know my father-in-law.",
+    "The builder delayed possession by two years, the bank keeps charging EMI and the seller is now asking for more money.",
+]
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _centroid(vectors):
+    return [sum(values) / len(vectors) for values in zip(*vectors)]
+
+
+class CentroidRouter:
+    """
+    Nearest-centroid classifier over query embeddings.
+
+    Fit it once with an embedding function (e.g. the app's get_embedding),
+    then `classify(text)` costs one embedding call and two dot products.
+    """
+
+    def __init__(self, embed, simple_examples=SIMPLE_EXAMPLES, complex_examples=COMPLEX_EXAMPLES):
+        self.embed = embed
+        self.simple_centroid = _centroid([embed(t) for t in simple_examples])
+        self.complex_centroid = _centroid([embed(t) for t in complex_examples])
+
+    def classify(self, text):
+        vector = self.embed(text)
+        if vector is None:
+            return classify(text)
+        simple = _cosine(vector, self.simple_centroid)
+        complex_ = _cosine(vector, self.complex_centroid)
+        route = CHAIN_OF_THOUGHT if complex_ > simple else DIRECT
+        return RouteDecision(route, round(complex_ - simple, 4), [f"simple={simple:.3f}", f"complex={complex_:.3f}"], "centroid")
+
+
+# --- DECISION LOG ---
+
+_lock = threading.Lock()
+_counts = {DIRECT: 0, CHAIN_OF_THOUGHT: 0}
+_latency = {DIRECT: None, CHAIN_OF_THOUGHT: None}
+LATENCY_SMOOTHING = 0.2
+
+
+def record(decision, query, latency_s=None):
+    """Logs a routing decision and (optionally) how long the routed generation took."""
+    with _lock:
+        _counts[decision.route] += 1
+        if latency_s is not None:
+            previous = _latency[decision.route]
+            _latency[decision.route] = latency_s if previous is None else (
+                (1 - LATENCY_SMOOTHING) * previous + LATENCY_SMOOTHING * latency_s
+            )
+        saved = _estimated_saving_locked()
+
+    logger.info(
+        "route=%s method=%s score=%s latency=%s est_saved_total=%.2fs reasons=%s query=%r",
+        decision.route, decision.method, decision.score,
+        f"{latency_s:.2f}s" if latency_s is not None else "n/a", saved,
+        "; ".join(decision.reasons), query[:80],
+    )
+
+
+def _estimated_saving_locked():
+    direct, cot = _latency[DIRECT], _latency[CHAIN_OF_THOUGHT]
+    if direct is None or cot is None:
+        return 0.0
+    return max(0.0, cot - direct) * _counts[DIRECT]
+
+
+def stats():
+    """Route counts, smoothed latency per route and the estimated time saved by skipping chain-of-thought."""
+    with _lock:
+        return {
+            "routes": dict(_counts),
+            "avg_latency_s": dict(_latency),
+            "estimated_saved_s": _estimated_saving_locked(),
+        }
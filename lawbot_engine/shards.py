@@ -0,0 +1,381 @@
+"""
+A vector store split into shards, searched with scatter-gather.
+
+A full corpus per jurisdiction doesn't fit comfortably in one worker's
+memory, so `build_shards` splits the chunks by jurisdiction (or by a hash of
+the chunk) and writes each shard to its own files. A ShardRouter then starts
+one local process per shard, each holding only its own FAISS index, and for
+every query:
+
+1. skips the shards the jurisdiction filter rules out,
+2. sends the query to the remaining shards at the same time,
+3. waits up to a timeout, and
+4. merges the top-k from the shards that answered.
+
+Every shard uses an exact L2 index over the same embedding model, so the
+distances they return are directly comparable and the merged top-k is the
+same as searching one big index. A slow shard only costs its own results
+(reported as a timeout), never the whole query.
+
+    python -m lawbot_engine.shards build vector-database/knowledge_base*.txt
+    python -m lawbot_engine.shards query "Can I get information from the government?" --jurisdiction nepal
+"""
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from lawbot_engine import config, corpus, retrieval
+from lawbot_engine.chunkstore import ChunkStore, jurisdiction_of
+
+MANIFEST = "manifest.json"
+
+
+def assign_shard(chunk, by="jurisdiction", num_shards=4):
+    """The shard a chunk goes to: its jurisdiction, or a stable hash bucket."""
+    if by == "jurisdiction":
+        return jurisdiction_of(chunk)
+    digest = hashlib.sha1(chunk.encode("utf-8")).digest()
+    return f"shard-{int.from_bytes(digest[:4], 'big') % num_shards}"
+
+
+def build_shards(chunks, embed, directory=None, by="jurisdiction", num_shards=4, sources=None):
+    """
+    Embeds the chunks and writes one shard per group to `directory`.
+
+    `sources` is one source file name per chunk (or one for all of them),
+    kept in each shard's source column.
+    Each shard is an exported corpus (see corpus.py) in `<directory>/<name>/`,
+    which its process memory-maps, and `manifest.json` lists the shards with
+    the jurisdictions, acts and Parts they hold (so the app can offer filters
+    without loading any shard). Returns the manifest.
+    """
+    import numpy as np
+
+    directory = directory or config.SHARD_DIR
+    os.makedirs(directory, exist_ok=True)
+    if sources is None or isinstance(sources, str):
+        sources = [sources] * len(chunks)
+    groups = {}
+    for chunk, source in zip(chunks, sources):
+        vector = embed(chunk)
+        if vector is not None:
+            groups.setdefault(assign_shard(chunk, by, num_shards), []).append((chunk, vector, source))
+
+    manifest = {"by": by, "embedding_model": config.EMBEDDING_MODEL, "shards": {}}
+    for name, rows in sorted(groups.items()):
+        vectors = np.asarray([vector for _, vector, _ in rows], dtype="float32")
+        store = ChunkStore.from_chunks([chunk for chunk, _, _ in rows], [source for _, _, source in rows])
+        corpus.save_corpus(os.path.join(directory, name), store, vectors, config.EMBEDDING_MODEL)
+        manifest["shards"][name] = {
+            "count": len(rows),
+            "dimension": int(vectors.shape[1]),
+            "jurisdictions": sorted({jurisdiction_of(chunk) for chunk, _, _ in rows}),
+            "acts": store.values("act"),
+            "parts": store.values("part"),
+        }
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(directory=None):
+    """The manifest of a built shard directory, or None if nothing has been built there."""
+    path = os.path.join(directory or config.SHARD_DIR, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_shard(directory, name):
+    """A VectorIndex over one shard's files."""
+    import numpy as np
+
+    if os.path.isdir(os.path.join(directory, name)):
+        return corpus.load_index(os.path.join(directory, name))
+    # Shards built before they were stored as corpus directories
+    with open(os.path.join(directory, f"{name}.chunks.json"), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    return retrieval.VectorIndex(chunks, np.load(os.path.join(directory, f"{name}.npy")))
+
+
+# --- SERVING ---
+
+def _serve_shard(directory, name, conn):
+    """Runs in the shard's own process: load the shard, then answer searches until told to stop."""
+    index = load_shard(directory, name)
+    conn.send(("ready", len(index)))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        request_id, query_embedding, k, where = message
+        started = time.perf_counter()
+        try:
+            reply = (request_id, index.search(query_embedding, k, where), None, time.perf_counter() - started)
+        except Exception as e:
+            reply = (request_id, [], f"{type(e).__name__}: {e}", time.perf_counter() - started)
+        conn.send(reply)
+    conn.close()
+
+
+class ProcessShard:
+    """A shard served by its own process; `submit` returns a Future of (results, error, shard_seconds)."""
+
+    def __init__(self, directory, name, context):
+        self.name = name
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve_shard, args=(directory, name, child_conn), name=f"lawbot-shard-{name}", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        _, self.count = self._conn.recv()  # Wait until the shard is loaded
+
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_replies, name=f"lawbot-shard-{name}-reader", daemon=True)
+        self._reader.start()
+
+    def submit(self, query_embedding, k, where=None):
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self._conn.send((request_id, list(query_embedding), k, where))
+        return future
+
+    def forget(self, future):
+        """Drops a timed-out request so its late reply is discarded."""
+        with self._lock:
+            for request_id, pending in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[request_id]
+
+    def _read_replies(self):
+        while True:
+            try:
+                request_id, results, error, seconds = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_result(([tuple(r) for r in results], error, seconds))
+        # The process is gone: fail whatever was still waiting
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_result(([], "shard process exited", None))
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+class LocalShard:
+    """A shard searched on a thread in this process (same interface as ProcessShard)."""
+
+    def __init__(self, directory, name, pool):
+        self.name = name
+        self._index = load_shard(directory, name)
+        self.count = len(self._index)
+        self._pool = pool
+
+    def _search(self, query_embedding, k, where):
+        started = time.perf_counter()
+        return self._index.search(query_embedding, k, where), None, time.perf_counter() - started
+
+    def submit(self, query_embedding, k, where=None):
+        return self._pool.submit(self._search, query_embedding, k, where)
+
+    def forget(self, future):
+        future.cancel()
+
+    def close(self):
+        pass
+
+
+class ShardedResult:
+    """Merged results plus what each shard did for this query."""
+
+    __slots__ = ("results", "shards", "elapsed_s")
+
+    def __init__(self, results, shards, elapsed_s):
+        self.results = results  # [(chunk, distance, shard)], closest first
+        self.shards = shards  # {shard: {"status", "latency_s", "hits", "error"}}
+        self.elapsed_s = elapsed_s
+
+    @property
+    def complete(self):
+        """False if a shard that should have answered timed out or failed."""
+        return all(s["status"] in ("ok", "skipped") for s in self.shards.values())
+
+
+class ShardRouter:
+    """
+    Fans a query out to every relevant shard and merges their top-k.
+
+    With `processes=True` (the default) each shard runs in its own process;
+    with False they are searched on threads here, which is handier for
+    small corpora. Call `close()` to stop the shard processes.
+    """
+
+    def __init__(self, directory=None, timeout_s=None, processes=True):
+        import multiprocessing
+
+        self.directory = directory or config.SHARD_DIR
+        self.manifest = load_manifest(self.directory)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No shards built in {self.directory}; run `python -m lawbot_engine.shards build`.")
+        self.timeout_s = timeout_s if timeout_s is not None else config.SHARD_TIMEOUT_S
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.manifest["shards"])))
+        if processes:
+            # "spawn" starts clean interpreters, which is safe from threaded servers like Streamlit
+            context = multiprocessing.get_context("spawn")
+            make = lambda name: ProcessShard(self.directory, name, context)
+        else:
+            make = lambda name: LocalShard(self.directory, name, self._pool)
+        # Start (and load) the shards in parallel
+        self.shards = dict(zip(self.manifest["shards"], self._pool.map(make, self.manifest["shards"])))
+
+    @property
+    def embedding_model(self):
+        """The model the shards were embedded with; queries must use the same one."""
+        return self.manifest.get("embedding_model") or config.EMBEDDING_MODEL
+
+    def __len__(self):
+        return sum(info["count"] for info in self.manifest["shards"].values())
+
+    def jurisdictions(self):
+        return sorted({j for info in self.manifest["shards"].values() for j in info["jurisdictions"]})
+
+    def values(self, column):
+        """The distinct acts or Parts across the shards (empty for shards built before they were recorded)."""
+        key = {"act": "acts", "part": "parts"}[column]
+        return sorted({value for info in self.manifest["shards"].values() for value in info.get(key, ())})
+
+    def search(self, query_embedding, k=2, jurisdictions=None, timeout_s=None, where=None):
+        """
+        Top-k (chunk, distance, shard) across the shards holding any of `jurisdictions` (all if None).
+
+        `where` is a metadata filter each shard applies before searching (see ChunkStore.mask).
+        """
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        started = time.perf_counter()
+        report = {}
+        futures = {}
+        for name, shard in self.shards.items():
+            held = self.manifest["shards"][name]["jurisdictions"]
+            if jurisdictions and not set(held) & set(jurisdictions):
+                report[name] = {"status": "skipped", "latency_s": None, "hits": 0, "error": None}
+                continue
+            futures[shard.submit(query_embedding, k, where)] = name
+
+        done, not_done = wait(futures, timeout=timeout_s)
+        candidates = []
+        for future in done:
+            name = futures[future]
+            results, error, seconds = future.result()
+            report[name] = {"status": "error" if error else "ok", "latency_s": seconds, "hits": len(results), "error": error}
+            candidates.extend((chunk, distance, name) for chunk, distance in results)
+        for future in not_done:
+            name = futures[future]
+            self.shards[name].forget(future)
+            report[name] = {"status": "timeout", "latency_s": timeout_s, "hits": 0, "error": None}
+
+        merged = heapq.nsmallest(k, candidates, key=lambda row: row[1])
+        return ShardedResult(merged, report, time.perf_counter() - started)
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self._pool.shutdown(wait=False)
+
+
+# --- SHARED ROUTER ---
+
+_router_lock = threading.Lock()
+_router = None
+
+
+def get_shared_router(directory=None):
+    """The process-wide router (shard processes start on first use), or None if no shards are built."""
+    global _router
+    directory = directory or config.SHARD_DIR
+    if _router is not None and _router.directory == directory:
+        return _router
+    with _router_lock:
+        if _router is None or _router.directory != directory:
+            if load_manifest(directory) is None:
+                return None
+            if _router is not None:
+                _router.close()
+            _router = ShardRouter(directory)
+    return _router
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query LawBot's sharded vector store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Embed knowledge base files and write the shards.")
+    build.add_argument("files", nargs="*", help="Knowledge base .txt files (default: the Vector Database app's).")
+    build.add_argument("--out", default=config.SHARD_DIR)
+    build.add_argument("--by", choices=("jurisdiction", "hash"), default="jurisdiction")
+    build.add_argument("--shards", type=int, default=4, help="Number of shards with --by hash.")
+
+    query = commands.add_parser("query", help="Search the shards.")
+    query.add_argument("text")
+    query.add_argument("--dir", default=config.SHARD_DIR)
+    query.add_argument("-k", type=int, default=2)
+    query.add_argument("--jurisdiction", action="append", help="Only search shards holding this jurisdiction.")
+    query.add_argument("--timeout-ms", type=float, help="Per-query shard timeout.")
+    query.add_argument("--in-process", action="store_true", help="Search shards on threads instead of processes.")
+    args = parser.parse_args(argv)
+
+    from lawbot_engine.embedding import get_embedding
+
+    if args.command == "build":
+        chunks, sources = [], []
+        for path in args.files or [config.KNOWLEDGE_BASE_PATH]:
+            file_chunks = retrieval.split_chunks(retrieval.load_knowledge_base(path))
+            chunks.extend(file_chunks)
+            sources.extend([os.path.basename(path)] * len(file_chunks))
+        manifest = build_shards(chunks, get_embedding, args.out, args.by, args.shards, sources)
+        for name, info in manifest["shards"].items():
+            print(f"{name:<12}{info['count']:>5} chunks  {', '.join(info['jurisdictions'])}")
+        return 0
+
+    router = ShardRouter(args.dir, args.timeout_ms / 1000.0 if args.timeout_ms else None, not args.in_process)
+    try:
+        result = router.search(get_embedding(args.text, router.embedding_model), args.k, args.jurisdiction)
+    finally:
+        router.close()
+    for chunk, distance, shard in result.results:
+        print(f"[{shard} {distance:.3f}] {chunk.splitlines()[0]}")
+    for name, info in sorted(result.shards.items()):
+        latency = f"{info['latency_s'] * 1000:.1f} ms" if info["latency_s"] is not None else "-"
+        print(f"  {name:<12}{info['status']:<9}{latency:>10}  {info['hits']} hits")
+    print(f"total {result.elapsed_s * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Similarity metrics between two embedding vectors.
+
+numpy is imported inside each function so that importing this module stays
+instant; after the first call the import is just a dictionary lookup.
+"""
+
+
+def cosine_similarity(vec1, vec2):
+    """Calculates cosine similarity between two vectors (0.0 if either is all zeros)."""
+    import numpy as np
+
+    dot_product = np.dot(vec1, vec2)
+    norm_vec1 = np.linalg.norm(vec1)
+    norm_vec2 = np.linalg.norm(vec2)
+    # Avoid division by zero
+    if norm_vec1 == 0 or norm_vec2 == 0:
+        return 0.0
+    return float(dot_product / (norm_vec1 * norm_vec2))
+
+
+def l2_distance(vec1, vec2):
+    """Straight-line (Euclidean) distance between two vectors."""
+    import numpy as np
+
+    return float(np.linalg.norm(np.asarray(vec1) - np.asarray(vec2)))
+
+
+def dot_product(vec1, vec2):
+    """The raw dot product of the two vectors."""
+    import numpy as np
+
+    return float(np.dot(vec1, vec2))
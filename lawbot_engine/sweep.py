@@ -0,0 +1,242 @@
+"""
+Concurrent sampling-parameter sweeps for the temperature, top-k and top-p apps.
+
+A sweep runs every (question, temperature, top_k, top_p) cell of a grid
+through Gemini, a few cells at a time. Finished cells are appended to a
+JSON-lines cache file, so re-running an interrupted sweep only generates the
+cells that are still missing.
+"""
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lawbot_engine import registry, tracing
+from lawbot_engine.formatting import check_format
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+# --- GRID ---
+
+def parse_values(text, cast=float):
+    """Parses a comma-separated list like "0.2, 0.5, 0.9" (blank means "model default")."""
+    values = [cast(part) for part in (text or "").replace(";", ",").split(",") if part.strip()]
+    return values or [None]
+
+
+def build_grid(questions, temperatures=(None,), top_ks=(None,), top_ps=(None,)):
+    """Returns one cell per combination of question and sampling values."""
+    return [
+        {"question": q, "temperature": t, "top_k": k, "top_p": p}
+        for q, t, k, p in itertools.product(questions, temperatures, top_ks, top_ps)
+    ]
+
+
+def generation_config(cell):
+    """Turns a grid cell into the generation config Gemini expects, leaving out unset values."""
+    return {name: cell[name] for name in ("temperature", "top_k", "top_p") if cell.get(name) is not None}
+
+
+def cell_key(cell, system_prompt, examples, model_name=registry.DEFAULT_MODEL):
+    """A stable id for a cell; it changes if the prompt or examples change."""
+    payload = json.dumps(
+        [model_name, system_prompt, examples, cell["question"], generation_config(cell)],
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# --- RESUMABLE CACHE ---
+
+class SweepCache:
+    """Completed cells, kept in memory and appended to a JSON-lines file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A half-written line from an interrupted run
+                    self._results[record["key"]] = record
+
+    def get(self, key):
+        return self._results.get(key)
+
+    def put(self, record):
+        with self._lock:
+            self._results[record["key"]] = record
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __len__(self):
+        return len(self._results)
+
+
+# --- RUNNING ---
+
+def run_cell(cell, system_prompt, examples, build_prompt, model_name=registry.DEFAULT_MODEL, sections=None):
+    """Generates one cell and measures latency, output length and format compliance."""
+    model = registry.get_model(model_name, system_prompt, generation_config(cell) or None)
+    contents = examples + [{"role": "user", "parts": [build_prompt(cell["question"])]}]
+
+    start = time.perf_counter()
+    with tracing.span("sweep_cell", model=model_name, **generation_config(cell)):
+        try:
+            text = model.generate_content(contents).text
+            error = None
+        except Exception as e:
+            text, error = "", str(e)
+            tracing.record_error("sweep_cell", e)
+    latency = time.perf_counter() - start
+
+    fmt = check_format(text, sections) if sections else check_format(text)
+    return {
+        **cell,
+        "latency_s": round(latency, 3),
+        "output_chars": len(text),
+        "output_words": len(text.split()),
+        "format_ok": fmt["compliant"] and not error,
+        "missing_sections": fmt["missing"],
+        "error": error,
+        "answer": text,
+    }
+
+
+def iter_sweep(cells, system_prompt, examples, build_prompt, cache=None,
+               max_concurrency=DEFAULT_MAX_CONCURRENCY, model_name=registry.DEFAULT_MODEL, sections=None):
+    """
+    Runs every cell and yields each result as soon as it is ready.
+
+    Cached cells are yielded first (marked `cached`). The rest run on at most
+    `max_concurrency` threads. Failed cells are not cached, so they are
+    retried on the next run. Results are yielded to the caller's thread, so
+    Streamlit can safely update a progress bar from the loop.
+    """
+    cache = cache if cache is not None else SweepCache()
+    pending = []
+    for cell in cells:
+        key = cell_key(cell, system_prompt, examples, model_name)
+        cached = cache.get(key)
+        if cached is not None:
+            yield {**cached, "cached": True}
+        else:
+            pending.append((key, cell))
+
+    if not pending:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = {
+            pool.submit(run_cell, cell, system_prompt, examples, build_prompt, model_name, sections): key
+            for key, cell in pending
+        }
+        for future in as_completed(futures):
+            result = {**future.result(), "key": futures[future]}
+            if result["error"] is None:
+                cache.put(result)
+            yield {**result, "cached": False}
+
+
+def run_sweep(cells, system_prompt, examples, build_prompt, **kwargs):
+    """Runs a whole sweep and returns the results in grid order."""
+    order = {cell_key(c, system_prompt, examples, kwargs.get("model_name", registry.DEFAULT_MODEL)): i
+             for i, c in enumerate(cells)}
+    results = list(iter_sweep(cells, system_prompt, examples, build_prompt, **kwargs))
+    return sorted(results, key=lambda r: order.get(r["key"], len(order)))
+
+
+# --- STREAMLIT PANEL ---
+
+def render_sweep_panel(system_prompt, examples, build_prompt, cache_path,
+                       default_temperatures="0.3", default_top_ks="", default_top_ps=""):
+    """Draws the sweep mode UI shared by the sampling apps."""
+    import streamlit as st
+
+    st.write("Run every combination of the values below for each question. Leave a box blank to use the model default.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        temperatures = st.text_input("**Temperatures**", value=default_temperatures, placeholder="e.g., 0.0, 0.3, 0.7")
+    with col2:
+        top_ks = st.text_input("**Top K values**", value=default_top_ks, placeholder="e.g., 1, 20, 40")
+    with col3:
+        top_ps = st.text_input("**Top P values**", value=default_top_ps, placeholder="e.g., 0.5, 0.9, 0.95")
+
+    questions_text = st.text_area("**Questions (one per line):**", placeholder="e.g., Landlord not returning security deposit")
+    max_concurrency = st.slider("**Max concurrent requests**", min_value=1, max_value=16, value=DEFAULT_MAX_CONCURRENCY)
+
+    cache = SweepCache(cache_path)
+    st.caption(f"{len(cache)} completed cells cached in `{os.path.basename(cache_path)}`.")
+
+    run_col, clear_col = st.columns(2)
+    with clear_col:
+        if st.button("Clear sweep cache"):
+            cache.clear()
+            st.info("Sweep cache cleared.")
+    with run_col:
+        run_clicked = st.button("Run sweep", type="primary")
+
+    if not run_clicked:
+        return
+
+    questions = [q.strip() for q in questions_text.splitlines() if q.strip()]
+    try:
+        cells = build_grid(questions, parse_values(temperatures), parse_values(top_ks, int), parse_values(top_ps))
+    except ValueError:
+        st.error("Sampling values must be comma-separated numbers.")
+        return
+    if not questions:
+        st.warning("Please enter at least one question.")
+        return
+
+    progress = st.progress(0.0, text=f"Running {len(cells)} cells...")
+    results = []
+    for result in iter_sweep(cells, system_prompt, examples, build_prompt, cache=cache, max_concurrency=max_concurrency):
+        results.append(result)
+        progress.progress(len(results) / len(cells), text=f"{len(results)} / {len(cells)} cells done")
+
+    order = {cell_key(c, system_prompt, examples): i for i, c in enumerate(cells)}
+    results.sort(key=lambda r: order.get(r["key"], len(order)))
+
+    st.subheader("Sweep Results")
+    st.dataframe(
+        [
+            {
+                "question": r["question"],
+                "temperature": r["temperature"],
+                "top_k": r["top_k"],
+                "top_p": r["top_p"],
+                "latency (s)": r["latency_s"],
+                "output chars": r["output_chars"],
+                "format ok": r["format_ok"],
+                "missing sections": ", ".join(r["missing_sections"]),
+                "cached": r["cached"],
+                "error": r["error"] or "",
+            }
+            for r in results
+        ]
+    )
+
+    for question in questions:
+        with st.expander(f"Answers for: {question}"):
+            rows = [r for r in results if r["question"] == question]
+            columns = st.columns(min(len(rows), 3) or 1)
+            for i, r in enumerate(rows):
+                with columns[i % len(columns)]:
+                    st.caption(f"T={r['temperature']} · K={r['top_k']} · P={r['top_p']} · {r['latency_s']}s")
+                    st.markdown(r["answer"] or f"_Error: {r['error']}_")
@@ -0,0 +1,402 @@
+"""
+Per-stage latency tracing for LawBot requests.
+
+Wrap each stage of a request in a span:
+
+    with tracing.span("embed", model=model) as s:
+        vector = ...
+        s.set(cache_hit=False)
+
+Every finished span is added to an in-process latency histogram for its stage
+(embed, search, prompt, generate, render, ...). The histograms are served in
+the Prometheus text format on http://127.0.0.1:<LAWBOT_METRICS_PORT>/metrics,
+and with LAWBOT_TRACE_LOG set each span is also appended to that file as one
+JSON line. `python -m lawbot_engine.tracing trace.jsonl` prints p50/p95/p99
+per stage from such a log.
+
+Spans opened inside another span (in the same thread) share its trace id, so
+a log line can be tied back to the request it belonged to. Work handed to
+another thread joins the trace with `attached(parent)`. A span stopped by
+`Cancelled` (work nobody waits for any more, like a losing hedged request)
+is logged with cancelled=True but left out of the latency histograms.
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from lawbot_engine import config
+
+logger = logging.getLogger("lawbot.tracing")
+
+# Upper bounds (seconds) of the histogram buckets, from a cache hit to a slow generation
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets for counts, such as how many requests went into one batch
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Modules whose stats() counters are also exported on /metrics
+STATS_MODULES = ("registry", "embedding", "generation", "conversation", "batching", "deadlines", "grounding")
+
+_lock = threading.Lock()
+_local = threading.local()
+_histograms = {}
+_values = {}  # Histograms of other observed values (see observe)
+_errors = {}
+_log_lock = threading.Lock()
+_server = None
+
+
+class Cancelled(BaseException):
+    """Raised to stop work whose result is no longer wanted (BaseException, so it isn't logged as a failure)."""
+
+
+class Histogram:
+    """Counts of observed durations (or other values) per bucket, plus their sum."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th (0-1) observation; inf past the last bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Span:
+    """One timed stage of a request."""
+
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "start", "duration", "error")
+
+    def __init__(self, name, attrs, trace_id, parent_id):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attrs):
+        """Adds attributes (model, k, tokens, cache_hit, ...) to the span."""
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+def current_span():
+    """The innermost open span in this thread, or None."""
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def attached(parent):
+    """Makes `parent`, a span from another thread, the current span here, so new spans join its trace."""
+    previous = current_span()
+    _local.span = parent
+    try:
+        yield parent
+    finally:
+        _local.span = previous
+
+
+@contextmanager
+def span(name, **attrs):
+    """Times the enclosed block as stage `name`. Exceptions are recorded on the span and re-raised."""
+    start_metrics_server()
+    parent = current_span()
+    s = Span(name, attrs, parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None)
+    _local.span = s
+    started = time.perf_counter()
+    try:
+        yield s
+    except Cancelled:
+        s.set(cancelled=True)
+        raise
+    except Exception as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.duration = time.perf_counter() - started
+        _local.span = parent
+        _finish(s)
+
+
+def traced(name):
+    """Decorator form of `span` for a function that is one whole stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _finish(s):
+    with _lock:
+        if not s.attrs.get("cancelled"):
+            histogram = _histograms.get(s.name)
+            if histogram is None:
+                histogram = _histograms[s.name] = Histogram()
+            histogram.observe(s.duration)
+        if s.error:
+            _errors[s.name] = _errors.get(s.name, 0) + 1
+
+    if s.error:
+        logger.warning("stage=%s failed after %.3fs trace=%s error=%s", s.name, s.duration, s.trace_id, s.error)
+
+    if config.TRACE_LOG_PATH:
+        line = json.dumps(s.to_dict(), default=str)
+        with _log_lock:
+            with open(config.TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def record_error(name, error):
+    """Counts an error that was handled without a span around it (e.g. shown with st.error)."""
+    with _lock:
+        _errors[name] = _errors.get(name, 0) + 1
+    parent = current_span()
+    logger.warning("stage=%s error=%s: %s trace=%s", name, type(error).__name__, error,
+                   parent.trace_id if parent else "-")
+
+
+def observe(name, value, buckets=BUCKETS):
+    """
+    Adds a value that isn't a stage's duration (a batch size, a queue wait)
+    to the histogram `name`, exported on /metrics as lawbot_<name>.
+    """
+    with _lock:
+        histogram = _values.get(name)
+        if histogram is None:
+            histogram = _values[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def value_summary():
+    """Count, mean and bucketed p50/p95/p99 of every histogram fed through `observe`."""
+    with _lock:
+        return {
+            name: {
+                "count": h.count,
+                "mean": h.total / h.count if h.count else 0.0,
+                "p50": h.quantile(0.50),
+                "p95": h.quantile(0.95),
+                "p99": h.quantile(0.99),
+            }
+            for name, h in sorted(_values.items())
+        }
+
+
+def summary():
+    """Count, error count and bucketed p50/p95/p99 (seconds) per stage."""
+    with _lock:
+        names = sorted(set(_histograms) | set(_errors))
+        return {
+            name: {
+                "count": _histograms[name].count if name in _histograms else 0,
+                "errors": _errors.get(name, 0),
+                "p50_s": _histograms[name].quantile(0.50) if name in _histograms else 0.0,
+                "p95_s": _histograms[name].quantile(0.95) if name in _histograms else 0.0,
+                "p99_s": _histograms[name].quantile(0.99) if name in _histograms else 0.0,
+            }
+            for name in names
+        }
+
+
+def reset():
+    """Forgets every recorded histogram and error count."""
+    with _lock:
+        _histograms.clear()
+        _values.clear()
+        _errors.clear()
+
+
+# --- PROMETHEUS TEXT FORMAT ---
+
+def _stats_lines():
+    """The numeric counters from the other modules' stats() as gauges."""
+    import importlib
+
+    lines = []
+    for module_name in STATS_MODULES:
+        module = importlib.import_module(f"lawbot_engine.{module_name}")
+        for key, value in module.stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metric = f"lawbot_{module_name}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+    return lines
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {name: (list(h.counts), h.total, h.count) for name, h in _histograms.items()}
+        values = {name: (h.buckets, list(h.counts), h.total, h.count) for name, h in _values.items()}
+        errors = dict(_errors)
+
+    lines = [
+        "# HELP lawbot_stage_duration_seconds Time spent in each request stage.",
+        "# TYPE lawbot_stage_duration_seconds histogram",
+    ]
+    for name in sorted(histograms):
+        counts, total, count = histograms[name]
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'lawbot_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'lawbot_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+        lines.append(f'lawbot_stage_duration_seconds_sum{{stage="{name}"}} {total}')
+        lines.append(f'lawbot_stage_duration_seconds_count{{stage="{name}"}} {count}')
+
+    lines.append("# HELP lawbot_stage_errors_total Errors raised or reported in each request stage.")
+    lines.append("# TYPE lawbot_stage_errors_total counter")
+    for name in sorted(errors):
+        lines.append(f'lawbot_stage_errors_total{{stage="{name}"}} {errors[name]}')
+
+    for name in sorted(values):
+        buckets, counts, total, count = values[name]
+        metric = f"lawbot_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, n in zip(buckets, counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{metric}_sum {total}")
+        lines.append(f"{metric}_count {count}")
+
+    lines.extend(_stats_lines())
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    Serves /metrics on a background thread (once per process).
+
+    Without a port (argument or LAWBOT_METRICS_PORT) this does nothing and
+    returns None; otherwise it returns the running server.
+    """
+    global _server
+    if _server is not None:
+        return _server
+    port = port or config.METRICS_PORT
+    if not port:
+        return None
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would drown out the app's own logs
+
+    with _lock:
+        if _server is None:
+            try:
+                server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except OSError as e:
+                # e.g. a second Streamlit process on the same port; tracing itself still works
+                logger.warning("metrics endpoint not started on port %s: %s", port, e)
+                config.METRICS_PORT = None
+                return None
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="lawbot-metrics", daemon=True).start()
+            logger.info("metrics endpoint on http://%s:%s/metrics", host, server.server_address[1])
+            _server = server
+    return _server
+
+
+# --- TRACE LOG SUMMARY ---
+
+def summarize_log(path):
+    """Per-stage count, errors and exact p50/p95/p99 (ms) from a JSON-lines trace log."""
+    from lawbot_engine.harness import percentile
+
+    durations = {}
+    errors = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["attrs"].get("cancelled"):
+                continue
+            durations.setdefault(record["name"], []).append(record["duration_ms"])
+            if record.get("error"):
+                errors[record["name"]] = errors.get(record["name"], 0) + 1
+    return {
+        name: {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        }
+        for name, values in sorted(durations.items())
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a LawBot trace log (LAWBOT_TRACE_LOG).")
+    parser.add_argument("trace_log", nargs="?", default=config.TRACE_LOG_PATH, help="JSON-lines trace file")
+    args = parser.parse_args(argv)
+    if not args.trace_log or not os.path.exists(args.trace_log):
+        parser.error("no trace log given (pass a path or set LAWBOT_TRACE_LOG)")
+
+    summary_rows = summarize_log(args.trace_log)
+    print(f"{'stage':<20}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in summary_rows.items():
+        print(f"{name:<20}{row['count']:>8}{row['errors']:>8}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import streamlit as st
+import os
+import sys
+
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import (
+    config, conversation, deadlines, embedding, jurisdictions, prompting, registry, rerank, retrieval, tracing
+)
+
+# --- CONFIGURATION ---
+st.set_page_config(
+    page_title="LawBot Chat",
+    page_icon="💬",
+    layout="centered",
+)
+
+# Configure the Gemini API
+api_key = config.get_api_key()  # From the environment or .env
+if not api_key:
+    st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
+    st.stop()
+registry.configure(api_key)
+
+# --- PROMPTS ---
+# The chat reuses the Dynamic LawBot's SYSTEM_PROMPT and EXAMPLES, so answers keep the same sections
+prompts = prompting.load_prompts(os.path.join(REPO_ROOT, "dynamic-shot-prompting"))
+SYSTEM_PROMPT, EXAMPLES = prompts.SYSTEM_PROMPT, prompts.EXAMPLES
+
+# --- MODEL INITIALIZATION ---
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
+
+KNOWLEDGE_BASES = [
+    os.path.join(REPO_ROOT, "vector-database", "knowledge_base.txt"),
+    os.path.join(REPO_ROOT, "vector-database", "knowledge_base_nepal.txt"),
+]
+
+
+def retrieve_articles(question, place):
+    """The knowledge-base articles most relevant to a question (from the place's country, if known)."""
+    # Never waits for the index: while it builds in the background, answer without articles
+    index = retrieval.serving_index(KNOWLEDGE_BASES).index
+    if index is None:
+        return []
+    where = {"jurisdiction": place.country.lower()} if place else None
+    query_embedding = embedding.get_embedding(question, index.embedding_model)
+    retrieved = rerank.retrieve(index, question, query_embedding, k=3, where=where)
+    return [chunk for row, chunk, score in retrieved.results]
+
+
+# --- SESSION STATE ---
+# Each browser session keeps its own conversation; older turns are compacted
+# into a short summary so the prompt stays the same size however long it runs.
+if "conversation" not in st.session_state:
+    st.session_state.conversation = conversation.Conversation()
+    st.session_state.messages = []  # Everything shown on screen, including compacted turns
+chat = st.session_state.conversation
+
+# --- CHAT INTERFACE ---
+st.title("💬 LawBot Chat")
+st.caption("Ask a question, then follow up. LawBot remembers the conversation.")
+
+with st.sidebar:
+    location = st.text_input("Your location (optional):", placeholder="e.g., Pune, Kathmandu")
+    st.metric("Turns", len(chat))
+    st.write(f"Kept word for word: {len(chat.turns)} · Summarised: {chat.compacted}")
+    if chat.summary_lines:
+        with st.expander("What LawBot remembers from earlier"):
+            st.text(chat.summary)
+    if st.button("Start a new conversation"):
+        chat.clear()
+        st.session_state.messages = []
+        st.rerun()
+
+for message in st.session_state.messages:
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+        if message.get("caption"):
+            st.caption(message["caption"])
+
+question = st.chat_input("e.g., My landlord in Delhi is not returning my deposit. What can I do?")
+
+# --- CORE LOGIC ---
+if question:
+    st.session_state.messages.append({"role": "user", "content": question})
+    with st.chat_message("user"):
+        st.markdown(question)
+
+    with st.chat_message("assistant"):
+        with st.spinner("LawBot is thinking..."), tracing.span("request", app="multi-turn-chat") as span:
+            try:
+                with tracing.span("prompt"):
+                    # The location box wins. Without it, a place named in a question is remembered
+                    # for the rest of the chat, but only an exact name ("Lucknow", not "up" or a
+                    # look-alike word), and never replacing a stronger match.
+                    if location:
+                        chat.place = jurisdictions.resolve(location)
+                    else:
+                        chat.note_place(jurisdictions.resolve(question, fuzzy=False))
+                    articles, reused = chat.context_for(question, lambda q: retrieve_articles(q, chat.place))
+                    note = jurisdictions.PROMPT_NOTE if chat.place else ""
+                    contents = chat.contents(EXAMPLES, question, articles, note)
+                    prompt_tokens = prompting.estimate_tokens(prompting.contents_text(SYSTEM_PROMPT, contents))
+                span.set(turn=len(chat) + 1, prompt_tokens=prompt_tokens, context_reused=reused)
+
+                answer_box = st.empty()
+                # Stream the answer and re-ask once if it breaks the section format; a slow
+                # model gets a hedged second request, then a local fallback at the deadline
+                # Only a first question is answered from (or kept in) the fallback cache: a
+                # follow-up like "what about appeals?" means something else in every chat
+                answer = deadlines.generate(
+                    model, contents, prompts.SECTIONS, on_text=answer_box.markdown, question=question,
+                    app="multi-turn-chat", context=chat.place.label if chat.place else None, cache=not len(chat),
+                )
+                with tracing.span("render"):
+                    answer_box.markdown(answer.text)
+                    if deadlines.describe(answer):
+                        st.caption(deadlines.describe(answer))
+                    content = answer.text
+                    helplines = jurisdictions.format_helplines(chat.place, question, fallback=prompts.DEFAULT_LOCATION)
+                    if helplines:
+                        st.markdown(helplines)
+                        content += "\n\n" + helplines
+                    caption = (
+                        f"~{prompt_tokens} prompt tokens · "
+                        + ("reused the articles from the previous turn" if reused else f"retrieved {len(articles)} articles")
+                    )
+                    st.caption(caption)
+
+                chat.add_turn(question, answer.text)
+                st.session_state.messages.append({"role": "assistant", "content": content, "caption": caption})
+
+            except Exception as e:
+                st.error("An error occurred while generating your answer. Please try again.")
+                tracing.record_error("request", e)
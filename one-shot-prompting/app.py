@@ -1,10 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import deadlines, jurisdictions, prompting, registry, tracing
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -15,36 +17,18 @@ st.set_page_config(
 
 # Configure the Gemini API
 try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except AttributeError:
+    registry.configure()  # Reads GEMINI_API_KEY from the environment or .env
+except ValueError:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
 
-# --- ONE-SHOT EXAMPLE (THE "BLUEPRINT") ---
-# This list now contains only ONE perfect example, making this "one-shot" prompting.
-# We've chosen the cyberbullying example as it's modern and well-structured.
-EXAMPLES = [
-    {
-        "role": "user",
-        "parts": ["How can I report cyberbullying in Nepal?"]
-    },
-    {
-        "role": "model",
-        "parts": [
-            "**[Simplified Explanation]:** Cyberbullying is a crime in Nepal where electronic communication is used to harass, threaten, or intimidate someone. You can report this to the police for legal action.\n\n"
-            "**[Legal Reference]:** The Electronic Transactions Act, 2063 (2008), specifically Section 47, which penalizes online harassment.\n\n"
-            "**[Actionable Steps]:**\n1. Take screenshots and save URLs as evidence.\n2. Do not engage with or respond to the bully.\n3. Report the user on the social media platform.\n4. File a formal complaint with the Nepal Police Cyber Bureau."
-        ]
-    }
-]
+# --- PROMPTS ---
+# SYSTEM_PROMPT, EXAMPLES and build_prompt live in prompts.py next to this file
+prompts = prompting.load_prompts(os.path.dirname(os.path.abspath(__file__)))
+SYSTEM_PROMPT, EXAMPLES, build_prompt = prompts.SYSTEM_PROMPT, prompts.EXAMPLES, prompts.build_prompt
 
 # --- MODEL INITIALIZATION ---
-SYSTEM_PROMPT = "You are an expert legal assistant specializing in Nepalese law. Your name is LawBot. Answer the user's questions based on their specific situation. You must follow the format of the provided example precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
-
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=SYSTEM_PROMPT
-)
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
 
 # --- DYNAMIC USER INTERFACE (UI) ---
 st.title("🎯 One-Shot LawBot")
@@ -61,23 +45,39 @@ if st.button("Get Legal Advice"):
     if not legal_issue or not location:
         st.warning("Please fill in at least the legal issue and your location.")
     else:
-        with st.spinner("LawBot is analyzing your query..."):
+        with st.spinner("LawBot is analyzing your query..."), tracing.span("request", app="one-shot-prompting"):
             try:
-                # We build the dynamic prompt as before
-                final_prompt = (
-                    f"I am facing a legal issue in '{location}', Nepal. "
-                    f"The main problem is: '{legal_issue}'. "
-                    f"Here are some additional details: '{extra_details}'. "
-                    f"Based on this specific situation, what are my rights and what should I do?"
-                )
+                with tracing.span("prompt"):
+                    # Work out the place locally; its helplines come from a table, not the model
+                    place = jurisdictions.resolve(location)
+                    final_prompt = build_prompt(legal_issue, place.label if place else location, extra_details)
+                    if place:
+                        final_prompt += jurisdictions.PROMPT_NOTE
                 
                 # The model receives the ONE example + the new prompt
-                response = model.generate_content(
-                    EXAMPLES + [{"role": "user", "parts": [final_prompt]}]
-                )
-
                 st.subheader("LawBot's Personalized Advice:")
-                st.markdown(response.text)
+                answer_box = st.empty()
+                # Stream the answer and re-ask once if it breaks the section format; a slow
+                # model gets a hedged second request, then a local fallback at the deadline
+                answer = deadlines.generate(
+                    model,
+                    EXAMPLES + [{"role": "user", "parts": [final_prompt]}],
+                    prompts.SECTIONS,
+                    on_text=answer_box.markdown,
+                    question=f"{legal_issue} {extra_details}",
+                    app="one-shot-prompting",
+                    context=place.label if place else location,
+                )
+                with tracing.span("render"):
+                    answer_box.markdown(answer.text)
+                    if deadlines.describe(answer):
+                        st.caption(deadlines.describe(answer))
+                    helplines = jurisdictions.format_helplines(
+                        place, f"{legal_issue} {extra_details}", fallback=prompts.DEFAULT_LOCATION
+                    )
+                    if helplines:
+                        st.markdown(helplines)
 
             except Exception as e:
-                st.error(f"An error occurred: {e}")
\ No newline at end of file
+                st.error(f"An error occurred: {e}")
+                tracing.record_error("request", e)
\ No newline at end of file
@@ -1,10 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import config, deadlines, jurisdictions, prompting, registry, sweep, tracing
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -15,40 +17,37 @@ st.set_page_config(
 
 # Configure the Gemini API
 # Configure the Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
+api_key = config.get_api_key()  # From the environment or .env
 if not api_key:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
-genai.configure(api_key=api_key)
+registry.configure(api_key)
 
-# --- ONE-SHOT EXAMPLE (To maintain our structured output) ---
-EXAMPLES = [
-    {
-        "role": "user",
-        "parts": ["How can I report cyberbullying in Nepal?"]
-    },
-    {
-        "role": "model",
-        "parts": [
-            "**[Simplified Explanation]:** Cyberbullying is a crime in Nepal where electronic communication is used to harass, threaten, or intimidate someone. You can report this to the police for legal action.\n\n"
-            "**[Legal Reference]:** The Electronic Transactions Act, 2063 (2008), specifically Section 47, which penalizes online harassment.\n\n"
-            "**[Actionable Steps]:**\n1. Take screenshots and save URLs as evidence.\n2. Do not engage with or respond to the bully.\n3. Report the user on the social media platform.\n4. File a formal complaint with the Nepal Police Cyber Bureau."
-        ]
-    }
-]
+# --- PROMPTS ---
+# SYSTEM_PROMPT, EXAMPLES and build_prompt live in prompts.py next to this file
+prompts = prompting.load_prompts(os.path.dirname(os.path.abspath(__file__)))
+SYSTEM_PROMPT, EXAMPLES, build_prompt = prompts.SYSTEM_PROMPT, prompts.EXAMPLES, prompts.build_prompt
 
 # --- MODEL INITIALIZATION ---
-SYSTEM_PROMPT = "You are an expert legal assistant specializing in Nepalese law. Your name is LawBot. Answer the user's questions based on their specific situation. You must follow the format of the provided example precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
-
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=SYSTEM_PROMPT
-)
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
 
 # --- DYNAMIC USER INTERFACE (UI) ---
 st.title("🌡️ Temperature Tuning LawBot")
 st.caption("Control the AI's creativity")
 
+# NEW: Sweep mode runs a whole grid of sampling values at once
+mode = st.radio("**Mode:**", ["Single answer", "Parameter sweep"], horizontal=True)
+if mode == "Parameter sweep":
+    sweep_location = st.text_input("**In which city or province are you located?**", placeholder="e.g., Kathmandu, Pokhara", key="sweep_location")
+    sweep.render_sweep_panel(
+        SYSTEM_PROMPT,
+        EXAMPLES,
+        lambda question: build_prompt(question, sweep_location or "Kathmandu", ""),
+        cache_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_cache.jsonl"),
+        default_temperatures="0.0, 0.3, 0.7, 1.0",
+    )
+    st.stop()
+
 # NEW: Add a slider to control the temperature
 temp_slider = st.slider(
     "**Select Temperature:** (Low = Factual, High = Creative)",
@@ -70,29 +69,44 @@ if st.button("Get Legal Advice"):
     if not legal_issue or not location:
         st.warning("Please fill in at least the legal issue and your location.")
     else:
-        with st.spinner("LawBot is crafting your advice..."):
+        with st.spinner("LawBot is crafting your advice..."), tracing.span("request", app="temperature"):
             try:
                 # NEW: Create a generation_config to pass the temperature
-                generation_config = genai.types.GenerationConfig(
-                    temperature=temp_slider
-                )
+                generation_config = {"temperature": temp_slider}
 
-                final_prompt = (
-                    f"I am facing a legal issue in '{location}', Nepal. "
-                    f"The main problem is: '{legal_issue}'. "
-                    f"Here are some additional details: '{extra_details}'. "
-                    f"Based on this specific situation, what are my rights and what should I do?"
-                )
+                with tracing.span("prompt"):
+                    # Work out the place locally; its helplines come from a table, not the model
+                    place = jurisdictions.resolve(location)
+                    final_prompt = build_prompt(legal_issue, place.label if place else location, extra_details)
+                    if place:
+                        final_prompt += jurisdictions.PROMPT_NOTE
                 
-                response = model.generate_content(
+                st.subheader(f"LawBot's Advice (Temperature: {temp_slider})")
+                answer_box = st.empty()
+                # Stream the answer and re-ask once if it breaks the section format; a slow
+                # model gets a hedged second request, then a local fallback at the deadline
+                answer = deadlines.generate(
+                    model,
                     EXAMPLES + [{"role": "user", "parts": [final_prompt]}],
-                    generation_config=generation_config  # Pass the config here
+                    prompts.SECTIONS,
+                    generation_config=generation_config,
+                    on_text=answer_box.markdown,
+                    question=f"{legal_issue} {extra_details}",
+                    app="temperature",
+                    context=location,
                 )
-
-                st.subheader(f"LawBot's Advice (Temperature: {temp_slider})")
-                st.markdown(response.text)
+                with tracing.span("render"):
+                    answer_box.markdown(answer.text)
+                    if deadlines.describe(answer):
+                        st.caption(deadlines.describe(answer))
+                    helplines = jurisdictions.format_helplines(
+                        place, f"{legal_issue} {extra_details}", fallback=prompts.DEFAULT_LOCATION
+                    )
+                    if helplines:
+                        st.markdown(helplines)
 
             except Exception as e:
                 st.error("An unexpected error occurred while generating advice. Please try again later.")
-                # For debugging, the error is printed to the console where Streamlit is running.
-                print(f"An error occurred: {e}")
\ No newline at end of file
+                # For debugging, the failing stage logs the error (with its trace id) to the
+                # console where Streamlit is running, and counts it on the /metrics endpoint.
+                tracing.record_error("request", e)
\ No newline at end of file
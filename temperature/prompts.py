@@ -0,0 +1,44 @@
+"""
+Prompt construction for the Temperature Tuning LawBot.
+
+Kept out of app.py so the offline harness (lawbot_engine.harness) can
+import it without starting Streamlit.
+"""
+from lawbot_engine.formatting import SECTION_TAGS
+
+# --- ONE-SHOT EXAMPLE (To maintain our structured output) ---
+EXAMPLES = [
+    {
+        "role": "user",
+        "parts": ["How can I report cyberbullying in Nepal?"]
+    },
+    {
+        "role": "model",
+        "parts": [
+            "**[Simplified Explanation]:** Cyberbullying is a crime in Nepal where electronic communication is used to harass, threaten, or intimidate someone. You can report this to the police for legal action.\n\n"
+            "**[Legal Reference]:** The Electronic Transactions Act, 2063 (2008), specifically Section 47, which penalizes online harassment.\n\n"
+            "**[Actionable Steps]:**\n1. Take screenshots and save URLs as evidence.\n2. Do not engage with or respond to the bully.\n3. Report the user on the social media platform.\n4. File a formal complaint with the Nepal Police Cyber Bureau."
+        ]
+    }
+]
+
+SYSTEM_PROMPT = "You are an expert legal assistant specializing in Nepalese law. Your name is LawBot. Answer the user's questions based on their specific situation. You must follow the format of the provided example precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
+
+# The sections a well-formed answer from this app should contain
+SECTIONS = SECTION_TAGS
+
+# Used by the harness when a test question has no location
+DEFAULT_LOCATION = "Kathmandu"
+
+# The slider's default value in app.py
+GENERATION_CONFIG = {"temperature": 0.3}
+
+
+def build_prompt(legal_issue, location=DEFAULT_LOCATION, extra_details=""):
+    """Builds the user's prompt from the form fields."""
+    return (
+        f"I am facing a legal issue in '{location}', Nepal. "
+        f"The main problem is: '{legal_issue}'. "
+        f"Here are some additional details: '{extra_details}'. "
+        f"Based on this specific situation, what are my rights and what should I do?"
+    )
@@ -1,10 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load environment variables
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import deadlines, prompting, registry, sweep, tracing
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -15,39 +17,36 @@ st.set_page_config(
 
 # Configure the Gemini API
 try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except AttributeError:
+    registry.configure()  # Reads GEMINI_API_KEY from the environment or .env
+except ValueError:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop()
 
-# --- ONE-SHOT EXAMPLE (To maintain our structured output) ---
-EXAMPLES = [
-    {
-        "role": "user",
-        "parts": ["How can I report cyberbullying in India?"]
-    },
-    {
-        "role": "model",
-        "parts": [
-            "**[Simplified Explanation]:** Cyberbullying is a crime in India where electronic communication is used to harass, threaten, or intimidate someone. You can report this to the police for legal action.\n\n"
-            "**[Legal Reference]:** The Information Technology Act, 2000, and various sections of the Indian Penal Code (IPC) can be applied depending on the nature of the harassment.\n\n"
-            "**[Actionable Steps]:**\n1. Take screenshots and save URLs as evidence.\n2. Do not engage with or respond to the bully.\n3. Report the user on the social media platform.\n4. File a formal complaint with the National Cyber Crime Reporting Portal (cybercrime.gov.in) or the nearest police station."
-        ]
-    }
-]
+# --- PROMPTS ---
+# SYSTEM_PROMPT, EXAMPLES and build_prompt live in prompts.py next to this file
+prompts = prompting.load_prompts(os.path.dirname(os.path.abspath(__file__)))
+SYSTEM_PROMPT, EXAMPLES, build_prompt = prompts.SYSTEM_PROMPT, prompts.EXAMPLES, prompts.build_prompt
 
 # --- MODEL INITIALIZATION ---
-SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions based on their specific situation. You must follow the format of the provided example precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
-
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=SYSTEM_PROMPT
-)
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
 
 # --- DYNAMIC USER INTERFACE (UI) ---
 st.title("🇰 Top K Tuning LawBot")
 st.caption("Control the AI's vocabulary size")
 
+# NEW: Sweep mode runs a whole grid of sampling values at once
+mode = st.radio("**Mode:**", ["Single answer", "Parameter sweep"], horizontal=True)
+if mode == "Parameter sweep":
+    sweep_location = st.text_input("**In which country's context?**", placeholder="e.g., India", key="sweep_location")
+    sweep.render_sweep_panel(
+        SYSTEM_PROMPT,
+        EXAMPLES,
+        lambda question: build_prompt(question, sweep_location or "India", ""),
+        cache_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_cache.jsonl"),
+        default_temperatures="", default_top_ks="1, 20, 40",
+    )
+    st.stop()
+
 # NEW: Add a slider to control Top K
 top_k_slider = st.slider(
     "**Select Top K:** (Low = Safe & Repetitive, High = Natural & Diverse)",
@@ -69,27 +68,34 @@ if st.button("Get Legal Advice"):
     if not legal_issue or not location:
         st.warning("Please fill in at least the legal issue and country.")
     else:
-        with st.spinner("LawBot is crafting your advice..."):
+        with st.spinner("LawBot is crafting your advice..."), tracing.span("request", app="top-k"):
             try:
                 # NEW: Create a generation_config to pass Top K
-                generation_config = genai.types.GenerationConfig(
-                    top_k=top_k_slider
-                )
+                generation_config = {"top_k": top_k_slider}
 
-                final_prompt = (
-                    f"In the context of '{location}', "
-                    f"the main question is: '{legal_issue}'. "
-                    f"Here are some additional details: '{extra_details}'. "
-                    f"Based on this specific situation, what is the answer?"
-                )
+                with tracing.span("prompt"):
+
+                    final_prompt = build_prompt(legal_issue, location, extra_details)
                 
-                response = model.generate_content(
+                st.subheader(f"LawBot's Advice (Top K: {top_k_slider})")
+                answer_box = st.empty()
+                # Stream the answer and re-ask once if it breaks the section format; a slow
+                # model gets a hedged second request, then a local fallback at the deadline
+                answer = deadlines.generate(
+                    model,
                     EXAMPLES + [{"role": "user", "parts": [final_prompt]}],
-                    generation_config=generation_config
+                    prompts.SECTIONS,
+                    generation_config=generation_config,
+                    on_text=answer_box.markdown,
+                    question=legal_issue,
+                    app="top-k",
+                    context=location,
                 )
-
-                st.subheader(f"LawBot's Advice (Top K: {top_k_slider})")
-                st.markdown(response.text)
+                with tracing.span("render"):
+                    answer_box.markdown(answer.text)
+                    if deadlines.describe(answer):
+                        st.caption(deadlines.describe(answer))
 
             except Exception as e:
-                st.error(f"An error occurred: {e}")
\ No newline at end of file
+                st.error(f"An error occurred: {e}")
+                tracing.record_error("request", e)
\ No newline at end of file
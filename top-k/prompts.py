@@ -0,0 +1,44 @@
+"""
+Prompt construction for the Top K Tuning LawBot.
+
+Kept out of app.py so the offline harness (lawbot_engine.harness) can
+import it without starting Streamlit.
+"""
+from lawbot_engine.formatting import SECTION_TAGS
+
+# --- ONE-SHOT EXAMPLE (To maintain our structured output) ---
+EXAMPLES = [
+    {
+        "role": "user",
+        "parts": ["How can I report cyberbullying in India?"]
+    },
+    {
+        "role": "model",
+        "parts": [
+            "**[Simplified Explanation]:** Cyberbullying is a crime in India where electronic communication is used to harass, threaten, or intimidate someone. You can report this to the police for legal action.\n\n"
+            "**[Legal Reference]:** The Information Technology Act, 2000, and various sections of the Indian Penal Code (IPC) can be applied depending on the nature of the harassment.\n\n"
+            "**[Actionable Steps]:**\n1. Take screenshots and save URLs as evidence.\n2. Do not engage with or respond to the bully.\n3. Report the user on the social media platform.\n4. File a formal complaint with the National Cyber Crime Reporting Portal (cybercrime.gov.in) or the nearest police station."
+        ]
+    }
+]
+
+SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions based on their specific situation. You must follow the format of the provided example precisely, using the bolded tags like **[Simplified Explanation]:**, **[Legal Reference]:**, and **[Actionable Steps]:**."
+
+# The sections a well-formed answer from this app should contain
+SECTIONS = SECTION_TAGS
+
+# Used by the harness when a test question has no location
+DEFAULT_LOCATION = "India"
+
+# The slider's default value in app.py
+GENERATION_CONFIG = {"top_k": 40}
+
+
+def build_prompt(legal_issue, location=DEFAULT_LOCATION, extra_details=""):
+    """Builds the user's prompt from the form fields."""
+    return (
+        f"In the context of '{location}', "
+        f"the main question is: '{legal_issue}'. "
+        f"Here are some additional details: '{extra_details}'. "
+        f"Based on this specific situation, what is the answer?"
+    )
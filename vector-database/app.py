@@ -1,12 +1,14 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import numpy as np
-import faiss
-
-# Load environment variables
-load_dotenv()
+import sys
+
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import (
+    batching, config, deadlines, embedding, grounding, prompting, registry, rerank, retrieval, shards, tracing
+)
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -17,76 +19,182 @@ st.set_page_config(
 
 # Configure the Gemini API
 try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    registry.configure()  # Reads GEMINI_API_KEY from the environment or .env
 except Exception as e:
     st.error(f"🚨 Error configuring Gemini API. Please check your .env file. Error: {e}")
     st.stop()
 
+# --- PROMPTS ---
+# Grounded answers reuse the Dynamic LawBot's SYSTEM_PROMPT and EXAMPLES, so they keep the same sections
+prompts = prompting.load_prompts(os.path.join(REPO_ROOT, "dynamic-shot-prompting"))
+model = registry.get_model(system_instruction=prompts.SYSTEM_PROMPT)
+
 # --- FUNCTIONS ---
+# Embedding and FAISS search live in lawbot_engine; this wrapper only adds the UI error message.
 
-def get_embedding(text):
+def get_embedding(text, model=None):
     """Generates an embedding for a given piece of text."""
-    if not text or not text.strip(): return None
     try:
-        return genai.embed_content(model="models/embedding-001", content=text)['embedding']
+        return embedding.get_embedding(text, model)
     except Exception as e:
         st.error(f"Error generating embedding: {e}")
         return None
 
+
+def search_batched(index, text, k, where):
+    """Embeds and searches a query together with other users' concurrent queries."""
+    try:
+        return batching.search(index, text, k, where)
+    except Exception as e:
+        st.error(f"Error generating embedding: {e}")
+        return None, []
+
+
+def show_build_progress(build):
+    """Progress of the background index build; reloads the page once it has finished."""
+    if build.status == "building":
+        st.progress(build.progress, text=f"Building the AI's memory in the background: {build.done} of {build.total or '?'} articles")
+    else:
+        st.rerun()
+
 # --- KNOWLEDGE BASE & VECTOR DB SETUP ---
 st.title("📚 Vector Database LawBot")
 st.caption("The AI's Searchable Long-Term Memory")
 
 try:
-    # Load the knowledge base
-    with open("knowledge_base.txt", "r", encoding="utf-8") as f:
-        knowledge_base_text = f.read()
-
-    # Split the text into chunks (paragraphs)
-    text_chunks = [para.strip() for para in knowledge_base_text.split('\n\n') if para.strip()]
-
-    # Generate embeddings for each chunk (this might take a moment on first run)
-    with st.spinner("Building the AI's memory... Please wait."):
-        if "embeddings" not in st.session_state:
-            embeddings = []
-            valid_chunks = []
-            for chunk in text_chunks:
-                emb = get_embedding(chunk)
-                if emb is not None:
-                    embeddings.append(emb)
-                    valid_chunks.append(chunk)
-            st.session_state.embeddings = embeddings
-            st.session_state.text_chunks = valid_chunks
-
-    # Create a FAISS index
-    embeddings_np = np.array(st.session_state.embeddings).astype('float32')
-    index = faiss.IndexFlatL2(embeddings_np.shape[1]) # L2 distance is a common choice
-    index.add(embeddings_np)
-
-    st.success(f"AI's memory built successfully! It has learned from {len(st.session_state.text_chunks)} legal articles.")
-    st.write("---")
+    # --- SHARDED SEARCH (optional) ---
+    # After `python -m lawbot_engine.shards build vector-database/knowledge_base*.txt`,
+    # searches fan out to one process per jurisdiction, and no worker holds the whole
+    # corpus: the single index below is then never built.
+    router = shards.get_shared_router()
+    jurisdictions = None
+    if router is not None:
+        st.success(f"Searching {len(router)} legal articles across {len(router.shards)} shards.")
+        st.write("---")
+        jurisdictions = st.multiselect(
+            "**Jurisdictions to search:**", router.jurisdictions(), default=router.jurisdictions()
+        )
+    else:
+        # The FAISS index over the knowledge base files is built once per process, on a
+        # background thread, and shared by every user and page. While it builds, searches
+        # use the previous version (e.g. before the files were edited) or the articles
+        # embedded so far, so nobody has to wait for the whole knowledge base.
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        serving = retrieval.serving_index(
+            [os.path.join(app_dir, "knowledge_base.txt"), os.path.join(app_dir, "knowledge_base_nepal.txt")]
+        )
+        index, build = serving.index, serving.build
+
+        if build is not None and build.status == "building":
+            st.fragment(show_build_progress, run_every=1.0)(build)
+        elif build is not None and build.status == "failed":
+            st.warning(f"Updating the AI's memory failed ({build.error}). It will be retried shortly.")
+
+        if index is None:
+            st.info("The AI's memory is being built for the first time. Search will be available in a moment.")
+            st.stop()
+        elif serving.partial:
+            st.warning(f"Searching a partial memory: {len(index)} of {build.total} legal articles so far.")
+        elif serving.stale:
+            st.info(f"Searching the previous version of the AI's memory ({len(index)} legal articles) until the update is ready.")
+        else:
+            st.success(f"AI's memory built successfully! It has learned from {len(index)} legal articles.")
+        st.write("---")
 
     # --- USER INTERFACE FOR SEARCH ---
-    st.header("Ask a question about the Indian Constitution")
+    st.header("Ask a question about the Constitutions of India and Nepal")
+
+    # Each article's header ("Article 21 of the Constitution of India: ...") is parsed into
+    # metadata, so the search can be limited to one act or Part before it runs.
+    # (The shards list their acts and Parts in their manifest.)
+    filters = router if router is not None else index.store
+    col1, col2 = st.columns(2)
+    with col1:
+        acts = st.multiselect("**Only search these acts:**", filters.values("act"))
+    with col2:
+        parts = st.multiselect("**Only search these Parts:**", filters.values("part"))
+    where = {"act": acts, "part": parts}
+
     user_query = st.text_input("Your query:", placeholder="e.g., How does the constitution protect my life?")
+    answer_mode = st.toggle(
+        "Answer my question using these articles",
+        help="LawBot packs the most relevant sentences of the articles it finds into its prompt and cites them.",
+    )
+    # An answer is built from a few more articles; packing keeps only the sentences that matter
+    k = grounding.PASSAGES if answer_mode else 2
 
     if st.button("Search the AI's Memory"):
         if user_query:
-            with st.spinner("Searching for the most relevant information..."):
-                # 1. Embed the user's query
-                query_embedding = get_embedding(user_query)
+            with st.spinner("Searching for the most relevant information..."), tracing.span("request", app="vector-database"):
+                # 1. Embed the user's query (with the model the index was built with). Without
+                #    shards, queries from users searching at the same moment are embedded in one
+                #    API call and searched in one FAISS call.
+                if router is not None:
+                    query_embedding = get_embedding(user_query, router.embedding_model)
+                else:
+                    query_embedding, first_stage = search_batched(
+                        index, user_query, max(k, config.RERANK_CANDIDATES), where
+                    )
 
                 if query_embedding:
-                    # 2. Search the FAISS index
-                    query_embedding_np = np.array([query_embedding]).astype('float32')
-                    # Search for the top 2 most similar chunks
-                    distances, indices = index.search(query_embedding_np, k=2)
-
-                    # 3. Display the results
-                    st.subheader("Most Relevant Information Found:")
-                    for i in indices[0]:
-                        st.markdown(f"> {st.session_state.text_chunks[i]}")
-                        st.write("---")
+                    # 2. Search the FAISS index (or every selected shard) for the k most relevant chunks.
+                    #    Each result keeps an ID (its row, or its shard and rank) for citations.
+                    if router is not None:
+                        sharded = router.search(query_embedding, k=k, jurisdictions=jurisdictions or None, where=where)
+                        results = [(f"{shard}-{i}", chunk, distance)
+                                   for i, (chunk, distance, shard) in enumerate(sharded.results, start=1)]
+                        st.caption(" · ".join(
+                            f"{name}: {info['status']}" + (f" ({info['latency_s'] * 1000:.0f} ms)" if info["status"] == "ok" else "")
+                            for name, info in sorted(sharded.shards.items())
+                        ))
+                    else:
+                        # Fetch a wider set of candidates and rerank them (within a time budget)
+                        retrieved = rerank.retrieve(index, user_query, query_embedding, k=k, where=where,
+                                                    first_stage=first_stage)
+                        results = [(f"C{row}", chunk, score) for row, chunk, score in retrieved.results]
+                        st.caption(
+                            ("Reranked " if retrieved.reranked else "Rerank skipped (over time budget), ")
+                            + f"{retrieved.candidates} candidates · "
+                            + " · ".join(f"{stage} {ms:.1f} ms" for stage, ms in retrieved.timings_ms.items())
+                        )
+
+                    # 3. Display the results, or answer with them
+                    if not results:
+                        st.info("No articles match the selected filters.")
+                    elif answer_mode:
+                        with tracing.span("pack") as pack_span:
+                            passages = [(chunk_id, chunk) for chunk_id, chunk, _ in results]
+                            packed = grounding.pack_context(user_query, passages)
+                            contents = prompting.build_contents(prompts.EXAMPLES, grounding.build_prompt(user_query, packed))
+                        pack_span.set(retrieved_tokens=packed.retrieved_tokens, sent_tokens=packed.sent_tokens)
+
+                        st.subheader("LawBot's Answer:")
+                        answer_box = st.empty()
+                        # Stream the answer (hedged, with a fallback at the deadline, like the other LawBot pages)
+                        answer = deadlines.generate(
+                            model, contents, prompts.SECTIONS, on_text=answer_box.markdown, question=user_query,
+                            app="vector-database", context=tuple(packed.labels),
+                        )
+                        with tracing.span("render"):
+                            answer_box.markdown(answer.text)
+                            if deadlines.describe(answer):
+                                st.caption(deadlines.describe(answer))
+                            st.caption(
+                                f"Context: {packed.sent_tokens} of {packed.retrieved_tokens} retrieved tokens sent "
+                                f"({packed.kept} of {packed.sentences} sentences; {packed.duplicates} repeated)"
+                            )
+                            cited = grounding.citations(answer.text, packed)
+                            with st.expander("Sources" + (f" ({len(cited)} cited)" if cited else "")):
+                                for chunk_id, chunk, _ in results:
+                                    if chunk_id in packed.labels:
+                                        mark = "📌 " if chunk_id in cited else ""
+                                        st.markdown(f"{mark}**[{chunk_id}]** {chunk}")
+                    else:
+                        with tracing.span("render"):
+                            st.subheader("Most Relevant Information Found:")
+                            for chunk_id, chunk, distance in results:
+                                st.markdown(f"> {chunk}")
+                                st.write("---")
                 else:
                     st.error("Could not process your query.")
         else:
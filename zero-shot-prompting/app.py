@@ -1,10 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load the environment variables (your API key) from the .env file
-load_dotenv()
+# Make the shared lawbot_engine package (one folder up) importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from lawbot_engine import deadlines, prompting, registry, tracing
 
 # --- CONFIGURATION ---
 # Set page configuration for the Streamlit app
@@ -16,21 +18,19 @@ st.set_page_config(
 
 # Configure the Gemini API with the key from the .env file
 try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except AttributeError:
+    registry.configure()  # Reads GEMINI_API_KEY from the environment or .env
+except ValueError:
     st.error("🚨 Gemini API key not found. Please create a .env file with your key.")
     st.stop() # Stop the app if the key is not found
 
-# --- MODEL INITIALIZATION ---
-# This is our main instruction to the AI. This is the core of the prompt.
-# It tells the AI what its personality and job are.
-SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions accurately, clearly, and concisely. If you don't know the answer, state that you do not have enough information."
+# --- PROMPTS ---
+# SYSTEM_PROMPT, EXAMPLES and build_prompt live in prompts.py next to this file
+prompts = prompting.load_prompts(os.path.dirname(os.path.abspath(__file__)))
+SYSTEM_PROMPT, EXAMPLES, build_prompt = prompts.SYSTEM_PROMPT, prompts.EXAMPLES, prompts.build_prompt
 
+# --- MODEL INITIALIZATION ---
 # Initialize the Gemini Pro model with our system instruction
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=SYSTEM_PROMPT
-)
+model = registry.get_model(system_instruction=SYSTEM_PROMPT)
 
 # --- USER INTERFACE (UI) ---
 st.title("🧠 Zero-Shot LawBot")
@@ -43,17 +43,27 @@ user_question = st.text_input("Enter your legal query about Indian Law:", key="u
 # This block runs when the user types something and presses Enter
 if user_question:
     # Show a spinner while the AI is thinking
-    with st.spinner("LawBot is analyzing your query..."):
+    with st.spinner("LawBot is analyzing your query..."), tracing.span("request", app="zero-shot-prompting"):
         try:
             # This is the "Zero-Shot" part. We are sending the user's question directly.
             # We are not providing any examples of how to answer.
             # The `user_question` is the zero-shot prompt.
-            response = model.generate_content(user_question)
+            # There is no section format to check (no sections), but a slow model
+            # still gets a hedged second request, then a local fallback at the deadline
+            st.subheader("LawBot's Answer:")
+            answer_box = st.empty()
+            answer = deadlines.generate(
+                model, user_question, sections=(), on_text=answer_box.markdown, question=user_question,
+                app="zero-shot-prompting",
+            )
 
             # Display the AI's response
-            st.subheader("LawBot's Answer:")
-            st.markdown(response.text)
+            with tracing.span("render"):
+                answer_box.markdown(answer.text)
+                if deadlines.describe(answer):
+                    st.caption(deadlines.describe(answer))
 
         except Exception as e:
             # Handle potential errors from the API
-            st.error(f"An error occurred: {e}")
\ No newline at end of file
+            st.error(f"An error occurred: {e}")
+            tracing.record_error("request", e)
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Prompt construction for the Zero-Shot LawBot.
+
+Kept out of app.py so the offline harness (lawbot_engine.harness) can
+import it without starting Streamlit.
+"""
+from lawbot_engine.formatting import SECTION_TAGS
+
+# Zero-shot: no examples, the user's question is sent on its own.
+EXAMPLES = []
+
+# This is our main instruction to the AI. This is the core of the prompt.
+# It tells the AI what its personality and job are.
+SYSTEM_PROMPT = "You are an expert legal assistant specializing in Indian law. Your name is LawBot. Answer the user's questions accurately, clearly, and concisely. If you don't know the answer, state that you do not have enough information."
+
+# The sections a well-formed answer from this app should contain
+SECTIONS = SECTION_TAGS
+
+# Zero-shot doesn't ask for the format, so the harness shouldn't re-ask when it's missing
+ENFORCE_FORMAT = False
+
+
+def build_prompt(legal_issue, location=None, extra_details=""):
+    """The question is sent as-is; this app has no location or details fields."""
+    return legal_issue